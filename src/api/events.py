@@ -18,6 +18,8 @@ session_factory = SessionFactory(api_settings["database_uri"])
 class EventsQuery(BaseModel):
     limit: int = 100
     skip: int = 0
+    before_id: int | None = None
+    archived: bool = False
     queue: Queue | None = None
     status: PersistedEventStatus | None = None
 
@@ -32,10 +34,16 @@ def get_events(query: EventsQuery):
             status=query.status,
             limit=query.limit,
             skip=query.skip,
+            before_id=query.before_id,
+            archived=query.archived,
         )
+        events_data = [event.asdict() for event in events]
 
         return {
-            "events": [event.asdict() for event in events],
+            "events": events_data,
+            "next_before_id": (
+                min(event["id"] for event in events_data) if events_data else None
+            ),
         }, 200
 
 
@@ -44,7 +52,10 @@ def get_events(query: EventsQuery):
 @validate()
 def get_event(event_id: int):
     with session_factory.session() as session:
-        event = EventStore(session=session).get_event_by_id(event_id=event_id)
+        event_store = EventStore(session=session)
+        event = event_store.get_event_by_id(
+            event_id=event_id
+        ) or event_store.get_archived_event_by_id(event_id=event_id)
 
         if not event:
             return "Not Found", 404
@@ -0,0 +1,55 @@
+import argparse
+import logging
+import time
+
+from database.session_factory import SessionFactory
+from models.trade_setting import TradeSettingName
+from settings import SettingsFactory
+from tradebot.backtest import Backtest, SimulatedExecution
+from web3_helper.helper import Web3Client
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Replay stored pair quotes through a strategy"
+    )
+    parser.add_argument("strategy")
+    parser.add_argument("--pair", action="append", dest="pairs")
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--buy-amount", type=float, default=0.01)
+    parser.add_argument("--slippage", type=float, default=0.01)
+    parser.add_argument("--gas-fee", type=float, default=0.0)
+    parser.add_argument(
+        "--setting",
+        action="append",
+        default=[],
+        help="trade setting override, e.g. STOP_LOSS=-20",
+    )
+    args = parser.parse_args()
+
+    backtest_settings = SettingsFactory.get_backtest_settings()
+    db_session_factory = SessionFactory(backtest_settings["database_uri"])
+    web3 = Web3Client().web3
+
+    backtest = Backtest(
+        strategy_name=args.strategy,
+        web3_client=Web3Client(),
+        buy_amount=web3.to_wei(args.buy_amount, "ether"),
+        execution=SimulatedExecution(
+            slippage=args.slippage, gas_fee=web3.to_wei(args.gas_fee, "ether")
+        ),
+        settings={
+            TradeSettingName(name): value
+            for name, value in (setting.split("=", 1) for setting in args.setting)
+        },
+    )
+
+    with db_session_factory.session() as session:
+        report = backtest.run(
+            session,
+            pair_addresses=args.pairs,
+            since=int(time.time()) - args.days * 24 * 3600,
+        )
+
+    print(report.model_dump_json(indent=2))
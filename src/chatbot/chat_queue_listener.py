@@ -1,14 +1,16 @@
 from discord import Embed, TextChannel
 from discord.ext import commands, tasks
 
-from chatbot.command.update_pair_quotes_command import UpdatePairQuotesCommand
 from database.event_store import EventStore
+from database.notification_listener import NotificationListener, queue_channel
 from database.session_factory import SessionFactory
 from models.event import ChatEvent, ChatMessageType, EventType, Queue
 from web3_helper.helper import Web3Client
 
 
 class ChatQueueListener(commands.Cog):
+    POLL_TIMEOUT = 5.0
+
     def __init__(
         self,
         *,
@@ -23,6 +25,10 @@ class ChatQueueListener(commands.Cog):
         self.channel = channel
         self.web_api_uri = web_api_uri
         self.web_api_key = web_api_key
+        self.queue_listener = NotificationListener(
+            engine=session_factory.engine,
+            channels=[queue_channel(Queue.CHAT_BOT)],
+        )
         self.post_pending_message.start()
 
     def _get_embed_from_chat_event(self, chat_event: ChatEvent) -> Embed:
@@ -58,27 +64,38 @@ class ChatQueueListener(commands.Cog):
 
         return embed
 
-    @tasks.loop(seconds=2)
-    async def post_pending_message(self):
+    async def _post_next_message(self) -> bool:
         with self.session_factory.session() as session:
             event_store = EventStore(session)
-            if last_event := EventStore(session).get_latest_event(queue=Queue.CHAT_BOT):
-                event_store.ack_event(last_event)
-                if last_event.event_type == EventType.CHAT:
-                    chat_event = ChatEvent(
-                        id=last_event.id,
-                        created_at=last_event.created_at,
-                        data=last_event.data,
-                    )
-
-                    if chat_event.message_type == ChatMessageType.TEXT:
-                        await self.channel.send(last_event.data["message"])
-                    elif chat_event.message_type == ChatMessageType.EMBED:
-                        embed = self._get_embed_from_chat_event(chat_event)
-                        await self.channel.send(embed=embed)
-                    elif chat_event.message_type == ChatMessageType.ERROR:
-                        embed = self._get_error_embed_from_chat_event(chat_event)
-                        await self.channel.send(embed=embed)
-
-                event_store.complete_event(last_event)
-                session.commit()
+            last_event = event_store.get_latest_event(queue=Queue.CHAT_BOT)
+            if not last_event:
+                return False
+
+            event_store.ack_event(last_event)
+            if last_event.event_type == EventType.CHAT:
+                chat_event = ChatEvent(
+                    id=last_event.id,
+                    created_at=last_event.created_at,
+                    data=last_event.data,
+                )
+
+                if chat_event.message_type == ChatMessageType.TEXT:
+                    await self.channel.send(last_event.data["message"])
+                elif chat_event.message_type == ChatMessageType.EMBED:
+                    embed = self._get_embed_from_chat_event(chat_event)
+                    await self.channel.send(embed=embed)
+                elif chat_event.message_type == ChatMessageType.ERROR:
+                    embed = self._get_error_embed_from_chat_event(chat_event)
+                    await self.channel.send(embed=embed)
+
+            event_store.complete_event(last_event)
+            session.commit()
+
+            return True
+
+    @tasks.loop(seconds=0)
+    async def post_pending_message(self):
+        while await self._post_next_message():
+            pass
+
+        await self.queue_listener.wait_async(timeout=self.POLL_TIMEOUT)
@@ -12,11 +12,11 @@ from database.pair_store import PairStore
 from database.position_store import PositionStore
 from database.session_factory import SessionFactory
 from database.token_store import TokenStore
-from database.trade_setting_store import TradeSettingStore
 from ext_api.dexscreener import DexPair, DexScreener
-from models.token import Addresses, Pair
+from models.token import Addresses, Pair, PositionMetric
 from models.trade_setting import TradeSettingName
-from models.utils import get_position_metric
+from models.utils import get_pairs_position_metrics
+from settings.trade_settings_manager import get_trade_settings_manager
 from web3_helper.helper import Web3Client
 
 
@@ -39,17 +39,17 @@ class GetPositionCommand(BaseCommand):
         channel: TextChannel,
         session: Session,
         eth_price_usd: float | None = None,
+        position_metric: PositionMetric | None = None,
     ) -> None:
         pair_store = PairStore(session)
         token_store = TokenStore(session)
-        position = PositionStore(session).get_position(pair.address)
         latest_quote = pair_store.get_latest_quote(pair.address)
         # TODO joinedload them
         base_token = token_store.get_token(pair.base_address)
         quote_token = token_store.get_token(pair.quote_address)
-        buy_trade_setting = TradeSettingStore(session).get_setting(
-            TradeSettingName.BUY_AMOUNT
-        )
+        buy_trade_setting = get_trade_settings_manager(
+            self.session_factory
+        ).get_setting(TradeSettingName.BUY_AMOUNT)
 
         if (
             not base_token
@@ -92,14 +92,7 @@ class GetPositionCommand(BaseCommand):
 
         embed.description = "\n".join(description)
 
-        if position and base_token.balance > 0:
-            position_metric = get_position_metric(
-                position=position,
-                web3_client=self.web3_client,
-                base_token=base_token,
-                latest_quote=latest_quote,
-            )
-
+        if position_metric:
             profit_usd: float | None = None
             if eth_price_usd:
                 profit_usd = float(position_metric.profit_and_loss) * eth_price_usd
@@ -150,6 +143,34 @@ class GetPositionCommand(BaseCommand):
         await message.add_reaction(EmojiRef.SELL_ALL.decode())
         await message.add_reaction(EmojiRef.CLOSE_POSITION.decode())
 
+    def get_position_metrics(
+        self, session: Session, pairs: list[Pair]
+    ) -> dict[str, PositionMetric]:
+        pair_addresses = [pair.address for pair in pairs]
+        tokens = {
+            token.address: token
+            for token in TokenStore(session).get_tokens_by_addresses(
+                [pair.base_address for pair in pairs]
+            )
+        }
+        positions = {
+            position.pair_address: position
+            for position in PositionStore(session).get_positions_by_pair_addresses(
+                pair_addresses
+            )
+        }
+        latest_quotes = {
+            quote.pair_address: quote
+            for quote in PairStore(session).get_latest_quotes(pair_addresses)
+        }
+
+        return get_pairs_position_metrics(
+            pairs=pairs,
+            positions=positions,
+            tokens=tokens,
+            latest_quotes=latest_quotes,
+        )
+
     async def execute(self, *, channel: TextChannel, args: list[str] = []) -> None:
 
         with self.session_factory.session() as session:
@@ -157,20 +178,22 @@ class GetPositionCommand(BaseCommand):
             eth_token = TokenStore(session).get_token(str(Addresses.ETH))
             latest_eth_price = eth_token.latest_price_usd if eth_token else None
             if args:
+                pairs: list[Pair] = []
                 for symbol in args:
                     if pair := pair_store.get_pair_by_base_token_by_symbol(symbol):
-                        await self.post_pair_information(
-                            pair,
-                            channel,
-                            session,
-                            latest_eth_price,
-                        )
+                        pairs.append(pair)
                     else:
                         await channel.send(f"Token {symbol} not found")
+            else:
+                pairs = list(pair_store.get_all_pairs())
 
-                return
+            position_metrics = self.get_position_metrics(session, pairs)
 
-            for pair in pair_store.get_all_pairs():
+            for pair in pairs:
                 await self.post_pair_information(
-                    pair, channel, session, latest_eth_price
+                    pair,
+                    channel,
+                    session,
+                    latest_eth_price,
+                    position_metrics.get(pair.address),
                 )
@@ -7,7 +7,10 @@ from models.trade_setting import (
     TRADE_SETTING_CHAT_NAME,
     TradeSettingName,
 )
-from settings.trade_settings_manager import TradeSettingsManager
+from settings.trade_settings_manager import (
+    TradeSettingsManager,
+    get_trade_settings_manager,
+)
 
 
 class SettingsCommand(BaseCommand):
@@ -19,7 +22,7 @@ class SettingsCommand(BaseCommand):
         self.session_factory = session_factory
 
     async def execute(self, *, channel: TextChannel, args: list[str] = []) -> None:
-        trade_settings_manager = TradeSettingsManager(self.session_factory)
+        trade_settings_manager = get_trade_settings_manager(self.session_factory)
 
         if not args:
             all_settings = trade_settings_manager.get_all_settings()
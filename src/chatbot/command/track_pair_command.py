@@ -14,8 +14,9 @@ from models.event import EventType
 from models.event import PersistedEvent as Event
 from models.event import Queue
 from models.token import Pair, PairQuote, Token
-from web3_helper.abi import ABIFetcher, ABIManager
+from web3_helper.abi import ABIFetcher, get_contract, prefetch_abis
 from web3_helper.helper import Web3Client
+from web3_helper.standard_abi import ERC20_ABI
 
 
 class TrackPairCommand(BaseCommand):
@@ -36,7 +37,6 @@ class TrackPairCommand(BaseCommand):
         with self.session_factory.session() as session:
             pair_store = PairStore(session)
             token_store = TokenStore(session)
-            abi_manager = ABIManager(session=session, abi_fetcher=self.abi_fetcher)
             base_token = dex_pair.baseToken
             quote_token = dex_pair.quoteToken
 
@@ -49,9 +49,8 @@ class TrackPairCommand(BaseCommand):
 
             db_base_token = token_store.get_token(base_token.address)
             if not db_base_token:
-                base_contract = self.web3_client.web3.eth.contract(
-                    self.web3_client.to_checksum_address(base_token.address),
-                    abi=abi_manager.get_abi(address=base_token.address),
+                base_contract = get_contract(
+                    self.web3_client, address=base_token.address, abi=ERC20_ABI
                 )
 
                 token_decimals = base_contract.functions.decimals().call()
@@ -68,9 +67,8 @@ class TrackPairCommand(BaseCommand):
 
             db_quote_token = token_store.get_token(quote_token.address)
             if not db_quote_token:
-                quote_contract = self.web3_client.web3.eth.contract(
-                    self.web3_client.to_checksum_address(quote_token.address),
-                    abi=abi_manager.get_abi(address=quote_token.address),
+                quote_contract = get_contract(
+                    self.web3_client, address=quote_token.address, abi=ERC20_ABI
                 )
 
                 token_decimals = quote_contract.functions.decimals().call()
@@ -96,6 +94,12 @@ class TrackPairCommand(BaseCommand):
             pair_store.add_pair(pair)
             session.commit()
 
+            prefetch_abis(
+                session_maker=self.session_factory.session,
+                abi_fetcher=self.abi_fetcher,
+                addresses=[pair.address],
+            )
+
             pair_store.add_pair_quote(
                 PairQuote(
                     pair_address=pair.address,
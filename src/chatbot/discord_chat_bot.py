@@ -18,18 +18,16 @@ from chatbot.commands_handler import CommandsHandler
 from chatbot.constants import EmojiRef
 from chatbot.periodic_position_task import PeriodicPositionTask
 from chatbot.update_ether_price_task import UpdateEtherPriceTask
-from chatbot.update_quotes_task import UpdateQuotesTask
 from database.event_store import EventStore
 from database.pair_store import PairStore
 from database.session_factory import SessionFactory
 from database.token_store import TokenStore
-from database.trade_setting_store import TradeSettingStore
 from models.event import EventType
 from models.event import PersistedEvent as Event
 from models.event import Queue
-from models.token import TOKEN_ADDRESSES, Token, TokenName
+from models.token import TOKEN_ADDRESSES, Token, TokenName, get_quote_timestamp
 from models.trade_setting import TradeSettingName
-from settings.trade_settings_manager import TradeSettingsManager
+from settings.trade_settings_manager import get_trade_settings_manager
 from web3_helper.abi import ABIFetcher
 from web3_helper.helper import Web3Client
 
@@ -117,7 +115,6 @@ class DiscordChatBot(Client):
             ],
         )
 
-        self.update_quotes_task: UpdateQuotesTask | None = None
         self.chat_queue_listener: ChatQueueListener | None = None
         self.update_ether_price: UpdateEtherPriceTask | None = None
         self.periodic_position: PeriodicPositionTask | None = None
@@ -125,8 +122,7 @@ class DiscordChatBot(Client):
     def _init_bot(self):
         self.bot_user_id = self.user.id if self.user else None
 
-        trade_settings_manager = TradeSettingsManager(self.db_session_factory)
-        trade_settings_manager.get_all_settings()
+        get_trade_settings_manager(self.db_session_factory).get_all_settings()
 
         with self.db_session_factory.session() as session:
             token_store = TokenStore(session)
@@ -167,12 +163,6 @@ class DiscordChatBot(Client):
         )
 
         if isinstance(channel, TextChannel):
-            self.update_quotes_task = UpdateQuotesTask(
-                session_factory=self.db_session_factory,
-                web3_client=self.web3_client,
-                channel=channel,
-            )
-
             self.chat_queue_listener = ChatQueueListener(
                 session_factory=self.db_session_factory,
                 web3_client=self.web3_client,
@@ -197,12 +187,17 @@ class DiscordChatBot(Client):
             )
 
             with self.db_session_factory.session() as session:
-                trade_setting_store = TradeSettingStore(session)
+                trade_settings = get_trade_settings_manager(self.db_session_factory)
                 if pair := PairStore(session).get_pair_by_message_id(
                     reaction.message.id
                 ):
+                    # price the user saw when reacting, stale buys get dropped
+                    quote_timestamp = get_quote_timestamp(
+                        pair, PairStore(session).get_latest_quote(pair.address)
+                    )
+
                     if encoded_emoji == EmojiRef.BUY:
-                        if buy_amount_setting := trade_setting_store.get_setting(
+                        if buy_amount_setting := trade_settings.get_setting(
                             TradeSettingName.BUY_AMOUNT
                         ):
                             push_event_to_trade_bot(
@@ -214,11 +209,12 @@ class DiscordChatBot(Client):
                                         buy_amount_setting.get_float(), "ether"
                                     ),
                                     "slippage": None,
+                                    "quote_timestamp": quote_timestamp,
                                 },
                             )
 
                     elif encoded_emoji == EmojiRef.BUY_DOUBLE:
-                        if buy_amount_setting := trade_setting_store.get_setting(
+                        if buy_amount_setting := trade_settings.get_setting(
                             TradeSettingName.BUY_AMOUNT
                         ):
                             push_event_to_trade_bot(
@@ -231,6 +227,7 @@ class DiscordChatBot(Client):
                                         "ether",
                                     ),
                                     "slippage": None,
+                                    "quote_timestamp": quote_timestamp,
                                 },
                             )
 
@@ -243,6 +240,7 @@ class DiscordChatBot(Client):
                                     "pair": pair.address,
                                     "value": int(token.balance),
                                     "slippage": None,
+                                    "quote_timestamp": quote_timestamp,
                                 },
                             )
 
@@ -257,6 +255,7 @@ class DiscordChatBot(Client):
                                     "pair": pair.address,
                                     "value": int(token.balance / 2),
                                     "slippage": None,
+                                    "quote_timestamp": quote_timestamp,
                                 },
                             )
 
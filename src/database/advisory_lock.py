@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import Engine, func, select
+from sqlalchemy.orm import Session
+
+
+@contextmanager
+def advisory_lock(engine: Engine, key: str) -> Iterator[None]:
+    # shared by every process on the database, released with the transaction,
+    # a process dying while holding it doesn't leave it taken
+    with engine.begin() as connection:
+        connection.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+        yield
+
+
+def lock_for_transaction(session: Session, key: str) -> None:
+    # released when the session commits or rolls back
+    session.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+
+def wallet_lock_key(address: str) -> str:
+    return f"wallet:{address.lower()}"
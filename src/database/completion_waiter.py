@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
+
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from database.notification_listener import (
+    COMPLETED_EVENTS_CHANNEL,
+    NotificationListener,
+)
+from models.event import PersistedEvent, PersistedEventStatus
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED_STATUSES = [
+    PersistedEventStatus.PENDING.value,
+    PersistedEventStatus.PROCESSING.value,
+]
+
+
+class CompletionWaiter:
+    def __init__(
+        self,
+        *,
+        engine: Engine,
+        poll_timeout: float = 5.0,
+        fallback_interval: float = 30.0,
+    ) -> None:
+        self.engine = engine
+        self.poll_timeout = poll_timeout
+        self.fallback_interval = fallback_interval
+        self._futures: dict[int, list[Future[PersistedEventStatus]]] = {}
+        self._lock = Lock()
+        self._thread: Thread | None = None
+
+    def wait_for(self, event_id: int) -> Future[PersistedEventStatus]:
+        # register before the event is committed, otherwise its completion
+        # notification can be missed
+        future: Future[PersistedEventStatus] = Future()
+
+        with self._lock:
+            self._futures.setdefault(event_id, []).append(future)
+
+            if self._thread is None:
+                listener = NotificationListener(
+                    engine=self.engine, channels=[COMPLETED_EVENTS_CHANNEL]
+                )
+                # listen before returning, the caller commits the event next
+                listener.listen()
+
+                self._thread = Thread(target=self._run, args=(listener,), daemon=True)
+                self._thread.start()
+
+        return future
+
+    async def wait_async(self, event_id: int) -> PersistedEventStatus:
+        return await asyncio.wrap_future(self.wait_for(event_id))
+
+    def cancel(self, event_id: int) -> None:
+        with self._lock:
+            futures = self._futures.pop(event_id, [])
+
+        for future in futures:
+            future.cancel()
+
+    def resolve(self, event_id: int, status: PersistedEventStatus) -> None:
+        with self._lock:
+            futures = self._futures.pop(event_id, [])
+
+        for future in futures:
+            if not future.done():
+                future.set_result(status)
+
+    def _waiting_event_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._futures.keys())
+
+    def _check_finished_events(self) -> None:
+        # catches completions notified while the listener was reconnecting
+        if not (event_ids := self._waiting_event_ids()):
+            return
+
+        with Session(self.engine) as session:
+            finished_events = session.execute(
+                select(PersistedEvent.id, PersistedEvent._status).where(
+                    PersistedEvent.id.in_(event_ids),
+                    PersistedEvent._status.not_in(UNFINISHED_STATUSES),
+                )
+            ).all()
+
+        for event_id, status in finished_events:
+            self.resolve(event_id, PersistedEventStatus(status))
+
+    def _run(self, listener: NotificationListener) -> None:
+        last_check = 0.0
+
+        while True:
+            try:
+                for notification in listener.wait(timeout=self.poll_timeout):
+                    event_id, status = notification.payload.split(":")[:2]
+                    self.resolve(int(event_id), PersistedEventStatus(status))
+
+                if time.monotonic() - last_check >= self.fallback_interval:
+                    last_check = time.monotonic()
+                    self._check_finished_events()
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} error")
+
+
+_waiters: dict[Engine, CompletionWaiter] = {}
+_waiters_lock = Lock()
+
+
+def get_completion_waiter(engine: Engine) -> CompletionWaiter:
+    # one waiter, and one listening connection, per engine and process
+    with _waiters_lock:
+        if engine not in _waiters:
+            _waiters[engine] = CompletionWaiter(engine=engine)
+
+        return _waiters[engine]
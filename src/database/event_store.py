@@ -1,18 +1,122 @@
 import time
-from typing import Iterable
+from datetime import datetime, timezone
+from typing import Final, Iterable, cast
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    ColumnElement,
+    CursorResult,
+    delete,
+    exists,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
 
-from models.event import PersistedEvent, PersistedEventStatus, Queue
+from database.advisory_lock import lock_for_transaction
+from database.notification_listener import (
+    COMPLETED_EVENTS_CHANNEL,
+    notify,
+    queue_channel,
+)
+from models.event import (
+    ArchivedEvent,
+    EventColumns,
+    EventType,
+    PersistedEvent,
+    PersistedEventStatus,
+    Queue,
+    get_coalesce_key,
+    get_partition_key,
+    merge_event_data,
+)
+
+ARCHIVABLE_STATUSES: Final[list[str]] = [
+    PersistedEventStatus.COMPLETED.value,
+    PersistedEventStatus.FAILED.value,
+    PersistedEventStatus.EXPIRED.value,
+]
+
+# a waiting event gains one priority level every PRIORITY_AGING_SECONDS,
+# low priority events still run while a burst of higher priority ones is queued
+PRIORITY_AGING_SECONDS: Final[int] = 15
+
+
+def dequeue_order(now: int) -> list[ColumnElement]:
+    effective_priority = PersistedEvent.priority + (
+        (now - PersistedEvent.created_at) / PRIORITY_AGING_SECONDS
+    )
+
+    return [
+        effective_priority.desc(),
+        PersistedEvent.created_at.asc(),
+        PersistedEvent.id.asc(),
+    ]
 
 
 class EventStore:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def add_event(self, event: PersistedEvent) -> None:
+    def add_event(self, event: PersistedEvent) -> PersistedEvent:
+        event_type = EventType(event.event_type)
+
+        if event.partition_key is None:
+            event.partition_key = get_partition_key(event_type, event.data)
+
+        if event.coalesce_key is None:
+            event.coalesce_key = get_coalesce_key(event_type, event.data)
+
+        if event.coalesce_key:
+            # two producers can't both miss the pending event and insert,
+            # the second waits until the first one commits
+            lock_for_transaction(
+                self.session, f"coalesce:{event.queue}:{event.coalesce_key}"
+            )
+
+        if event.coalesce_key and (pending_event := self._get_coalesce_target(event)):
+            pending_event.data = merge_event_data(
+                event_type, pending_event.data, event.data
+            )
+            pending_event.priority = max(pending_event.priority, event.priority)
+
+            return pending_event
+
         self.session.add(event)
+        notify(self.session, queue_channel(Queue(event.queue)), event.event_type)
+
+        return event
+
+    def _get_coalesce_target(self, event: PersistedEvent) -> PersistedEvent | None:
+        newer_event = aliased(PersistedEvent)
+
+        # merging into an event that has a newer one queued for the same
+        # partition would reorder them
+        has_newer_event = exists().where(
+            newer_event.partition_key == PersistedEvent.partition_key,
+            newer_event.id > PersistedEvent.id,
+            newer_event._status == PersistedEventStatus.PENDING.value,
+        )
+
+        # the row lock keeps a worker from claiming it while it's merged,
+        # a row claimed in the meantime is no longer pending and is skipped
+        stmt = (
+            select(PersistedEvent)
+            .where(
+                PersistedEvent.queue == event.queue,
+                PersistedEvent.coalesce_key == event.coalesce_key,
+                PersistedEvent._status == PersistedEventStatus.PENDING.value,
+                or_(PersistedEvent.partition_key.is_(None), ~has_newer_event),
+            )
+            .order_by(PersistedEvent.id.desc())
+            .limit(1)
+            .with_for_update(of=PersistedEvent)
+        )
+
+        return self.session.scalar(stmt)
 
     def get_latest_event(
         self,
@@ -26,32 +130,232 @@ class EventStore:
                 PersistedEvent.queue == queue.value,
                 PersistedEvent._status == target_status.value,
             )
-            .order_by(PersistedEvent.created_at.asc())
+            .order_by(*dequeue_order(int(time.time())))
             .limit(1)
         )
 
         return self.session.scalar(stmt)
 
+    def claim_event(
+        self, *, queue: Queue, worker_id: str, lease_duration: int
+    ) -> PersistedEvent | None:
+        now = int(time.time())
+        previous_event = aliased(PersistedEvent)
+
+        # an event can't be claimed while an older event of the same partition
+        # is still pending or being processed by another worker
+        has_previous_event = exists().where(
+            previous_event.partition_key == PersistedEvent.partition_key,
+            previous_event.id < PersistedEvent.id,
+            previous_event._status.in_(
+                [
+                    PersistedEventStatus.PENDING.value,
+                    PersistedEventStatus.PROCESSING.value,
+                ]
+            ),
+        )
+
+        stmt = (
+            select(PersistedEvent)
+            .where(
+                PersistedEvent.queue == queue.value,
+                or_(
+                    PersistedEvent._status == PersistedEventStatus.PENDING.value,
+                    # lease expired, the worker holding it is gone
+                    (PersistedEvent._status == PersistedEventStatus.PROCESSING.value)
+                    & (PersistedEvent.lease_expire_at < now),
+                ),
+                or_(PersistedEvent.partition_key.is_(None), ~has_previous_event),
+            )
+            .order_by(*dequeue_order(now))
+            .limit(1)
+            .with_for_update(skip_locked=True, of=PersistedEvent)
+        )
+
+        if event := self.session.scalar(stmt):
+            event.status = PersistedEventStatus.PROCESSING
+            event.leased_by = worker_id
+            event.lease_expire_at = now + lease_duration
+            event.acked_at = now
+
+        return event
+
+    def renew_lease(
+        self, *, event_id: int, worker_id: str, lease_duration: int
+    ) -> bool:
+        result = self.session.execute(
+            update(PersistedEvent)
+            .where(
+                PersistedEvent.id == event_id,
+                PersistedEvent.leased_by == worker_id,
+                PersistedEvent._status == PersistedEventStatus.PROCESSING.value,
+            )
+            .values(lease_expire_at=int(time.time()) + lease_duration)
+        )
+
+        # false once another worker reclaimed it
+        return cast(CursorResult, result).rowcount > 0
+
+    def record_sent_transaction(
+        self, *, event_id: int, worker_id: str, tx_hash: str
+    ) -> None:
+        stmt = (
+            select(PersistedEvent)
+            .where(
+                PersistedEvent.id == event_id,
+                PersistedEvent.leased_by == worker_id,
+            )
+            .with_for_update()
+        )
+
+        if event := self.session.scalar(stmt):
+            event.execution_data = {
+                **event.execution_data,
+                "sent_transactions": [
+                    *event.execution_data.get("sent_transactions", []),
+                    tx_hash,
+                ],
+            }
+
     def get_event_by_id(self, event_id: int) -> PersistedEvent | None:
         stmt = select(PersistedEvent).where(PersistedEvent.id == event_id)
 
         return self.session.scalar(stmt)
 
+    def get_events_by_ids(self, event_ids: list[int]) -> Iterable[PersistedEvent]:
+        stmt = select(PersistedEvent).where(PersistedEvent.id.in_(event_ids))
+
+        return self.session.scalars(stmt)
+
+    def get_archived_event_by_id(self, event_id: int) -> ArchivedEvent | None:
+        stmt = select(ArchivedEvent).where(ArchivedEvent.id == event_id)
+
+        return self.session.scalar(stmt)
+
+    def _create_archive_partition(self, month_start: datetime) -> None:
+        month_end = (
+            month_start.replace(year=month_start.year + 1, month=1)
+            if month_start.month == 12
+            else month_start.replace(month=month_start.month + 1)
+        )
+
+        self.session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS "
+                f"{ArchivedEvent.__tablename__}_{month_start:%Y_%m} "
+                f"PARTITION OF {ArchivedEvent.__tablename__} FOR VALUES "
+                f"FROM ({int(month_start.timestamp())}) TO ({int(month_end.timestamp())})"
+            )
+        )
+
+    def archive_events(self, *, older_than: int, batch_size: int = 500) -> int:
+        # finished events created before older_than move to the archive table,
+        # the hot table only keeps pending and recent events
+        candidates = self.session.execute(
+            select(PersistedEvent.id, PersistedEvent.created_at)
+            .where(
+                PersistedEvent._status.in_(ARCHIVABLE_STATUSES),
+                PersistedEvent.created_at < older_than,
+            )
+            .order_by(PersistedEvent.id.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        if not candidates:
+            return 0
+
+        months = {
+            datetime.fromtimestamp(created_at, tz=timezone.utc).replace(
+                day=1, hour=0, minute=0, second=0, microsecond=0
+            )
+            for _, created_at in candidates
+        }
+        for month_start in sorted(months):
+            self._create_archive_partition(month_start)
+
+        columns = [column.name for column in PersistedEvent.__table__.columns]
+        moved_events = (
+            delete(PersistedEvent)
+            .where(PersistedEvent.id.in_([event_id for event_id, _ in candidates]))
+            .returning(*PersistedEvent.__table__.columns)
+            .cte("moved_events")
+        )
+
+        self.session.execute(
+            insert(ArchivedEvent).from_select(
+                [*columns, "archived_at"],
+                select(
+                    *[moved_events.c[column] for column in columns],
+                    literal(int(time.time())),
+                ),
+            )
+        )
+
+        return len(candidates)
+
     def ack_event(self, event: PersistedEvent) -> None:
         event.acked_at = int(time.time())
 
-    def complete_event(self, event: PersistedEvent, execution_data: dict = {}) -> None:
-        event.completed_at = int(time.time())
-        event.status = PersistedEventStatus.COMPLETED
-        event.execution_data = execution_data
+    def _finish_event(
+        self,
+        event: PersistedEvent,
+        status: PersistedEventStatus,
+        execution_data: dict,
+        worker_id: str | None = None,
+    ) -> bool:
+        if worker_id is not None:
+            # the row lock keeps it from being reclaimed until committed, once
+            # reclaimed the outcome belongs to the worker holding the lease
+            self.session.refresh(event, with_for_update=True)
+            if (
+                event.leased_by != worker_id
+                or event.status != PersistedEventStatus.PROCESSING
+            ):
+                return False
 
-    def fail_event(self, event: PersistedEvent, execution_data: dict = {}) -> None:
         event.completed_at = int(time.time())
-        event.status = PersistedEventStatus.FAILED
-        event.execution_data = execution_data
+        event.status = status
+        event.execution_data = {**event.execution_data, **execution_data}
+
+        # wakes up the completion waiters once committed
+        notify(
+            self.session,
+            COMPLETED_EVENTS_CHANNEL,
+            f"{event.id}:{status.value}:{event.queue}:{event.partition_key or ''}",
+        )
+
+        return True
 
-    def expire_event(self, event: PersistedEvent) -> None:
-        event.status = PersistedEventStatus.EXPIRED
+    def complete_event(
+        self,
+        event: PersistedEvent,
+        execution_data: dict = {},
+        worker_id: str | None = None,
+    ) -> bool:
+        return self._finish_event(
+            event, PersistedEventStatus.COMPLETED, execution_data, worker_id
+        )
+
+    def fail_event(
+        self,
+        event: PersistedEvent,
+        execution_data: dict = {},
+        worker_id: str | None = None,
+    ) -> bool:
+        return self._finish_event(
+            event, PersistedEventStatus.FAILED, execution_data, worker_id
+        )
+
+    def expire_event(
+        self,
+        event: PersistedEvent,
+        execution_data: dict = {},
+        worker_id: str | None = None,
+    ) -> bool:
+        return self._finish_event(
+            event, PersistedEventStatus.EXPIRED, execution_data, worker_id
+        )
 
     def get_events(
         self,
@@ -60,22 +364,30 @@ class EventStore:
         queue: Queue | None = None,
         limit: int | None = None,
         skip: int | None = None,
+        before_id: int | None = None,
         order_by: str = "-created_at",
-    ) -> Iterable[PersistedEvent]:
+        archived: bool = False,
+    ) -> Iterable[EventColumns]:
+        model: type[PersistedEvent] | type[ArchivedEvent] = (
+            ArchivedEvent if archived else PersistedEvent
+        )
 
-        stmt = select(PersistedEvent)
+        stmt = select(model)
 
         if status:
-            stmt = stmt.where(PersistedEvent._status == status.value)
+            stmt = stmt.where(model._status == status.value)
 
         if queue:
-            stmt = stmt.where(PersistedEvent.queue == queue.value)
+            stmt = stmt.where(model.queue == queue.value)
 
-        if order_by.endswith("created_at"):
+        if before_id is not None:
+            # keyset pagination, doesn't slow down with the page number like skip
+            stmt = stmt.where(model.id < before_id).order_by(model.id.desc())
+        elif order_by.endswith("created_at"):
             if order_by.startswith("-"):
-                stmt = stmt.order_by(PersistedEvent.created_at.desc())
+                stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
             else:
-                stmt = stmt.order_by(PersistedEvent.created_at.asc())
+                stmt = stmt.order_by(model.created_at.asc(), model.id.asc())
 
         if limit:
             stmt = stmt.limit(limit)
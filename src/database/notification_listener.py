@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import select
+import time
+from typing import Any
+
+from sqlalchemy import Engine, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+from models.event import Queue
+
+logger = logging.getLogger(__name__)
+
+
+class Notification:
+    def __init__(self, *, channel: str, payload: str) -> None:
+        self.channel = channel
+        self.payload = payload
+
+
+COMPLETED_EVENTS_CHANNEL = "events_completed"
+PAIR_QUOTES_CHANNEL = "pair_quotes"
+TRADE_SETTINGS_CHANNEL = "trade_settings"
+
+
+def queue_channel(queue: Queue) -> str:
+    return f"events_{queue.value.replace('-', '_')}"
+
+
+def notify(session: Session, channel: str, payload: str = "") -> None:
+    # NOTIFY is transactional, listeners only receive it once the session commits
+    session.execute(sql_select(func.pg_notify(channel, payload)))
+
+
+class NotificationListener:
+    def __init__(
+        self,
+        *,
+        engine: Engine,
+        channels: list[str],
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.engine = engine
+        self.channels = channels
+        self.reconnect_delay = reconnect_delay
+        self._connection: Any = None
+
+    def _get_connection(self) -> Any:
+        if self._connection is None:
+            pool_connection = self.engine.raw_connection()
+            connection: Any = pool_connection.driver_connection
+            # keep this connection out of the pool, it stays in LISTEN mode
+            pool_connection.detach()
+
+            connection.autocommit = True
+
+            with connection.cursor() as cursor:
+                for channel in self.channels:
+                    cursor.execute(f'LISTEN "{channel}"')
+
+            self._connection = connection
+
+        return self._connection
+
+    def listen(self) -> None:
+        self._get_connection()
+
+    def is_listening(self) -> bool:
+        # notifications sent while this is false are lost
+        return self._connection is not None
+
+    def _drain(self, connection: Any) -> list[Notification]:
+        connection.poll()
+        notifications = [
+            Notification(channel=item.channel, payload=item.payload)
+            for item in connection.notifies
+        ]
+        connection.notifies.clear()
+
+        return notifications
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+
+            self._connection = None
+
+    def wait(self, timeout: float) -> list[Notification]:
+        try:
+            connection = self._get_connection()
+            if not connection.notifies:
+                select.select([connection], [], [], timeout)
+
+            return self._drain(connection)
+        except Exception:
+            logger.exception(f"Listener on {self.channels} lost its connection")
+            self.close()
+            time.sleep(min(timeout, self.reconnect_delay))
+
+            return []
+
+    async def wait_async(self, timeout: float) -> list[Notification]:
+        try:
+            connection = self._get_connection()
+            if not connection.notifies:
+                loop = asyncio.get_running_loop()
+                readable = asyncio.Event()
+                loop.add_reader(connection.fileno(), readable.set)
+
+                try:
+                    await asyncio.wait_for(readable.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    loop.remove_reader(connection.fileno())
+
+            return self._drain(connection)
+        except Exception:
+            logger.exception(f"Listener on {self.channels} lost its connection")
+            self.close()
+            await asyncio.sleep(min(timeout, self.reconnect_delay))
+
+            return []
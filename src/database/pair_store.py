@@ -1,8 +1,9 @@
-from typing import Iterable
+from typing import Iterable, Iterator, Sequence
 
-from sqlalchemy import delete, select
+from sqlalchemy import Row, and_, delete, func, or_, select, tuple_, update
 from sqlalchemy.orm import Session
 
+from database.notification_listener import PAIR_QUOTES_CHANNEL, notify
 from models.token import Pair, PairQuote, Token
 
 
@@ -14,6 +15,10 @@ class PairStore:
         stmt = select(Pair)
         return self.session.scalars(stmt)
 
+    def get_strategy_pairs(self) -> Iterable[Pair]:
+        stmt = select(Pair).where(Pair.strategy.is_not(None), Pair.strategy != "")
+        return self.session.scalars(stmt)
+
     def get_pairs(
         self,
         *,
@@ -55,6 +60,18 @@ class PairStore:
 
     def add_pair_quote(self, pair_quote: PairQuote) -> None:
         self.session.add(pair_quote)
+        # wakes up the strategies of this pair once committed
+        notify(self.session, PAIR_QUOTES_CHANNEL, pair_quote.pair_address)
+
+    def set_quote_checked_at(self, pair_addresses: list[str], checked_at: int) -> None:
+        if not pair_addresses:
+            return
+
+        self.session.execute(
+            update(Pair)
+            .where(Pair.address.in_(pair_addresses))
+            .values(quote_checked_at=checked_at)
+        )
 
     def get_pair_by_base_token_by_symbol(self, token_symbol: str) -> Pair | None:
         token_stmt = select(Token).where(Token.symbol.ilike(token_symbol))
@@ -73,6 +90,76 @@ class PairStore:
         )
         return self.session.scalar(stmt)
 
+    def get_latest_quotes(self, pair_addresses: list[str]) -> Iterable[PairQuote]:
+        stmt = (
+            select(PairQuote)
+            .where(PairQuote.pair_address.in_(pair_addresses))
+            .distinct(PairQuote.pair_address)
+            .order_by(PairQuote.pair_address, PairQuote.timestamp.desc())
+        )
+        return self.session.scalars(stmt)
+
+    def get_recent_quote_rows(
+        self, since_by_pair: dict[str, tuple[int, int]], *, limit_per_pair: int
+    ) -> Iterable[Row[tuple[str, int, int, int, float | None]]]:
+        # (pair, timestamp, quote id, price, 5 minutes volume) of the latest
+        # quotes after the pair (timestamp, quote id), at most limit_per_pair
+        # for each pair, oldest first; a quote stored in the same second as
+        # the last one read is still returned
+        recent_quotes = (
+            select(
+                PairQuote.pair_address,
+                PairQuote.timestamp,
+                PairQuote.pair_quote_id,
+                PairQuote.price,
+                PairQuote.data["volume"]["m5"].as_float().label("volume"),
+                func.row_number()
+                .over(
+                    partition_by=PairQuote.pair_address,
+                    order_by=(
+                        PairQuote.timestamp.desc(),
+                        PairQuote.pair_quote_id.desc(),
+                    ),
+                )
+                .label("row_number"),
+            )
+            .where(
+                or_(
+                    *(
+                        and_(
+                            PairQuote.pair_address == pair_address,
+                            PairQuote.timestamp >= since_timestamp,
+                            or_(
+                                PairQuote.timestamp > since_timestamp,
+                                PairQuote.pair_quote_id > since_quote_id,
+                            ),
+                        )
+                        for pair_address, (
+                            since_timestamp,
+                            since_quote_id,
+                        ) in since_by_pair.items()
+                    )
+                )
+            )
+            .subquery()
+        )
+        stmt = (
+            select(
+                recent_quotes.c.pair_address,
+                recent_quotes.c.timestamp,
+                recent_quotes.c.pair_quote_id,
+                recent_quotes.c.price,
+                recent_quotes.c.volume,
+            )
+            .where(recent_quotes.c.row_number <= limit_per_pair)
+            .order_by(
+                recent_quotes.c.pair_address,
+                recent_quotes.c.timestamp,
+                recent_quotes.c.pair_quote_id,
+            )
+        )
+        return self.session.execute(stmt).tuples()
+
     def get_quote_by_data_hash(
         self, pair_address: str, data_hash: str
     ) -> PairQuote | None:
@@ -85,6 +172,19 @@ class PairStore:
         )
         return self.session.scalar(stmt)
 
+    def get_existing_quote_hashes(
+        self, pair_hashes: list[tuple[str, str]]
+    ) -> set[tuple[str, str]]:
+        if not pair_hashes:
+            return set()
+
+        stmt = (
+            select(PairQuote.pair_address, PairQuote.data_hash)
+            .where(tuple_(PairQuote.pair_address, PairQuote.data_hash).in_(pair_hashes))
+            .distinct()
+        )
+        return {(row[0], row[1]) for row in self.session.execute(stmt)}
+
     def clean_quotes_before_timestamp(self, before: int) -> None:
         stmt = delete(PairQuote).where(PairQuote.timestamp <= before)
         self.session.execute(stmt)
@@ -95,3 +195,29 @@ class PairStore:
 
         stmt = delete(Pair).where(Pair.address == pair_address)
         self.session.execute(stmt)
+
+    def iter_quote_prices(
+        self,
+        *,
+        pair_addresses: list[str] | None = None,
+        since: int | None = None,
+        until: int | None = None,
+        chunk_size: int = 10000,
+    ) -> Iterator[Sequence[Row[tuple[str, int, int]]]]:
+        # server side cursor fetched in chunks of plain rows, ordered by pair
+        # then timestamp
+        stmt = select(
+            PairQuote.pair_address, PairQuote.timestamp, PairQuote.price
+        ).order_by(PairQuote.pair_address, PairQuote.timestamp, PairQuote.pair_quote_id)
+
+        if pair_addresses is not None:
+            stmt = stmt.where(PairQuote.pair_address.in_(pair_addresses))
+
+        if since is not None:
+            stmt = stmt.where(PairQuote.timestamp >= since)
+
+        if until is not None:
+            stmt = stmt.where(PairQuote.timestamp < until)
+
+        result = self.session.execute(stmt.execution_options(yield_per=chunk_size))
+        yield from result.partitions()
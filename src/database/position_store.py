@@ -22,6 +22,12 @@ class PositionStore:
         )
         return self.session.scalar(stmt)
 
+    def get_positions_by_pair_addresses(
+        self, pair_addresses: list[str]
+    ) -> Iterable[Position]:
+        stmt = select(Position).where(Position.pair_address.in_(pair_addresses))
+        return self.session.scalars(stmt)
+
     def add_position(self, position: Position) -> None:
         self.session.add(position)
 
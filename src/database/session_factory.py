@@ -1,17 +1,69 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import Session
 
 from models.base import Base
 
+# create_all doesn't alter existing tables, columns added after a table
+# was first created are listed here as (table, column, column ddl)
+SCHEMA_UPGRADES: list[tuple[str, str, str]] = [
+    ("events", "partition_key", "VARCHAR"),
+    ("events", "leased_by", "VARCHAR"),
+    ("events", "lease_expire_at", "INTEGER"),
+    ("events", "priority", "INTEGER NOT NULL DEFAULT 0"),
+    ("events", "coalesce_key", "VARCHAR"),
+    ("pair_quotes", "block_number", "NUMERIC"),
+    ("pairs", "quote_checked_at", "INTEGER"),
+]
+
+# statements are idempotent and run after the columns are added
+SCHEMA_UPGRADE_STATEMENTS: list[str] = [
+    "CREATE INDEX IF NOT EXISTS ix_events_queue_status_created_at ON events (queue, status, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_events_partition_key ON events (partition_key)",
+    "CREATE INDEX IF NOT EXISTS ix_events_coalesce_key ON events (coalesce_key)",
+    "CREATE INDEX IF NOT EXISTS ix_pair_quotes_pair_address_timestamp ON pair_quotes (pair_address, timestamp)",
+    # only the latest state of a pair strategy was ever read
+    """
+    DELETE FROM strategy_states WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY pair_address, strategy_name
+                ORDER BY coalesce(updated_at, created_at) DESC, id DESC
+            ) AS position FROM strategy_states
+        ) AS ranked_states WHERE position > 1
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_strategy_states_pair_address_strategy_name ON strategy_states (pair_address, strategy_name)",
+]
+
 
 class SessionFactory:
     def __init__(self, connection_string: str) -> None:
         self.connection_string = connection_string
         self.engine = create_engine(self.connection_string)
         self._create_all()
+        self._upgrade_schema()
 
     def _create_all(self) -> None:
         Base.metadata.create_all(self.engine)
 
+    def _upgrade_schema(self) -> None:
+        inspector = inspect(self.engine)
+        columns_by_table: dict[str, set[str]] = {}
+
+        with self.engine.begin() as connection:
+            for table, column, column_ddl in SCHEMA_UPGRADES:
+                if table not in columns_by_table:
+                    columns_by_table[table] = {
+                        db_column["name"] for db_column in inspector.get_columns(table)
+                    }
+
+                if column not in columns_by_table[table]:
+                    connection.execute(
+                        text(f"ALTER TABLE {table} ADD COLUMN {column} {column_ddl}")
+                    )
+
+            for statement in SCHEMA_UPGRADE_STATEMENTS:
+                connection.execute(text(statement))
+
     def session(self) -> Session:
         return Session(self.engine, expire_on_commit=False)
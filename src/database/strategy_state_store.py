@@ -1,6 +1,8 @@
 import time
+from typing import Iterable
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from models.strategy_state import StrategyState
@@ -11,31 +13,42 @@ class StrategyStateStore:
         self.session = session
 
     def add_or_update_state(self, strategy_state: StrategyState) -> None:
-        stmt = (
-            select(StrategyState)
-            .where(
-                StrategyState.pair_address == strategy_state.pair_address,
-                StrategyState.strategy_name == strategy_state.strategy_name,
-            )
-            .order_by(StrategyState.updated_at.desc())
+        self.upsert_states([strategy_state])
+
+    def upsert_states(self, strategy_states: list[StrategyState]) -> None:
+        if not strategy_states:
+            return
+
+        stmt = insert(StrategyState).values(
+            [
+                {
+                    "pair_address": strategy_state.pair_address,
+                    "strategy_name": strategy_state.strategy_name,
+                    "data": strategy_state.data,
+                    "created_at": strategy_state.created_at,
+                    "updated_at": strategy_state.updated_at,
+                }
+                for strategy_state in strategy_states
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StrategyState.pair_address, StrategyState.strategy_name],
+            set_={"data": stmt.excluded.data, "updated_at": int(time.time())},
         )
-        db_strategy_state = self.session.scalar(stmt)
 
-        if db_strategy_state:
-            db_strategy_state.data = strategy_state.data
-            db_strategy_state.updated_at = int(time.time())
-        else:
-            self.session.add(strategy_state)
+        self.session.execute(stmt)
 
     def get_last_state(
         self, *, pair_address: str, strategy_name: str
     ) -> StrategyState | None:
-        stmt = (
-            select(StrategyState)
-            .where(
-                StrategyState.pair_address == pair_address,
-                StrategyState.strategy_name == strategy_name,
-            )
-            .order_by(StrategyState.updated_at.desc())
+        stmt = select(StrategyState).where(
+            StrategyState.pair_address == pair_address,
+            StrategyState.strategy_name == strategy_name,
         )
         return self.session.scalar(stmt)
+
+    def get_last_states(self, pair_addresses: list[str]) -> Iterable[StrategyState]:
+        stmt = select(StrategyState).where(
+            StrategyState.pair_address.in_(pair_addresses)
+        )
+        return self.session.scalars(stmt)
@@ -3,6 +3,7 @@ from typing import Iterable
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from database.notification_listener import TRADE_SETTINGS_CHANNEL, notify
 from models.trade_setting import TradeSetting, TradeSettingName
 
 
@@ -20,3 +21,11 @@ class TradeSettingStore:
 
     def add_setting(self, trade_setting: TradeSetting) -> None:
         self.session.add(trade_setting)
+        # cached settings of every process are invalidated once committed
+        notify(self.session, TRADE_SETTINGS_CHANNEL, trade_setting.name.value)
+
+    def update_setting(
+        self, trade_setting: TradeSetting, value: str | int | float
+    ) -> None:
+        trade_setting.value = str(value)
+        notify(self.session, TRADE_SETTINGS_CHANNEL, trade_setting.name.value)
@@ -1,7 +1,17 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from typing import List
 
 import pydantic
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from ext_api.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
 
 
 class Token(pydantic.BaseModel):
@@ -58,17 +68,124 @@ class PairsResponse(pydantic.BaseModel):
     pairs: List[DexPair]
 
 
+class DexScreenerClient:
+    # the pairs endpoint takes at most 30 addresses and 300 requests a minute
+    MAX_PAIRS_PER_REQUEST = 30
+
+    def __init__(
+        self,
+        *,
+        root_uri: str = "https://api.dexscreener.com/latest/dex/",
+        max_workers: int = 8,
+        requests_per_minute: int = 300,
+        burst: int = 20,
+        timeout: tuple[float, float] = (3.05, 10.0),
+        retries: int = 3,
+    ) -> None:
+        self.root_uri = root_uri
+        self.timeout = timeout
+        self.retries = retries
+        self.rate_limiter = TokenBucket(rate=requests_per_minute / 60, capacity=burst)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="dexscreener"
+        )
+
+        # keep-alive connections shared by the fetching threads
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_workers,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                # 429 is retried by _get_chunk, every attempt paced by the bucket
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET"],
+            ),
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _get_retry_after(self, resp: requests.Response, attempt: int) -> float:
+        try:
+            return float(resp.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return 0.5 * 2**attempt
+
+    def _get_chunk(self, pair_addresses: list[str], chain: str) -> PairsResponse:
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire()
+
+            resp = self.session.get(
+                f"{self.root_uri}pairs/{chain}/{','.join(pair_addresses)}",
+                timeout=self.timeout,
+            )
+            if resp.status_code != 429 or attempt == self.retries:
+                break
+
+            retry_after = self._get_retry_after(resp, attempt)
+            logger.warning(f"Rate limited by DexScreener, retrying in {retry_after}s")
+            time.sleep(retry_after)
+
+        resp.raise_for_status()
+
+        content = resp.json()
+        # unknown addresses come back as null pairs
+        content["pairs"] = content.get("pairs") or []
+
+        return PairsResponse.model_validate(content)
+
+    def get_pairs(
+        self, pair_addresses: List[str], chain: str = "base"
+    ) -> PairsResponse:
+        chunks = [
+            pair_addresses[index : index + self.MAX_PAIRS_PER_REQUEST]
+            for index in range(0, len(pair_addresses), self.MAX_PAIRS_PER_REQUEST)
+        ]
+        if len(chunks) == 1:
+            return self._get_chunk(chunks[0], chain)
+
+        # chunks beyond max_workers wait for a free thread, 500 pairs are 17
+        # chunks fetched in three waves over 8 workers
+        futures = [
+            self.executor.submit(self._get_chunk, chunk, chain) for chunk in chunks
+        ]
+
+        # a failed chunk only drops its own pairs from the refresh
+        pairs: list[DexPair] = []
+        schema_version = ""
+        for future in futures:
+            try:
+                response = future.result()
+            except Exception:
+                logger.exception("Unable to fetch a chunk of pairs from DexScreener")
+                continue
+
+            schema_version = response.schemaVersion
+            pairs.extend(response.pairs)
+
+        return PairsResponse(schemaVersion=schema_version, pairs=pairs)
+
+
+_client: DexScreenerClient | None = None
+_client_lock = Lock()
+
+
+def get_dexscreener_client() -> DexScreenerClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DexScreenerClient()
+
+        return _client
+
+
 class DexScreener:
-    ROOT_URI = "https://api.dexscreener.com/latest/dex/"
     UI_URI = "https://dexscreener.com/"
 
     @staticmethod
     def get_pairs(pair_addresses: List[str], chain: str = "base") -> PairsResponse:
-        resp = requests.get(
-            f"{DexScreener.ROOT_URI}pairs/{chain}/{','.join(pair_addresses)}"
-        )
-        content = resp.content.decode()
-        return PairsResponse.model_validate_json(content)
+        return get_dexscreener_client().get_pairs(pair_addresses, chain)
 
     @staticmethod
     def get_pair_link(chain_name: str, pair_address: str) -> str:
@@ -0,0 +1,32 @@
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    def __init__(self, *, rate: float, capacity: float) -> None:
+        # rate tokens per second, bursts up to capacity
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        # 0 when acquired, otherwise the seconds to wait before retrying
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while wait := self.try_acquire(tokens):
+            time.sleep(wait)
@@ -1,7 +1,8 @@
-from enum import StrEnum
-from typing import Any, Type, TypedDict, cast
+from enum import IntEnum, StrEnum
+from typing import Any, Final, Type, TypedDict, cast
 
 from pydantic import BaseModel
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -166,16 +167,138 @@ EVENT_CONSTRUCT: dict[EventType, Type] = {
 }
 
 
+def get_partition_key(event_type: EventType, data: dict[str, Any]) -> str | None:
+    # events sharing a partition key are executed strictly in order
+    if event_type in (EventType.BUY, EventType.SELL) and "pair" in data:
+        return str(data["pair"])
+
+    return None
+
+
+def get_coalesce_key(event_type: EventType, data: dict[str, Any]) -> str | None:
+    # a pending event with the same coalesce key absorbs the new one
+    if event_type == EventType.UPDATE_BALANCES:
+        return event_type.value
+
+    if event_type == EventType.SELL and "pair" in data:
+        return f"{event_type.value}:{data['pair']}"
+
+    return None
+
+
+def merge_event_data(
+    event_type: EventType, current: dict[str, Any], new: dict[str, Any]
+) -> dict[str, Any]:
+    if event_type == EventType.UPDATE_BALANCES:
+        current_addresses = current.get("addresses", [])
+        new_addresses = new.get("addresses", [])
+
+        # no addresses means every token balance is refreshed
+        if not current_addresses or not new_addresses:
+            return {**current, "addresses": []}
+
+        return {
+            **current,
+            "addresses": list(dict.fromkeys([*current_addresses, *new_addresses])),
+        }
+
+    if event_type == EventType.SELL:
+        merged = {**current, "value": max(int(current["value"]), int(new["value"]))}
+        slippages = [
+            float(slippage)
+            for slippage in (current.get("slippage"), new.get("slippage"))
+            if slippage is not None
+        ]
+        if slippages:
+            merged["slippage"] = max(slippages)
+
+        if new.get("quote_timestamp") is not None:
+            merged["quote_timestamp"] = max(
+                int(current.get("quote_timestamp") or 0), int(new["quote_timestamp"])
+            )
+
+        return merged
+
+    raise Exception(f"Event type {event_type} can't be merged")
+
+
+class EventPriority(IntEnum):
+    UPDATE_BALANCES = 0
+    WRAP = 1
+    BUY = 2
+    SELL = 3
+    # sell pushed by a strategy to exit a position (stop loss, take profit)
+    PROTECTIVE_SELL = 4
+
+
+DEFAULT_EVENT_PRIORITY: dict[EventType, EventPriority] = {
+    EventType.UPDATE_BALANCES: EventPriority.UPDATE_BALANCES,
+    EventType.WRAP: EventPriority.WRAP,
+    EventType.BUY: EventPriority.BUY,
+    EventType.SELL: EventPriority.SELL,
+}
+
+
+def get_default_priority(event_type: EventType) -> EventPriority:
+    return DEFAULT_EVENT_PRIORITY.get(event_type, EventPriority.UPDATE_BALANCES)
+
+
+def is_exit_event(event_type: EventType) -> bool:
+    return event_type == EventType.SELL
+
+
+# a buy is only worth executing while the price it was decided on is fresh,
+# exits are never dropped, the sell handler prices them with a new quote
+BUY_EVENT_TTL: Final[int] = 30
+MAX_QUOTE_AGE: Final[int] = 60
+
+
+class ShedReason(StrEnum):
+    DEADLINE = "deadline"
+    STALE_QUOTE = "stale-quote"
+
+
+def get_default_deadline(event_type: EventType, created_at: int) -> int | None:
+    if event_type == EventType.BUY:
+        return created_at + BUY_EVENT_TTL
+
+    return None
+
+
+def get_quote_age(data: dict[str, Any], now: int) -> int | None:
+    if (quote_timestamp := data.get("quote_timestamp")) is None:
+        return None
+
+    return now - int(quote_timestamp)
+
+
+def get_shed_reason(
+    *,
+    event_type: EventType,
+    expire_at: int | None,
+    data: dict[str, Any],
+    now: int,
+) -> ShedReason | None:
+    if expire_at is not None and expire_at <= now:
+        return ShedReason.DEADLINE
+
+    quote_age = get_quote_age(data, now)
+    if event_type == EventType.BUY and quote_age is not None:
+        if quote_age > MAX_QUOTE_AGE:
+            return ShedReason.STALE_QUOTE
+
+    return None
+
+
 class PersistedEventStatus(StrEnum):
     PENDING = "pending"
+    PROCESSING = "processing"
     EXPIRED = "expired"
     COMPLETED = "completed"
     FAILED = "failed"
 
 
-class PersistedEvent(Base):
-    __tablename__ = "events"
-
+class EventColumns:
     id: Mapped[int] = mapped_column(primary_key=True)
     queue: Mapped[str] = mapped_column(nullable=False)
 
@@ -191,6 +314,48 @@ class PersistedEvent(Base):
 
     execution_data: Mapped[dict] = mapped_column(JSONB, nullable=False)
 
+    partition_key: Mapped[str | None] = mapped_column(nullable=True)
+    leased_by: Mapped[str | None] = mapped_column(nullable=True)
+    lease_expire_at: Mapped[int | None] = mapped_column(nullable=True)
+    priority: Mapped[int] = mapped_column(nullable=False, default=0)
+    coalesce_key: Mapped[str | None] = mapped_column(nullable=True)
+
+    @property
+    def status(self) -> PersistedEventStatus:
+        return PersistedEventStatus(self._status)
+
+    @status.setter
+    def status(self, value: PersistedEventStatus) -> None:
+        self._status = value.value
+
+    def asdict(self) -> dict:
+        return {
+            "id": self.id,
+            "queue": self.queue,
+            "event_type": self.event_type,
+            "data": self.data,
+            "execution_data": self.execution_data,
+            "status": self._status,
+            "created_at": self.created_at,
+            "acked_at": self.acked_at,
+            "expire_at": self.expire_at,
+            "completed_at": self.completed_at,
+            "partition_key": self.partition_key,
+            "leased_by": self.leased_by,
+            "lease_expire_at": self.lease_expire_at,
+            "priority": self.priority,
+            "coalesce_key": self.coalesce_key,
+        }
+
+
+class PersistedEvent(EventColumns, Base):
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_queue_status_created_at", "queue", "status", "created_at"),
+        Index("ix_events_partition_key", "partition_key"),
+        Index("ix_events_coalesce_key", "coalesce_key"),
+    )
+
     def __init__(
         self,
         *,
@@ -203,6 +368,9 @@ class PersistedEvent(Base):
         acked_at: int | None = None,
         expire_at: int | None = None,
         completed_at: int | None = None,
+        partition_key: str | None = None,
+        priority: int | None = None,
+        coalesce_key: str | None = None,
     ) -> None:
         self.queue = queue
         self.event_type = event_type
@@ -211,30 +379,35 @@ class PersistedEvent(Base):
         self.status = status
         self.created_at = created_at
         self.acked_at = acked_at
-        self.expire_at = expire_at
+        self.expire_at = (
+            expire_at
+            if expire_at is not None
+            else get_default_deadline(EventType(event_type), created_at)
+        )
         self.completed_at = completed_at
+        self.partition_key = partition_key
+        self.priority = (
+            priority
+            if priority is not None
+            else get_default_priority(EventType(event_type))
+        )
+        self.coalesce_key = coalesce_key
+        self.leased_by = None
+        self.lease_expire_at = None
 
-    @property
-    def status(self) -> PersistedEventStatus:
-        return PersistedEventStatus(self._status)
 
-    @status.setter
-    def status(self, value: PersistedEventStatus) -> None:
-        self._status = value.value
+# finished events are moved here by the archiver, partitioned by month
+class ArchivedEvent(EventColumns, Base):
+    __tablename__ = "events_archive"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+    # the partition key has to be part of the primary key
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    created_at: Mapped[int] = mapped_column(primary_key=True)
+    archived_at: Mapped[int] = mapped_column(nullable=False)
 
     def asdict(self) -> dict:
-        return {
-            "id": self.id,
-            "queue": self.queue,
-            "event_type": self.event_type,
-            "data": self.data,
-            "execution_data": self.execution_data,
-            "status": self._status,
-            "created_at": self.created_at,
-            "acked_at": self.acked_at,
-            "expire_at": self.expire_at,
-            "completed_at": self.completed_at,
-        }
+        return {**super().asdict(), "archived_at": self.archived_at}
 
 
 class EventBuilder:
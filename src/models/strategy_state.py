@@ -1,6 +1,7 @@
 from enum import StrEnum
 from typing import Any
 
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -9,6 +10,14 @@ from models.base import Base
 
 class StrategyState(Base):
     __tablename__ = "strategy_states"
+    __table_args__ = (
+        Index(
+            "ux_strategy_states_pair_address_strategy_name",
+            "pair_address",
+            "strategy_name",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -7,7 +7,7 @@ from typing import Any
 
 from hexbytes import HexBytes
 from pydantic import BaseModel
-from sqlalchemy import NUMERIC, BigInteger, ForeignKey
+from sqlalchemy import NUMERIC, BigInteger, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -150,6 +150,10 @@ class Pair(Base):
 
     strategy: Mapped[str | None] = mapped_column(nullable=True)
 
+    # last time a quote was fetched, a quote identical to the stored one isn't
+    # stored again and the latest quote can be much older than that
+    quote_checked_at: Mapped[int | None] = mapped_column(nullable=True)
+
     def __init__(
         self,
         address: str,
@@ -217,6 +221,9 @@ class PairPriceAlert(Base):
 
 class PairQuote(Base):
     __tablename__ = "pair_quotes"
+    __table_args__ = (
+        Index("ix_pair_quotes_pair_address_timestamp", "pair_address", "timestamp"),
+    )
 
     pair_quote_id: Mapped[int] = mapped_column(primary_key=True)
     pair_address: Mapped[str] = mapped_column(ForeignKey("pairs.address"))
@@ -226,6 +233,8 @@ class PairQuote(Base):
     data_hash: Mapped[str] = mapped_column(nullable=False)
 
     timestamp: Mapped[int] = mapped_column(nullable=False)
+    # set when read on-chain
+    block_number: Mapped[int | None] = mapped_column(NUMERIC, nullable=True)
 
     def _hash_data(self) -> str:
         return hashlib.sha256(json.dumps(self.data).encode()).hexdigest()
@@ -237,6 +246,7 @@ class PairQuote(Base):
         price: int,
         data: dict,
         timestamp: int,
+        block_number: int | None = None,
     ) -> None:
 
         self.pair_address = pair_address
@@ -244,6 +254,21 @@ class PairQuote(Base):
         self.data = data
         self.data_hash = self._hash_data()
         self.timestamp = timestamp
+        self.block_number = block_number
+
+
+def get_quote_timestamp(pair: Pair, latest_quote: PairQuote | None) -> int | None:
+    # when the latest quote was last known to be the current price
+    timestamps = [
+        timestamp
+        for timestamp in (
+            latest_quote.timestamp if latest_quote else None,
+            pair.quote_checked_at,
+        )
+        if timestamp is not None
+    ]
+
+    return max(timestamps) if timestamps else None
 
 
 class PositionMetric(BaseModel):
@@ -1,38 +1,104 @@
-from decimal import Decimal
+from decimal import Context, Decimal
+from typing import Sequence
 
-from models.token import PairQuote, Position, PositionMetric, Token
-from web3_helper.helper import Web3Client
+import numpy as np
 
+from models.token import Pair, PairQuote, Position, PositionMetric, Token
 
-def get_position_metric(
+WEI_PER_ETHER = 10**18
+
+# same precision as web3 from_wei, divisions by 10**18 are exact
+_WEI_CONTEXT = Context(prec=999)
+_WEI_PER_ETHER_DECIMAL = Decimal(WEI_PER_ETHER)
+
+
+def _from_wei(value: int) -> Decimal:
+    return _WEI_CONTEXT.divide(Decimal(value), _WEI_PER_ETHER_DECIMAL)
+
+
+def get_position_metrics(
     *,
-    position: Position,
-    web3_client: Web3Client,
-    base_token: Token,
-    latest_quote: PairQuote
-) -> PositionMetric:
-    web3 = web3_client.web3
+    balances: Sequence[int],
+    decimals: Sequence[int],
+    book_values: Sequence[int],
+    prices: Sequence[int],
+) -> list[PositionMetric]:
+    # wei amounts overflow int64, they are kept as python ints in object
+    # arrays so market value and pnl stay exact. object arrays run a python
+    # loop per element, not simd, only the float percent is a native array op
+    balances_array = np.array(balances, dtype=object)
+    book_values_array = np.array(book_values, dtype=object)
+    prices_array = np.array(prices, dtype=object)
+    units_array = np.array([10**decimal for decimal in decimals], dtype=object)
 
-    position_market_value = Decimal(
-        base_token.balance_biggest() * web3.from_wei(latest_quote.price, "ether")
-    )
-    price_paid = Decimal(web3.from_wei(position.book_value, "ether"))
+    market_values_wei = (balances_array // units_array) * prices_array
+    profit_n_loss_wei = market_values_wei - book_values_array
 
-    profit_n_loss_wei = int(
-        web3.to_wei(position_market_value, "ether") - position.book_value
-    )
-    profit_n_loss_sign = int(-1 if profit_n_loss_wei < 0 else 1)
+    # int / int is correctly rounded, same floats as the Decimal conversion
+    profit_n_loss_ether = (profit_n_loss_wei / WEI_PER_ETHER).astype(np.float64)
+    price_paid_ether = (book_values_array / WEI_PER_ETHER).astype(np.float64)
 
-    profit_n_loss = Decimal(
-        web3.from_wei(abs(profit_n_loss_wei), "ether") * profit_n_loss_sign
-    )
-    profit_n_loss_percent = (
-        (float(profit_n_loss) / float(price_paid)) * 100.00 if price_paid != 0 else 0
+    profit_n_loss_percent = np.zeros(len(price_paid_ether), dtype=np.float64)
+    np.divide(
+        profit_n_loss_ether,
+        price_paid_ether,
+        out=profit_n_loss_percent,
+        where=price_paid_ether != 0,
     )
+    profit_n_loss_percent *= 100.00
+
+    return [
+        PositionMetric(
+            market_value=_from_wei(market_value_wei),
+            price_paid=_from_wei(book_value),
+            profit_and_loss=_from_wei(pnl_wei),
+            profit_and_loss_percent=pnl_percent,
+        )
+        for market_value_wei, book_value, pnl_wei, pnl_percent in zip(
+            market_values_wei.tolist(),
+            book_values_array.tolist(),
+            profit_n_loss_wei.tolist(),
+            profit_n_loss_percent.tolist(),
+        )
+    ]
 
-    return PositionMetric(
-        market_value=position_market_value,
-        price_paid=price_paid,
-        profit_and_loss=profit_n_loss,
-        profit_and_loss_percent=profit_n_loss_percent,
+
+def get_positions_metrics(
+    positions: Sequence[tuple[Position, Token, PairQuote]]
+) -> list[PositionMetric]:
+    return get_position_metrics(
+        balances=[int(base_token.balance) for _, base_token, _ in positions],
+        decimals=[base_token.decimals for _, base_token, _ in positions],
+        book_values=[int(position.book_value) for position, _, _ in positions],
+        prices=[int(latest_quote.price) for _, _, latest_quote in positions],
     )
+
+
+def get_pairs_position_metrics(
+    *,
+    pairs: Sequence[Pair],
+    positions: dict[str, Position],
+    tokens: dict[str, Token],
+    latest_quotes: dict[str, PairQuote],
+) -> dict[str, PositionMetric]:
+    # keyed by pair address, only pairs with an open position and a quote
+    pair_addresses: list[str] = []
+    metric_inputs: list[tuple[Position, Token, PairQuote]] = []
+    for pair in pairs:
+        position = positions.get(pair.address)
+        base_token = tokens.get(pair.base_address)
+        latest_quote = latest_quotes.get(pair.address)
+        if position and base_token and base_token.balance > 0 and latest_quote:
+            pair_addresses.append(pair.address)
+            metric_inputs.append((position, base_token, latest_quote))
+
+    return dict(zip(pair_addresses, get_positions_metrics(metric_inputs)))
+
+
+def get_position_metric(
+    *,
+    position: Position,
+    base_token: Token,
+    latest_quote: PairQuote,
+) -> PositionMetric:
+    return get_positions_metrics([(position, base_token, latest_quote)])[0]
@@ -0,0 +1,38 @@
+import logging
+
+from database.session_factory import SessionFactory
+from settings import SettingsFactory
+from tradebot.quote_ingestor import QuoteIngestor
+from tradebot.quote_sources import (
+    DexScreenerQuoteSource,
+    OnChainQuoteSource,
+    QuoteSource,
+)
+from web3_helper.helper import Web3Helper
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    ingestor_settings = SettingsFactory.get_quote_ingestor_settings()
+
+    db_session_factory = SessionFactory(ingestor_settings["database_uri"])
+
+    quote_source: QuoteSource = DexScreenerQuoteSource()
+    if ingestor_settings["quote_source"] == "onchain":
+        web3_provider_url = ingestor_settings["web3_provider_url"]
+        if not web3_provider_url:
+            raise Exception("On-chain quotes need WEB3_PROVIDER_URL")
+
+        quote_source = OnChainQuoteSource(
+            web3_client=Web3Helper.get_web3(web3_provider_url)
+        )
+
+    quote_ingestor = QuoteIngestor(
+        session_factory=db_session_factory,
+        shard_index=ingestor_settings["shard_index"],
+        shard_count=ingestor_settings["shard_count"],
+        interval=ingestor_settings["interval"],
+        quote_source=quote_source,
+    )
+
+    quote_ingestor.run()
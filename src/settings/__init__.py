@@ -12,6 +12,14 @@ class SettingsKey:
     LISTEN_CHANNEL_ID = "LISTEN_CHANNEL_ID"
     BASESCAN_API_KEY = "BASESCAN_API_KEY"
     USER_IDS = "USER_IDS"
+    TRADE_BOT_WORKERS = "TRADE_BOT_WORKERS"
+    EVENT_RETENTION_DAYS = "EVENT_RETENTION_DAYS"
+    QUOTE_SHARD_INDEX = "QUOTE_SHARD_INDEX"
+    QUOTE_SHARD_COUNT = "QUOTE_SHARD_COUNT"
+    QUOTE_INTERVAL = "QUOTE_INTERVAL"
+    QUOTE_SOURCE = "QUOTE_SOURCE"
+    APPROVAL_POLICY = "APPROVAL_POLICY"
+    APPROVAL_MULTIPLE = "APPROVAL_MULTIPLE"
 
     WEB_API_HOST = "WEB_API_HOST"
     WEB_API_KEY = "WEB_API_KEY"
@@ -44,6 +52,23 @@ class TradeBotSettings(TypedDict):
     wallet_private_key: str
     web3_provider_url: str
     basescan_api_key: str
+    trade_bot_workers: int
+    event_retention_days: int
+    approval_policy: str
+    approval_multiple: int
+
+
+class QuoteIngestorSettings(TypedDict):
+    database_uri: str
+    shard_index: int
+    shard_count: int
+    interval: float
+    quote_source: str
+    web3_provider_url: str | None
+
+
+class BacktestSettings(TypedDict):
+    database_uri: str
 
 
 class APISettings(TypedDict):
@@ -68,6 +93,13 @@ def must_get(setting_key: str) -> str:
 
 DEFAULT_WEB_API_HOST: Final[str] = "0.0.0.0"
 DEFAULT_WEB_API_URI: Final[str] = "http://localhost:5000/"
+DEFAULT_TRADE_BOT_WORKERS: Final[int] = 1
+DEFAULT_EVENT_RETENTION_DAYS: Final[int] = 7
+DEFAULT_QUOTE_SHARD_COUNT: Final[int] = 1
+DEFAULT_QUOTE_INTERVAL: Final[float] = 10.0
+DEFAULT_QUOTE_SOURCE: Final[str] = "dexscreener"
+DEFAULT_APPROVAL_POLICY: Final[str] = "multiple"
+DEFAULT_APPROVAL_MULTIPLE: Final[int] = 10
 
 
 class SettingsFactory:
@@ -106,4 +138,41 @@ class SettingsFactory:
             wallet_private_key=must_get(SettingsKey.WALLET_PRIVATE_KEY),
             web3_provider_url=must_get(SettingsKey.WEB3_PROVIDER_URL),
             basescan_api_key=must_get(SettingsKey.BASESCAN_API_KEY),
+            trade_bot_workers=int(
+                try_get(SettingsKey.TRADE_BOT_WORKERS) or DEFAULT_TRADE_BOT_WORKERS
+            ),
+            event_retention_days=int(
+                try_get(SettingsKey.EVENT_RETENTION_DAYS)
+                or DEFAULT_EVENT_RETENTION_DAYS
+            ),
+            approval_policy=try_get(SettingsKey.APPROVAL_POLICY)
+            or DEFAULT_APPROVAL_POLICY,
+            approval_multiple=int(
+                try_get(SettingsKey.APPROVAL_MULTIPLE) or DEFAULT_APPROVAL_MULTIPLE
+            ),
+        )
+
+    @staticmethod
+    def get_backtest_settings() -> BacktestSettings:
+        load_dotenv()
+
+        return BacktestSettings(
+            database_uri=must_get(SettingsKey.DATABASE_URI),
+        )
+
+    @staticmethod
+    def get_quote_ingestor_settings() -> QuoteIngestorSettings:
+        load_dotenv()
+
+        return QuoteIngestorSettings(
+            database_uri=must_get(SettingsKey.DATABASE_URI),
+            shard_index=int(try_get(SettingsKey.QUOTE_SHARD_INDEX) or 0),
+            shard_count=int(
+                try_get(SettingsKey.QUOTE_SHARD_COUNT) or DEFAULT_QUOTE_SHARD_COUNT
+            ),
+            interval=float(
+                try_get(SettingsKey.QUOTE_INTERVAL) or DEFAULT_QUOTE_INTERVAL
+            ),
+            quote_source=try_get(SettingsKey.QUOTE_SOURCE) or DEFAULT_QUOTE_SOURCE,
+            web3_provider_url=try_get(SettingsKey.WEB3_PROVIDER_URL),
         )
@@ -1,7 +1,16 @@
+import logging
+import time
+from threading import Lock, Thread
+
+from sqlalchemy import Engine
+
+from database.notification_listener import TRADE_SETTINGS_CHANNEL, NotificationListener
 from database.session_factory import SessionFactory
 from database.trade_setting_store import TradeSettingStore
 from models.trade_setting import TradeSetting, TradeSettingName
 
+logger = logging.getLogger(__name__)
+
 
 class TradeSettingsManager:
     DEFAULT_SETTINGS = {
@@ -20,13 +29,45 @@ class TradeSettingsManager:
         TradeSettingName.STOP_LOSS: float,
     }
 
-    def __init__(self, session_factory: SessionFactory) -> None:
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        *,
+        poll_timeout: float = 1.0,
+        fallback_interval: float = 60.0,
+    ) -> None:
         self.session_factory = session_factory
+        self.poll_timeout = poll_timeout
+        self.fallback_interval = fallback_interval
         self._settings: dict[TradeSettingName, TradeSetting] = {}
+        # bumped on every invalidation, a read racing a change isn't cached
+        self._version = 0
+        self._lock = Lock()
+        self._thread: Thread | None = None
+
+    def _start_listener(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            listener = NotificationListener(
+                engine=self.session_factory.engine, channels=[TRADE_SETTINGS_CHANNEL]
+            )
+            # listen before the first read, a change committed after it is
+            # always notified
+            listener.listen()
+
+            self._thread = Thread(target=self._run, args=(listener,), daemon=True)
+            self._thread.start()
 
     def get_setting(self, setting_name: TradeSettingName) -> TradeSetting:
-        if setting_name in self._settings:
-            return self._settings[setting_name]
+        self._start_listener()
+
+        with self._lock:
+            if setting_name in self._settings:
+                return self._settings[setting_name]
+
+            version = self._version
 
         with self.session_factory.session() as session:
             trade_setting_store = TradeSettingStore(session)
@@ -39,10 +80,13 @@ class TradeSettingsManager:
                 TradeSettingStore(session).add_setting(trade_setting)
                 session.commit()
 
-            self._settings[setting_name] = trade_setting
             session.expunge_all()
 
-            return trade_setting
+        with self._lock:
+            if version == self._version:
+                self._settings[setting_name] = trade_setting
+
+        return trade_setting
 
     def save_setting(
         self, setting_name: TradeSettingName, value: str | float | int
@@ -51,7 +95,7 @@ class TradeSettingsManager:
             trade_setting_store = TradeSettingStore(session)
             trade_setting = trade_setting_store.get_setting(setting_name)
             if trade_setting:
-                trade_setting.value = str(value)
+                trade_setting_store.update_setting(trade_setting, value)
             else:
                 trade_setting = TradeSetting(
                     name=setting_name.value,
@@ -62,7 +106,15 @@ class TradeSettingsManager:
 
             session.commit()
 
-            self._settings[setting_name] = trade_setting
+        self.invalidate(setting_name)
+
+    def invalidate(self, setting_name: TradeSettingName | None = None) -> None:
+        with self._lock:
+            self._version += 1
+            if setting_name is None:
+                self._settings.clear()
+            else:
+                self._settings.pop(setting_name, None)
 
     def get_all_settings(self) -> list[TradeSetting]:
         trade_settings: list[TradeSetting] = []
@@ -70,3 +122,34 @@ class TradeSettingsManager:
             trade_settings.append(self.get_setting(trade_setting_name))
 
         return trade_settings
+
+    def _run(self, listener: NotificationListener) -> None:
+        last_refresh = time.monotonic()
+
+        while True:
+            try:
+                for notification in listener.wait(timeout=self.poll_timeout):
+                    self.invalidate(TradeSettingName(notification.payload))
+
+                # changes notified while reconnecting are lost, reload all
+                if (
+                    not listener.is_listening()
+                    or time.monotonic() - last_refresh >= self.fallback_interval
+                ):
+                    last_refresh = time.monotonic()
+                    self.invalidate()
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} error")
+
+
+_managers: dict[Engine, TradeSettingsManager] = {}
+_managers_lock = Lock()
+
+
+def get_trade_settings_manager(session_factory: SessionFactory) -> TradeSettingsManager:
+    # one cache, and one listening connection, per engine and process
+    with _managers_lock:
+        if session_factory.engine not in _managers:
+            _managers[session_factory.engine] = TradeSettingsManager(session_factory)
+
+        return _managers[session_factory.engine]
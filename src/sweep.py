@@ -0,0 +1,79 @@
+import argparse
+import json
+import logging
+import time
+
+from database.session_factory import SessionFactory
+from models.trade_setting import TradeSettingName
+from settings import SettingsFactory
+from tradebot.backtest import Backtest, SimulatedExecution
+from tradebot.parameter_sweep import ParameterSweep, QuoteHistory
+from web3_helper.helper import Web3Client
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Backtest a strategy over a grid of parameters"
+    )
+    parser.add_argument("strategy")
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="parameter values, e.g. pnl_sell=25,50,100",
+    )
+    parser.add_argument("--pair", action="append", dest="pairs")
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--buy-amount", type=float, default=0.01)
+    parser.add_argument("--slippage", type=float, default=0.01)
+    parser.add_argument("--gas-fee", type=float, default=0.0)
+    parser.add_argument(
+        "--setting",
+        action="append",
+        default=[],
+        help="trade setting override, e.g. STOP_LOSS=-20",
+    )
+    args = parser.parse_args()
+
+    backtest_settings = SettingsFactory.get_backtest_settings()
+    db_session_factory = SessionFactory(backtest_settings["database_uri"])
+    web3 = Web3Client().web3
+
+    sweep = ParameterSweep(
+        strategy_name=args.strategy,
+        grid={
+            name: [json.loads(value) for value in values.split(",")]
+            for name, values in (param.split("=", 1) for param in args.param)
+        },
+        buy_amount=web3.to_wei(args.buy_amount, "ether"),
+        execution=SimulatedExecution(
+            slippage=args.slippage, gas_fee=web3.to_wei(args.gas_fee, "ether")
+        ),
+        settings={
+            TradeSettingName(name): value
+            for name, value in (setting.split("=", 1) for setting in args.setting)
+        },
+        workers=args.workers,
+    )
+
+    with db_session_factory.session() as session:
+        pairs, tokens = Backtest(
+            strategy_name=args.strategy, web3_client=Web3Client()
+        ).load_pairs(session, args.pairs)
+        history = QuoteHistory.load(
+            session,
+            pairs=pairs,
+            tokens=tokens,
+            since=int(time.time()) - args.days * 24 * 3600,
+        )
+
+    try:
+        results = sweep.run(history)
+    finally:
+        history.close()
+
+    for result in results[: args.top]:
+        print(result.model_dump_json())
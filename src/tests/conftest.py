@@ -1,8 +1,10 @@
+import uuid
 from typing import Any, Callable, Generator, Generic, TypeVar
 from unittest import mock
 
 from eth_account.account import Account, LocalAccount
 from eth_typing import ChecksumAddress
+from eth_utils import function_signature_to_4byte_selector
 from pytest import fixture
 from sqlalchemy.orm import Session
 from web3 import Web3
@@ -13,6 +15,10 @@ from web3_helper.abi import ABIFetcher
 from web3_helper.helper import Web3Client
 
 
+def random_address() -> str:
+    return f"0x{uuid.uuid4().hex}{uuid.uuid4().hex[:8]}"
+
+
 @fixture
 def trade_bot_settings() -> TradeBotSettings:
     return SettingsFactory.get_trade_bot_setings()
@@ -97,6 +103,7 @@ class MockWeb3Client(Web3Client):
         ) -> None:
             self.registries = registries
             self.eth_balance = 0
+            self.block_number = 1
 
         def contract(
             self, address: ChecksumAddress, *, abi: list[dict[str, Any]]
@@ -109,10 +116,62 @@ class MockWeb3Client(Web3Client):
         def get_balance(self, *, account: ChecksumAddress) -> int:
             return self.eth_balance
 
+        def _call(self, target: ChecksumAddress, call_data: bytes) -> bytes:
+            codec = Web3().codec
+            selector, args = call_data[:4], call_data[4:]
+
+            if selector == function_signature_to_4byte_selector("getBlockNumber()"):
+                return codec.encode(["uint256"], [self.block_number])
+
+            if selector == function_signature_to_4byte_selector(
+                "getEthBalance(address)"
+            ):
+                return codec.encode(["uint256"], [self.eth_balance])
+
+            if selector == function_signature_to_4byte_selector("balanceOf(address)"):
+                (wallet_address,) = codec.decode(["address"], args)
+                token_contract = self.contract(target, abi=[])
+                return codec.encode(
+                    ["uint256"],
+                    [token_contract.functions.balanceOf(wallet_address).call()],
+                )
+
+            raise NotImplementedError(f"Unknown call to {target}")
+
+        def call(
+            self, transaction: dict[str, Any], block_identifier: Any = "latest"
+        ) -> bytes:
+            # emulates the Multicall3 aggregate3 of the reads used by the bot
+            codec = Web3().codec
+            call_data = bytes(transaction["data"])
+            assert call_data[:4] == function_signature_to_4byte_selector(
+                "aggregate3((address,bool,bytes)[])"
+            )
+
+            (calls,) = codec.decode(["(address,bool,bytes)[]"], call_data[4:])
+            results: list[tuple[bool, bytes]] = []
+            for target, allow_failure, target_call_data in calls:
+                try:
+                    results.append(
+                        (
+                            True,
+                            self._call(
+                                Web3.to_checksum_address(target), target_call_data
+                            ),
+                        )
+                    )
+                except NotImplementedError:
+                    if not allow_failure:
+                        raise
+                    results.append((False, b""))
+
+            return codec.encode(["(bool,bytes)[]"], [results])
+
     class Web3:
         def __init__(self) -> None:
             self.eth = MockWeb3Client.Eth()
             self.real_web3 = Web3()
+            self.codec = self.real_web3.codec
 
         def to_checksum_address(self, address: str) -> ChecksumAddress:
             return self.real_web3.to_checksum_address(address)
@@ -0,0 +1,70 @@
+import json
+import time
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from models.token import TOKEN_ADDRESSES, ContractCache, TokenName
+from tests.conftest import random_address
+from web3_helper.abi import ABIFetcher, ABIManager, LRUCache, get_contract
+from web3_helper.helper import Web3Client
+from web3_helper.standard_abi import ERC20_ABI, PERMIT2_ABI, PERMIT2_ADDRESS, WETH_ABI
+
+
+class FailingABIFetcher(ABIFetcher):
+    def __init__(self) -> None:
+        super().__init__(base_scan_api_key="")
+
+    def get_contracts_from_api(self, address: str) -> dict[str, Any]:
+        raise Exception("basescan is not reachable")
+
+
+def test_standard_abis(session: Session) -> None:
+    abi_manager = ABIManager(session=session, abi_fetcher=FailingABIFetcher())
+
+    # bundled, neither the database nor basescan is looked at
+    assert abi_manager.get_abi(address=PERMIT2_ADDRESS.lower()) is PERMIT2_ABI
+    assert abi_manager.get_abi(address=TOKEN_ADDRESSES[TokenName.WETH]) is WETH_ABI
+
+
+def test_cached_abi(session: Session) -> None:
+    address = random_address()
+    abi = [{"type": "function", "name": "fee", "inputs": [], "outputs": []}]
+    session.add(
+        ContractCache(
+            address=address,
+            contract={"abi": json.dumps(abi)},
+            created_at=int(time.time()),
+        )
+    )
+    session.commit()
+
+    abi_manager = ABIManager(session=session, abi_fetcher=FailingABIFetcher())
+    assert abi_manager.get_abi(address=address) == abi
+
+    # gone from the database, still served from memory
+    session.query(ContractCache).filter(ContractCache.address == address).delete()
+    session.commit()
+    assert abi_manager.get_abi(address=address) == abi
+
+
+def test_lru_cache() -> None:
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    # b is the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_get_contract() -> None:
+    web3_client = Web3Client()
+    address = random_address()
+
+    contract = get_contract(web3_client, address=address, abi=ERC20_ABI)
+    assert get_contract(web3_client, address=address.lower(), abi=ERC20_ABI) is contract
+    assert get_contract(web3_client, address=address, abi=WETH_ABI) is not contract
@@ -0,0 +1,248 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence
+
+from eth_account.account import LocalAccount
+from hexbytes import HexBytes
+from web3.types import BlockIdentifier
+
+from web3_helper.allowance_manager import MAX_UINT160, AllowanceManager, ApprovalPolicy
+from web3_helper.helper import Web3Client
+from web3_helper.multicall import Call, Multicall, MulticallResult
+from web3_helper.transaction_helper import (
+    AllowanceResult,
+    ApproveResult,
+    TransactionHelper,
+    UniswapTransactionHelper,
+)
+
+TOKEN = "0x4200000000000000000000000000000000000006"
+ROUTER = "0x6BDED42c6DA8FBf0d2bA55B2fa120C5e0c8D7891"
+PERMIT2 = "0x000000000022D473030F116dDEE9F6B43aC78BA3"
+
+
+class FakeMulticall(Multicall):
+    def __init__(self, web3_client: Web3Client) -> None:
+        super().__init__(web3_client=web3_client)
+        self.results: list[Any | None] = []
+        self.read_count = 0
+
+    def aggregate_calls(
+        self,
+        calls: Sequence[Call],
+        *,
+        block_identifier: BlockIdentifier = "latest",
+    ) -> MulticallResult:
+        self.read_count += 1
+        return MulticallResult(block_number=1234, results=self.results)
+
+
+class FakeTransactionHelper(TransactionHelper):
+    def __init__(self) -> None:
+        self.approved: list[int] = []
+
+    def approve(
+        self,
+        *,
+        wallet: LocalAccount,
+        allowance: int,
+        token_address: str,
+        spender_address: str,
+        chain_id: int = 0,
+        wait: bool = True,
+    ) -> ApproveResult:
+        self.approved.append(allowance)
+        return ApproveResult(amount=allowance, expiration=0, tx_hash=HexBytes(1))
+
+
+class FakeUniswapTransactionHelper(UniswapTransactionHelper):
+    def __init__(self) -> None:
+        self.permits: list[tuple[int, int | None]] = []
+
+    def permit_signed_message(
+        self,
+        *,
+        allowance: int,
+        wallet: LocalAccount,
+        token_address_to_spend: str,
+        destination: str,
+        permit_address: str,
+        chain_id: int = 0,
+        expiration: int | None = None,
+        nonce: int | None = None,
+    ) -> AllowanceResult:
+        self.permits.append((allowance, nonce))
+        return AllowanceResult(
+            amount=allowance,
+            expiration=expiration or 0,
+            nonce=nonce or 0,
+            signed_message=None,  # type: ignore[arg-type]
+            permit_data={},
+        )
+
+
+def test_allowance_reused(mock_wallet: LocalAccount) -> None:
+    web3_client = Web3Client()
+    multicall = FakeMulticall(web3_client)
+    transaction_helper = FakeTransactionHelper()
+    allowance_manager = AllowanceManager(
+        web3_client=web3_client,
+        wallet=mock_wallet,
+        policy=ApprovalPolicy.MULTIPLE,
+        multiple=3,
+        multicall=multicall,
+    )
+
+    # nothing approved yet, three trades worth is approved at once
+    multicall.results = [0]
+    approve_result = allowance_manager.ensure_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        amount=100,
+    )
+    assert approve_result and approve_result.amount == 300
+    assert transaction_helper.approved == [300]
+
+    allowance_manager.settle(
+        token_address=TOKEN, spender_addresses=[ROUTER], amount=100, succeeded=True
+    )
+    for _ in range(2):
+        assert not allowance_manager.ensure_allowance(
+            transaction_helper=transaction_helper,
+            token_address=TOKEN,
+            spender_address=ROUTER,
+            amount=100,
+        )
+        allowance_manager.settle(
+            token_address=TOKEN, spender_addresses=[ROUTER], amount=100, succeeded=True
+        )
+
+    # read once, the approval is spent down locally
+    assert multicall.read_count == 1
+    assert transaction_helper.approved == [300]
+
+    # used up, the chain is checked before approving again
+    multicall.results = [0]
+    assert allowance_manager.ensure_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        amount=100,
+    )
+    assert multicall.read_count == 2
+    assert transaction_helper.approved == [300, 300]
+
+
+def test_allowance_spent_concurrently(mock_wallet: LocalAccount) -> None:
+    web3_client = Web3Client()
+    multicall = FakeMulticall(web3_client)
+    transaction_helper = FakeTransactionHelper()
+    allowance_manager = AllowanceManager(
+        web3_client=web3_client,
+        wallet=mock_wallet,
+        policy=ApprovalPolicy.EXACT,
+        multicall=multicall,
+    )
+
+    # enough for one of two swaps in flight, the other approves
+    multicall.results = [150]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        approve_results = list(
+            executor.map(
+                lambda _: allowance_manager.ensure_allowance(
+                    transaction_helper=transaction_helper,
+                    token_address=TOKEN,
+                    spender_address=ROUTER,
+                    amount=100,
+                ),
+                range(2),
+            )
+        )
+    assert len([result for result in approve_results if result is None]) == 1
+    assert transaction_helper.approved == [100]
+
+
+def test_allowance_approved_elsewhere(mock_wallet: LocalAccount) -> None:
+    web3_client = Web3Client()
+    multicall = FakeMulticall(web3_client)
+    transaction_helper = FakeTransactionHelper()
+    allowance_manager = AllowanceManager(
+        web3_client=web3_client,
+        wallet=mock_wallet,
+        policy=ApprovalPolicy.EXACT,
+        multicall=multicall,
+    )
+
+    multicall.results = [500]
+    assert not allowance_manager.ensure_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        amount=100,
+    )
+    assert not transaction_helper.approved
+
+    # a failed swap drops what is known, the chain is read again
+    allowance_manager.settle(
+        token_address=TOKEN, spender_addresses=[ROUTER], amount=100, succeeded=False
+    )
+    multicall.results = [50]
+    assert allowance_manager.ensure_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        amount=100,
+    )
+    assert transaction_helper.approved == [100]
+
+
+def test_permit2_allowance(mock_wallet: LocalAccount) -> None:
+    web3_client = Web3Client()
+    multicall = FakeMulticall(web3_client)
+    transaction_helper = FakeUniswapTransactionHelper()
+    allowance_manager = AllowanceManager(
+        web3_client=web3_client,
+        wallet=mock_wallet,
+        policy=ApprovalPolicy.MAX,
+        multicall=multicall,
+    )
+
+    # an expired permit is renewed with its current nonce
+    multicall.results = [(10**18, int(time.time()) - 1, 4)]
+    allowance_result = allowance_manager.ensure_permit2_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        permit_address=PERMIT2,
+        amount=100,
+    )
+    assert allowance_result and allowance_result.amount == MAX_UINT160
+    assert transaction_helper.permits == [(MAX_UINT160, 4)]
+
+    # not mined yet, a concurrent swap does not rely on it
+    assert allowance_manager.ensure_permit2_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        permit_address=PERMIT2,
+        amount=100,
+    )
+    assert multicall.read_count == 2
+
+    # the swap carried the permit, the next one goes without
+    allowance_manager.settle(
+        token_address=TOKEN,
+        spender_addresses=[ROUTER],
+        amount=100,
+        succeeded=True,
+        allowance_result=allowance_result,
+    )
+    assert not allowance_manager.ensure_permit2_allowance(
+        transaction_helper=transaction_helper,
+        token_address=TOKEN,
+        spender_address=ROUTER,
+        permit_address=PERMIT2,
+        amount=10**30,
+    )
+    assert multicall.read_count == 2
@@ -0,0 +1,89 @@
+import time
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from database.pair_store import PairStore
+from database.token_store import TokenStore
+from models.dex_id import DexId
+from models.token import Pair, PairQuote, Token
+from models.trade_setting import TradeSettingName
+from tests.conftest import random_address
+from tradebot.backtest import Backtest, SimulatedExecution
+from tradebot.trade_strategies.prudent_pump_strategy import PrudentPumpStrategy
+from tradebot.trade_strategies.stop_loss_strategy import StopLossStrategy
+from web3_helper.helper import Web3Client
+
+
+def add_pair_with_quotes(session: Session, prices: list[int]) -> Pair:
+    token_store = TokenStore(session)
+    base_token = Token(address=random_address(), name="Test", symbol="TST", decimals=18)
+    quote_token = Token(
+        address=random_address(), name="Wrapped Ether", symbol="WETH", decimals=18
+    )
+    token_store.add_token(base_token)
+    token_store.add_token(quote_token)
+
+    pair = Pair(
+        address=random_address(),
+        base_address=base_token.address,
+        quote_address=quote_token.address,
+        dex=DexId("uniswap", "v2"),
+        chain="base",
+    )
+    pair_store = PairStore(session)
+    pair_store.add_pair(pair)
+    session.commit()
+
+    now = int(time.time())
+    for index, price in enumerate(prices):
+        pair_store.add_pair_quote(
+            PairQuote(
+                pair_address=pair.address,
+                price=price,
+                data={"index": index},
+                timestamp=now - len(prices) + index,
+            )
+        )
+    session.commit()
+
+    return pair
+
+
+def test_stop_loss_backtest(session: Session) -> None:
+    pair = add_pair_with_quotes(session, [10**15, 9 * 10**14, 7 * 10**14, 5 * 10**14])
+
+    report = Backtest(
+        strategy_name=StopLossStrategy.NAME,
+        web3_client=Web3Client(),
+        buy_amount=10**16,
+        execution=SimulatedExecution(slippage=0),
+        settings={TradeSettingName.STOP_LOSS: -20},
+        chunk_size=2,
+    ).run(session, pair_addresses=[pair.address])
+
+    assert report.quote_count == 4
+    # entry and stop loss exit
+    assert report.trade_count == 2
+    assert report.profit_and_loss == Decimal("-0.003")
+    assert report.return_percent == -30
+    assert report.max_drawdown_percent == 30
+
+
+def test_prudent_pump_backtest(session: Session) -> None:
+    pair = add_pair_with_quotes(
+        session, [10**12, 12 * 10**11, 16 * 10**11, 10**12, 10**11]
+    )
+
+    report = Backtest(
+        strategy_name=PrudentPumpStrategy.NAME,
+        web3_client=Web3Client(),
+        buy_amount=10**16,
+        execution=SimulatedExecution(slippage=0.01),
+        settings={TradeSettingName.STOP_LOSS: -20},
+    ).run(session, pair_addresses=[pair.address])
+
+    # profit target met at +60%, the strategy is disabled after the sell
+    assert report.trade_count == 2
+    assert report.pairs[0].quote_count == 5
+    assert report.return_percent > 50
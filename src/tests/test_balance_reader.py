@@ -0,0 +1,49 @@
+from typing import Any
+
+from eth_account.account import LocalAccount
+
+from models.token import TOKEN_ADDRESSES, TokenName
+from tests.conftest import MockTokenContract, MockWeb3Client
+from web3_helper.balance_reader import BalanceReader
+from web3_helper.helper import Web3Client
+
+
+def test_balances_in_one_call(
+    mock_wallet: LocalAccount, web3_client: Web3Client
+) -> None:
+    eth = web3_client.web3.eth
+    assert isinstance(eth, MockWeb3Client.Eth)
+
+    token_addresses = [
+        web3_client.to_checksum_address(f"0x{str(index) * 40}") for index in range(1, 4)
+    ]
+    for balance, token_address in enumerate(token_addresses, start=1):
+        eth.registries[token_address] = MockTokenContract(
+            address=token_address, token_balance=balance * 1000
+        )
+    eth.eth_balance = 42
+    eth.block_number = 1234
+
+    calls: list[dict[str, Any]] = []
+    eth_call = eth.call
+
+    def call(transaction: dict[str, Any], block_identifier: Any = "latest") -> bytes:
+        calls.append(transaction)
+        return eth_call(transaction, block_identifier)
+
+    eth.call = call  # type: ignore[method-assign]
+
+    balances = BalanceReader(web3_client=web3_client).get_balances(
+        wallet_address=mock_wallet.address,
+        token_addresses=token_addresses
+        + [TOKEN_ADDRESSES[TokenName.ETH], token_addresses[0]],
+    )
+
+    assert len(calls) == 1
+    assert balances.block_number == 1234
+    assert balances.balances == {
+        token_addresses[0]: 1000,
+        token_addresses[1]: 2000,
+        token_addresses[2]: 3000,
+        TOKEN_ADDRESSES[TokenName.ETH]: 42,
+    }
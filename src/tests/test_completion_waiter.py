@@ -0,0 +1,64 @@
+import time
+
+from sqlalchemy.orm import Session
+
+from database.completion_waiter import CompletionWaiter
+from database.event_store import EventStore
+from database.session_factory import SessionFactory
+from models.event import EventType, PersistedEvent, PersistedEventStatus, Queue
+
+
+def add_sell_event(session: Session) -> PersistedEvent:
+    event = EventStore(session).add_event(
+        PersistedEvent(
+            queue=Queue.TRADE_BOT,
+            event_type=EventType.SELL,
+            data={"pair": f"0xpair{time.time_ns()}", "value": 1},
+            created_at=int(time.time()),
+        )
+    )
+    session.flush()
+
+    return event
+
+
+def test_resolve_in_process(connection_string: str) -> None:
+    waiter = CompletionWaiter(engine=SessionFactory(connection_string).engine)
+    completion = waiter.wait_for(1)
+
+    waiter.resolve(1, PersistedEventStatus.COMPLETED)
+
+    assert completion.result(timeout=1) == PersistedEventStatus.COMPLETED
+
+
+def test_resolve_from_notification(session: Session, connection_string: str) -> None:
+    waiter = CompletionWaiter(engine=SessionFactory(connection_string).engine)
+    event = add_sell_event(session)
+    completion = waiter.wait_for(event.id)
+    session.commit()
+
+    with SessionFactory(connection_string).session() as other_session:
+        event_store = EventStore(other_session)
+        other_event = event_store.get_event_by_id(event.id)
+        assert other_event
+
+        event_store.fail_event(other_event)
+        other_session.commit()
+
+    assert completion.result(timeout=5) == PersistedEventStatus.FAILED
+
+
+def test_resolve_already_finished(session: Session, connection_string: str) -> None:
+    waiter = CompletionWaiter(
+        engine=SessionFactory(connection_string).engine,
+        poll_timeout=0.1,
+        fallback_interval=0,
+    )
+    event = add_sell_event(session)
+    EventStore(session).complete_event(event)
+    session.commit()
+
+    # completion notification was sent before the waiter was listening
+    completion = waiter.wait_for(event.id)
+
+    assert completion.result(timeout=5) == PersistedEventStatus.COMPLETED
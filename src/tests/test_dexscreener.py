@@ -0,0 +1,112 @@
+import time
+from typing import Any
+
+import pytest
+
+from ext_api.dexscreener import DexScreenerClient
+from ext_api.token_bucket import TokenBucket
+
+
+def dex_pair(pair_address: str) -> dict[str, Any]:
+    token = {"address": "0x01", "symbol": "TST", "name": "Test"}
+    txns = {"buys": 1, "sells": 1}
+    by_period = {"m5": 1.0, "h1": 1.0, "h6": 1.0, "h24": 1.0}
+
+    return {
+        "chainId": "base",
+        "dexId": "uniswap",
+        "url": "https://dexscreener.com/base/pair",
+        "pairAddress": pair_address,
+        "baseToken": token,
+        "quoteToken": token,
+        "priceNative": 0.001,
+        "priceUsd": 3.5,
+        "txns": {"m5": txns, "h1": txns, "h6": txns, "h24": txns},
+        "volume": by_period,
+        "priceChange": by_period,
+        "liquidity": {"usd": 1.0, "base": 1.0, "quote": 1.0},
+        "fdv": 1,
+    }
+
+
+class FakeResponse:
+    def __init__(
+        self,
+        content: dict[str, Any],
+        status_code: int = 200,
+        headers: dict[str, str] = {},
+    ) -> None:
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict[str, Any]:
+        return self.content
+
+
+def test_get_pairs_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = DexScreenerClient(root_uri="http://dexscreener/")
+    requested_chunks: list[list[str]] = []
+
+    def get(url: str, timeout: tuple[float, float]) -> FakeResponse:
+        pair_addresses = url.split("/")[-1].split(",")
+        requested_chunks.append(pair_addresses)
+
+        if "0x64" in pair_addresses:
+            raise ConnectionError()
+
+        if "0x0" in pair_addresses:
+            return FakeResponse({"schemaVersion": "1.0.0", "pairs": None})
+
+        return FakeResponse(
+            {
+                "schemaVersion": "1.0.0",
+                "pairs": [dex_pair(pair_address) for pair_address in pair_addresses],
+            }
+        )
+
+    monkeypatch.setattr(client.session, "get", get)
+
+    response = client.get_pairs([f"0x{index}" for index in range(100)])
+
+    assert sorted(len(chunk) for chunk in requested_chunks) == [10, 30, 30, 30]
+    # unknown pairs and the failed chunk are left out
+    assert len(response.pairs) == 40
+    assert "0x64" not in {pair.pairAddress for pair in response.pairs}
+
+
+def test_get_pairs_rate_limited(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = DexScreenerClient(root_uri="http://dexscreener/")
+    responses = [
+        FakeResponse({}, status_code=429, headers={"Retry-After": "0"}),
+        FakeResponse({"schemaVersion": "1.0.0", "pairs": [dex_pair("0x1")]}),
+    ]
+    acquired: list[float] = []
+
+    monkeypatch.setattr(client.session, "get", lambda url, timeout: responses.pop(0))
+    monkeypatch.setattr(
+        client.rate_limiter,
+        "acquire",
+        lambda tokens=1.0: acquired.append(tokens),
+    )
+
+    response = client.get_pairs(["0x1"])
+
+    # the retry takes its own token from the bucket
+    assert len(acquired) == 2
+    assert [pair.pairAddress for pair in response.pairs] == ["0x1"]
+
+
+def test_token_bucket() -> None:
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+    started_at = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - started_at >= 0.02
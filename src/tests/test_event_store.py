@@ -0,0 +1,384 @@
+import time
+from threading import Thread
+from typing import Any, Generator
+
+from pytest import fixture
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from database.event_store import PRIORITY_AGING_SECONDS, EventStore
+from database.session_factory import SessionFactory
+from models.event import (
+    BUY_EVENT_TTL,
+    MAX_QUOTE_AGE,
+    ArchivedEvent,
+    EventPriority,
+    EventType,
+    PersistedEvent,
+    PersistedEventStatus,
+    Queue,
+    ShedReason,
+    get_shed_reason,
+)
+
+
+@fixture
+def event_store(session: Session) -> Generator[EventStore, Any, Any]:
+    session.execute(delete(PersistedEvent))
+    session.execute(delete(ArchivedEvent))
+    session.commit()
+
+    yield EventStore(session)
+
+
+def add_trade_event(
+    event_store: EventStore,
+    event_type: EventType,
+    pair: str,
+    created_at: int,
+    priority: EventPriority | None = None,
+) -> PersistedEvent:
+    event = PersistedEvent(
+        queue=Queue.TRADE_BOT,
+        event_type=event_type,
+        data={"pair": pair, "value": 1},
+        created_at=created_at,
+        priority=priority,
+    )
+    event_store.add_event(event)
+    event_store.session.commit()
+
+    return event
+
+
+def test_claim_keeps_pair_order(
+    event_store: EventStore, connection_string: str
+) -> None:
+    first_buy = add_trade_event(event_store, EventType.BUY, "0xpair1", 1)
+    first_sell = add_trade_event(event_store, EventType.SELL, "0xpair1", 2)
+    other_buy = add_trade_event(event_store, EventType.BUY, "0xpair2", 3)
+
+    assert first_buy.partition_key == "0xpair1"
+
+    claimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+
+    assert claimed
+    assert claimed.id == first_buy.id
+    assert claimed.status == PersistedEventStatus.PROCESSING
+
+    # second worker, while the first claim isn't committed yet
+    with SessionFactory(connection_string).session() as other_session:
+        other_claimed = EventStore(other_session).claim_event(
+            queue=Queue.TRADE_BOT, worker_id="worker-2", lease_duration=60
+        )
+
+        assert other_claimed
+        assert other_claimed.id == other_buy.id
+        other_session.commit()
+
+    event_store.session.commit()
+
+    # pair1 sell waits until the buy is done
+    assert not event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+
+    event_store.complete_event(claimed)
+    event_store.session.commit()
+
+    next_claimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+
+    assert next_claimed
+    assert next_claimed.id == first_sell.id
+
+
+def test_claim_expired_lease(event_store: EventStore) -> None:
+    event = add_trade_event(event_store, EventType.SELL, "0xpair1", 1)
+
+    claimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+    assert claimed
+    event_store.session.commit()
+
+    assert not event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-2", lease_duration=60
+    )
+
+    claimed.lease_expire_at = int(time.time()) - 1
+    event_store.session.commit()
+
+    reclaimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-2", lease_duration=60
+    )
+
+    assert reclaimed
+    assert reclaimed.id == event.id
+    assert reclaimed.leased_by == "worker-2"
+
+
+def test_lease_fencing(event_store: EventStore, connection_string: str) -> None:
+    event = add_trade_event(event_store, EventType.BUY, "0xpair1", 1)
+
+    claimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+    assert claimed
+    event_store.session.commit()
+
+    assert event_store.renew_lease(
+        event_id=event.id, worker_id="worker-1", lease_duration=120
+    )
+    event_store.record_sent_transaction(
+        event_id=event.id, worker_id="worker-1", tx_hash="0xswap"
+    )
+    event_store.session.commit()
+
+    # the lease ran out anyway, another worker takes the event over
+    claimed.lease_expire_at = int(time.time()) - 1
+    event_store.session.commit()
+
+    with SessionFactory(connection_string).session() as other_session:
+        reclaimed = EventStore(other_session).claim_event(
+            queue=Queue.TRADE_BOT, worker_id="worker-2", lease_duration=60
+        )
+        assert reclaimed and reclaimed.id == event.id
+        assert reclaimed.execution_data == {"sent_transactions": ["0xswap"]}
+        other_session.commit()
+
+    # the first worker no longer owns the outcome
+    assert not event_store.renew_lease(
+        event_id=event.id, worker_id="worker-1", lease_duration=60
+    )
+    assert not event_store.complete_event(claimed, worker_id="worker-1")
+    event_store.session.commit()
+    assert claimed.status == PersistedEventStatus.PROCESSING
+
+    assert event_store.fail_event(claimed, worker_id="worker-2")
+    event_store.session.commit()
+    assert claimed.status == PersistedEventStatus.FAILED
+
+
+def test_claim_by_priority(event_store: EventStore) -> None:
+    now = int(time.time())
+    balances = PersistedEvent(
+        queue=Queue.TRADE_BOT,
+        event_type=EventType.UPDATE_BALANCES,
+        data={},
+        created_at=now,
+    )
+    event_store.add_event(balances)
+    event_store.session.commit()
+    buy = add_trade_event(event_store, EventType.BUY, "0xpair1", now)
+    sell = add_trade_event(event_store, EventType.SELL, "0xpair2", now + 1)
+    protective_sell = add_trade_event(
+        event_store, EventType.SELL, "0xpair3", now + 2, EventPriority.PROTECTIVE_SELL
+    )
+
+    assert balances.priority == EventPriority.UPDATE_BALANCES
+    assert sell.priority == EventPriority.SELL
+
+    claimed_ids = []
+    while event := event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    ):
+        claimed_ids.append(event.id)
+        event_store.complete_event(event)
+        event_store.session.commit()
+
+    assert claimed_ids == [protective_sell.id, sell.id, buy.id, balances.id]
+
+
+def test_claim_aged_low_priority(event_store: EventStore) -> None:
+    now = int(time.time())
+    levels = EventPriority.PROTECTIVE_SELL - EventPriority.BUY
+    old_buy = add_trade_event(
+        event_store,
+        EventType.BUY,
+        "0xpair1",
+        now - (levels + 1) * PRIORITY_AGING_SECONDS,
+    )
+    add_trade_event(
+        event_store, EventType.SELL, "0xpair2", now, EventPriority.PROTECTIVE_SELL
+    )
+
+    claimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+
+    assert claimed
+    assert claimed.id == old_buy.id
+
+
+def test_coalesce_pending_sell(event_store: EventStore) -> None:
+    now = int(time.time())
+    first_sell = add_trade_event(event_store, EventType.SELL, "0xpair1", now)
+
+    merged = event_store.add_event(
+        PersistedEvent(
+            queue=Queue.TRADE_BOT,
+            event_type=EventType.SELL,
+            data={"pair": "0xpair1", "value": 5, "slippage": 2.5},
+            created_at=now,
+            priority=EventPriority.PROTECTIVE_SELL,
+        )
+    )
+    event_store.session.commit()
+
+    assert merged.id == first_sell.id
+    assert merged.data == {"pair": "0xpair1", "value": 5, "slippage": 2.5}
+    assert merged.priority == EventPriority.PROTECTIVE_SELL
+
+    # a buy queued in between keeps the next sell separate
+    add_trade_event(event_store, EventType.BUY, "0xpair1", now)
+    last_sell = add_trade_event(event_store, EventType.SELL, "0xpair1", now)
+
+    assert last_sell.id != first_sell.id
+
+    # claimed events aren't merged into
+    claimed = event_store.claim_event(
+        queue=Queue.TRADE_BOT, worker_id="worker-1", lease_duration=60
+    )
+    event_store.session.commit()
+    assert claimed and claimed.id == first_sell.id
+
+    other_pair_sell = add_trade_event(event_store, EventType.SELL, "0xpair2", now)
+    assert other_pair_sell.id not in (first_sell.id, last_sell.id)
+
+
+def test_coalesce_concurrent_producers(
+    event_store: EventStore, connection_string: str
+) -> None:
+    now = int(time.time())
+    first_sell = event_store.add_event(
+        PersistedEvent(
+            queue=Queue.TRADE_BOT,
+            event_type=EventType.SELL,
+            data={"pair": "0xpair1", "value": 1},
+            created_at=now,
+        )
+    )
+    event_store.session.flush()
+    other_events: list[PersistedEvent] = []
+
+    def add_other_sell() -> None:
+        with SessionFactory(connection_string).session() as other_session:
+            other_events.append(
+                EventStore(other_session).add_event(
+                    PersistedEvent(
+                        queue=Queue.TRADE_BOT,
+                        event_type=EventType.SELL,
+                        data={"pair": "0xpair1", "value": 2},
+                        created_at=now,
+                    )
+                )
+            )
+            other_session.commit()
+
+    # the other producer waits for the first sell to be committed
+    thread = Thread(target=add_other_sell)
+    thread.start()
+    thread.join(timeout=0.5)
+    assert thread.is_alive()
+
+    event_store.session.commit()
+    thread.join()
+
+    assert other_events[0].id == first_sell.id
+    assert other_events[0].data["value"] == 2
+
+
+def test_coalesce_update_balances(event_store: EventStore) -> None:
+    def add_update_balances(addresses: list[str]) -> PersistedEvent:
+        event = event_store.add_event(
+            PersistedEvent(
+                queue=Queue.TRADE_BOT,
+                event_type=EventType.UPDATE_BALANCES,
+                data={"addresses": addresses},
+                created_at=int(time.time()),
+            )
+        )
+        event_store.session.commit()
+
+        return event
+
+    first_event = add_update_balances(["0xtoken1"])
+    merged = add_update_balances(["0xtoken2", "0xtoken1"])
+
+    assert merged.id == first_event.id
+    assert merged.data["addresses"] == ["0xtoken1", "0xtoken2"]
+
+    merged = add_update_balances([])
+
+    assert merged.id == first_event.id
+    assert merged.data["addresses"] == []
+
+
+def test_archive_events(event_store: EventStore) -> None:
+    now = int(time.time())
+    old_completed = add_trade_event(event_store, EventType.BUY, "0xpair1", now - 7200)
+    old_pending = add_trade_event(event_store, EventType.BUY, "0xpair2", now - 7200)
+    recent_completed = add_trade_event(event_store, EventType.BUY, "0xpair3", now)
+
+    event_store.complete_event(old_completed, {"queue_wait": 1})
+    event_store.complete_event(recent_completed)
+    event_store.session.commit()
+
+    assert event_store.archive_events(older_than=now - 3600) == 1
+    event_store.session.commit()
+    event_store.session.expunge_all()
+
+    assert not event_store.get_event_by_id(old_completed.id)
+    assert event_store.get_event_by_id(old_pending.id)
+    assert event_store.get_event_by_id(recent_completed.id)
+
+    archived_event = event_store.get_archived_event_by_id(old_completed.id)
+
+    assert archived_event
+    assert archived_event.status == PersistedEventStatus.COMPLETED
+    assert archived_event.execution_data == {"queue_wait": 1}
+    assert [event.id for event in event_store.get_events(archived=True)] == [
+        old_completed.id
+    ]
+
+    assert [
+        event.id for event in event_store.get_events(before_id=recent_completed.id)
+    ] == [old_pending.id]
+
+
+def test_shed_reason() -> None:
+    now = int(time.time())
+    buy = PersistedEvent(
+        queue=Queue.TRADE_BOT,
+        event_type=EventType.BUY,
+        data={"pair": "0xpair1", "value": 1, "quote_timestamp": now},
+        created_at=now,
+    )
+    sell = PersistedEvent(
+        queue=Queue.TRADE_BOT,
+        event_type=EventType.SELL,
+        data={"pair": "0xpair1", "value": 1, "quote_timestamp": now},
+        created_at=now,
+    )
+
+    assert buy.expire_at == now + BUY_EVENT_TTL
+    assert sell.expire_at is None
+
+    def shed_reason(event: PersistedEvent, at: int) -> ShedReason | None:
+        return get_shed_reason(
+            event_type=EventType(event.event_type),
+            expire_at=event.expire_at,
+            data=event.data,
+            now=at,
+        )
+
+    assert shed_reason(buy, now) is None
+    assert shed_reason(buy, now + BUY_EVENT_TTL) == ShedReason.DEADLINE
+    assert shed_reason(sell, now + MAX_QUOTE_AGE + 1) is None
+
+    buy.expire_at = None
+    assert shed_reason(buy, now + MAX_QUOTE_AGE + 1) == ShedReason.STALE_QUOTE
@@ -0,0 +1,73 @@
+from typing import Any
+
+from web3_helper.gas import MIN_PRIORITY_FEE, GasOracle, GasUrgency
+from web3_helper.helper import Web3Client
+
+
+class FakeEth:
+    def __init__(self) -> None:
+        self.latest_block = 100
+        self.calls = 0
+
+    def fee_history(
+        self, block_count: int, newest_block: str, percentiles: list[float]
+    ) -> dict[str, Any]:
+        self.calls += 1
+        oldest_block = self.latest_block - block_count + 1
+        blocks = range(oldest_block, self.latest_block + 1)
+
+        return {
+            "oldestBlock": oldest_block,
+            "baseFeePerGas": [1_000 * block for block in blocks]
+            + [1_000 * (self.latest_block + 1)],
+            "gasUsedRatio": [0.5 for _ in blocks],
+            # tips grow with the block, the 90th percentile is ten times the median
+            "reward": [
+                [10**6 * block, 2 * 10**6 * block, 20 * 10**6 * block]
+                for block in blocks
+            ],
+        }
+
+
+class FakeWeb3Client(Web3Client):
+    class Web3:
+        def __init__(self) -> None:
+            self.eth = FakeEth()
+
+    def __init__(self) -> None:
+        self._web3 = FakeWeb3Client.Web3()  # type: ignore
+
+
+def test_gas_oracle() -> None:
+    web3_client = FakeWeb3Client()
+    eth: FakeEth = web3_client.web3.eth  # type: ignore[assignment]
+    gas_oracle = GasOracle(web3_client=web3_client, window=5, overhead=0.1)
+
+    normal = gas_oracle.estimate()
+    assert eth.calls == 1
+    assert normal.base_fee == int(101_000 * 1.1)
+    # median over blocks 96 to 100
+    assert normal.priority_fee == 2 * 10**6 * 98
+    assert normal.max_fee == normal.base_fee + normal.priority_fee
+
+    aggressive = gas_oracle.estimate(GasUrgency.AGGRESSIVE)
+    assert aggressive.base_fee == 2 * 101_000
+    assert aggressive.priority_fee == 20 * 10**6 * 100
+
+    # fresh, served from memory
+    assert eth.calls == 1
+
+    # new blocks slide the window
+    eth.latest_block = 102
+    gas_oracle.refresh()
+    assert gas_oracle.estimate().priority_fee == 2 * 10**6 * 100
+    assert gas_oracle.estimate().base_fee == int(103_000 * 1.1)
+
+
+def test_gas_oracle_min_priority_fee() -> None:
+    web3_client = FakeWeb3Client()
+    eth: FakeEth = web3_client.web3.eth  # type: ignore[assignment]
+    eth.latest_block = 0
+    gas_oracle = GasOracle(web3_client=web3_client, window=1)
+
+    assert gas_oracle.estimate().priority_fee == MIN_PRIORITY_FEE
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from database.pair_store import PairStore
+from models.token import PairQuote
+from tests.test_backtest import add_pair_with_quotes
+from tradebot.indicators import (
+    ATR,
+    EMA,
+    VWAP,
+    IndicatorEngine,
+    RingBuffer,
+    RollingMax,
+    RollingMin,
+)
+
+
+def test_ring_buffer() -> None:
+    buffer = RingBuffer(3)
+    for value in range(5):
+        buffer.append(value)
+
+    assert len(buffer) == 3
+    assert buffer.to_array().tolist() == [2, 3, 4]
+    assert buffer.oldest() == 2
+
+
+def test_indicators_match_full_computation() -> None:
+    generator = np.random.default_rng(7)
+    prices = generator.uniform(1, 2, 500)
+    volumes = generator.uniform(0, 10, 500)
+
+    ema, vwap, atr = EMA(12), VWAP(20), ATR(14)
+    rolling_max, rolling_min = RollingMax(60), RollingMin(60)
+    expected_ema = prices[:12].mean()
+
+    for index, (price, volume) in enumerate(zip(prices, volumes)):
+        for indicator in (ema, vwap, atr, rolling_max, rolling_min):
+            indicator.update(price, volume)
+
+        if index >= 12:
+            expected_ema += 2 / 13 * (price - expected_ema)
+        if index >= 11:
+            assert ema.value == pytest.approx(expected_ema)
+
+        window = slice(max(index - 19, 0), index + 1)
+        assert vwap.value == pytest.approx(
+            np.average(prices[window], weights=volumes[window])
+        )
+        assert rolling_max.value == prices[max(index - 59, 0) : index + 1].max()
+        assert rolling_min.value == prices[max(index - 59, 0) : index + 1].min()
+
+    true_ranges = np.abs(np.diff(prices))
+    expected_atr = true_ranges[:14].mean()
+    for true_range in true_ranges[14:]:
+        expected_atr = (expected_atr * 13 + true_range) / 14
+
+    assert atr.value == pytest.approx(expected_atr)
+
+
+def test_engine_sync(session: Session) -> None:
+    pair = add_pair_with_quotes(session, [10**18, 2 * 10**18, 3 * 10**18])
+    engine = IndicatorEngine(history_size=2)
+
+    engine.sync(session, [pair.address])
+    pair_indicators = engine.get(pair.address)
+
+    # rebuilt from the latest history_size quotes only
+    assert pair_indicators.prices.to_array().tolist() == [2, 3]
+    assert pair_indicators.values["max_60"] == 3
+
+    with pytest.raises(TypeError):
+        pair_indicators.values["max_60"] = 0  # type: ignore[index]
+
+    engine.sync(session, [pair.address])
+    assert pair_indicators.prices.to_array().tolist() == [2, 3]
+
+    # stored in the same second as the last quote read, still picked up once
+    assert pair_indicators.last_timestamp
+    PairStore(session).add_pair_quote(
+        PairQuote(
+            pair_address=pair.address,
+            price=4 * 10**18,
+            data={"index": 3},
+            timestamp=pair_indicators.last_timestamp,
+        )
+    )
+    session.commit()
+
+    engine.sync(session, [pair.address])
+    engine.sync(session, [pair.address])
+    assert pair_indicators.prices.to_array().tolist() == [3, 4]
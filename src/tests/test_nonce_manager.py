@@ -0,0 +1,164 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from eth_account.account import LocalAccount
+from hexbytes import HexBytes
+from sqlalchemy import func, select
+from web3 import Web3
+
+from database.advisory_lock import advisory_lock, wallet_lock_key
+from database.session_factory import SessionFactory
+from web3_helper.helper import Web3Client
+from web3_helper.nonce_manager import NonceManager
+
+
+class FakeAccount:
+    def sign_transaction(self, tx_params: dict[str, Any], key: Any) -> Any:
+        # the raw transaction only carries its nonce
+        raw_transaction = tx_params["nonce"].to_bytes(32, "big")
+        return SimpleNamespace(rawTransaction=raw_transaction, hash=raw_transaction)
+
+
+class FakeEth:
+    def __init__(self) -> None:
+        self.account = FakeAccount()
+        self.chain_nonce = 5
+        self.count_calls = 0
+        self.sent_nonces: list[int] = []
+        self.error: Exception | None = None
+
+    def get_transaction_count(self, address: str, block_identifier: str) -> int:
+        self.count_calls += 1
+        return self.chain_nonce
+
+    def send_raw_transaction(self, raw_transaction: bytes) -> HexBytes:
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+
+        nonce = int.from_bytes(raw_transaction, "big")
+        if nonce < self.chain_nonce:
+            raise ValueError({"code": -32000, "message": "nonce too low"})
+
+        self.sent_nonces.append(nonce)
+        self.chain_nonce = nonce + 1
+
+        return HexBytes(len(self.sent_nonces).to_bytes(32, "big"))
+
+
+class FakeWeb3Client(Web3Client):
+    class Web3:
+        def __init__(self) -> None:
+            self.eth = FakeEth()
+
+    def __init__(self) -> None:
+        self._web3 = FakeWeb3Client.Web3()  # type: ignore
+
+    def to_checksum_address(self, address: str) -> Any:
+        return Web3.to_checksum_address(address)
+
+
+def tx_params() -> Any:
+    return {
+        "to": "0x0000000000000000000000000000000000000001",
+        "gas": 21_000,
+        "maxPriorityFeePerGas": 1,
+        "maxFeePerGas": 2,
+        "type": "0x2",
+        "chainId": 8453,
+        "value": 0,
+    }
+
+
+def test_nonce_manager(mock_wallet: LocalAccount) -> None:
+    web3_client = FakeWeb3Client()
+    eth: FakeEth = web3_client.web3.eth  # type: ignore[assignment]
+    nonce_manager = NonceManager(web3_client=web3_client, address=mock_wallet.address)
+
+    # back to back, without waiting for a receipt
+    first_hash = nonce_manager.send_transaction(
+        wallet=mock_wallet, tx_params=tx_params()
+    )
+    nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    assert eth.sent_nonces == [5, 6]
+    assert eth.count_calls == 1
+    assert nonce_manager.pending_count() == 2
+
+    nonce_manager.confirm(first_hash)
+    assert nonce_manager.pending_count() == 1
+
+    # another sender used the wallet
+    eth.chain_nonce = 10
+    nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    assert eth.sent_nonces == [5, 6, 10]
+
+    # the last one was dropped by the node
+    eth.chain_nonce = 10
+    nonce_manager.resync()
+    assert nonce_manager.pending_count() == 1
+    nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    assert eth.sent_nonces == [5, 6, 10, 10]
+
+    # unknown outcome, the chain is asked again
+    eth.error = ConnectionError()
+    with pytest.raises(ConnectionError):
+        nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+
+    count_calls = eth.count_calls
+    nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    assert eth.count_calls == count_calls + 1
+    assert eth.sent_nonces == [5, 6, 10, 10, 11]
+
+    # taken by the node already, not sent again with another nonce
+    eth.error = ValueError({"code": -32000, "message": "already known"})
+    tx_hash = nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    assert tx_hash == HexBytes((12).to_bytes(32, "big"))
+    assert eth.sent_nonces == [5, 6, 10, 10, 11]
+
+    # another sender replaced it, the caller is told
+    eth.error = ValueError(
+        {"code": -32000, "message": "replacement transaction underpriced"}
+    )
+    with pytest.raises(ValueError):
+        nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    assert eth.sent_nonces == [5, 6, 10, 10, 11]
+
+
+def test_nonce_manager_send_lock(
+    mock_wallet: LocalAccount, connection_string: str
+) -> None:
+    engine = SessionFactory(connection_string).engine
+    lock_key = wallet_lock_key(mock_wallet.address)
+    web3_client = FakeWeb3Client()
+    eth: FakeEth = web3_client.web3.eth  # type: ignore[assignment]
+    held_by_other: list[bool] = []
+
+    def send_lock() -> Any:
+        return advisory_lock(engine, lock_key)
+
+    nonce_manager = NonceManager(
+        web3_client=web3_client, address=mock_wallet.address, send_lock=send_lock
+    )
+
+    def send_raw_transaction(raw_transaction: bytes) -> HexBytes:
+        # another process can't take the wallet lock while sending
+        with engine.connect() as connection:
+            held_by_other.append(
+                not connection.scalar(
+                    select(func.pg_try_advisory_xact_lock(func.hashtext(lock_key)))
+                )
+            )
+            connection.rollback()
+
+        return FakeEth.send_raw_transaction(eth, raw_transaction)
+
+    eth.send_raw_transaction = send_raw_transaction  # type: ignore[method-assign]
+
+    nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+    # another process sent two transactions
+    eth.chain_nonce = 8
+    nonce_manager.send_transaction(wallet=mock_wallet, tx_params=tx_params())
+
+    assert eth.sent_nonces == [5, 8]
+    assert held_by_other == [True, True]
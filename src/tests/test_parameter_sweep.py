@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from models.trade_setting import TradeSettingName
+from tests.test_backtest import add_pair_with_quotes
+from tradebot.backtest import Backtest, SimulatedExecution
+from tradebot.parameter_sweep import ParameterSweep, QuoteHistory
+from tradebot.trade_strategies.prudent_pump_strategy import PrudentPumpStrategy
+from web3_helper.helper import Web3Client
+
+
+def test_parameter_sweep(session: Session) -> None:
+    pair = add_pair_with_quotes(
+        session, [10**12, 13 * 10**11, 16 * 10**11, 10**12, 10**11]
+    )
+    backtest = Backtest(
+        strategy_name=PrudentPumpStrategy.NAME, web3_client=Web3Client()
+    )
+    pairs, tokens = backtest.load_pairs(session, [pair.address])
+
+    history = QuoteHistory.load(session, pairs=pairs, tokens=tokens, chunk_size=2)
+    try:
+        assert history.offsets == {pair.address: (0, 5)}
+        assert history.prices.tolist()[2] == 16 * 10**11
+
+        results = ParameterSweep(
+            strategy_name=PrudentPumpStrategy.NAME,
+            grid={"pnl_sell": [25, 50, 1000], "min_profit": [1000]},
+            buy_amount=10**16,
+            execution=SimulatedExecution(slippage=0),
+            settings={TradeSettingName.STOP_LOSS: -95},
+            workers=2,
+        ).run(history)
+    finally:
+        history.close()
+
+    # sold at +60%, then at +30%, held through the crash last
+    assert [result.params["pnl_sell"] for result in results] == [50, 25, 1000]
+    assert results[0].trade_count == 2
+    assert results[0].return_percent == pytest.approx(60)
+    assert results[2].return_percent < -80
+
+
+def test_invalid_grid() -> None:
+    with pytest.raises(ValueError):
+        ParameterSweep(
+            strategy_name=PrudentPumpStrategy.NAME,
+            grid={"unknown": [1]},
+            buy_amount=10**16,
+        ).get_param_sets()
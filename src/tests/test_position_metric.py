@@ -2,13 +2,11 @@ import time
 from decimal import Decimal
 
 from models.token import PairQuote, Position, Token
-from models.utils import get_position_metric
-from web3_helper.helper import Web3Client
+from models.utils import get_position_metric, get_position_metrics
 
 
 def test_position_metric_fn() -> None:
     pair_address = "0x00"
-    web3_client = Web3Client()
     base_token = Token(
         address="0x01",
         name="Test",
@@ -30,7 +28,6 @@ def test_position_metric_fn() -> None:
 
     metric = get_position_metric(
         position=position,
-        web3_client=web3_client,
         base_token=base_token,
         latest_quote=pair_quote,
     )
@@ -48,7 +45,6 @@ def test_position_metric_fn() -> None:
 
     metric = get_position_metric(
         position=position,
-        web3_client=web3_client,
         base_token=base_token,
         latest_quote=second_pair_quote,
     )
@@ -59,3 +55,23 @@ def test_position_metric_fn() -> None:
         "profit_and_loss": Decimal("-0.000127422280232"),
         "profit_and_loss_percent": -6.371114011599999,
     }
+
+
+def test_position_metrics_batch() -> None:
+    metrics = get_position_metrics(
+        balances=[203275914293585192130411757, 203275914293585192130411757, 10**24],
+        decimals=[18, 18, 6],
+        book_values=[2000000000000000, 2000000000000000, 0],
+        prices=[11212000, 9212000, 10**18],
+    )
+
+    assert [metric.profit_and_loss_percent for metric in metrics] == [
+        13.956477388399998,
+        -6.371114011599999,
+        0,
+    ]
+    assert metrics[1].profit_and_loss == Decimal("-0.000127422280232")
+
+    # market value above int64 stays exact
+    assert metrics[2].market_value == Decimal(10**18)
+    assert metrics[2].price_paid == 0
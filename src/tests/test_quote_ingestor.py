@@ -0,0 +1,143 @@
+import time
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.pair_price_alert_store import PairPriceAlertStore
+from database.pair_store import PairStore
+from database.position_store import PositionStore
+from database.session_factory import SessionFactory
+from database.token_store import TokenStore
+from ext_api.dexscreener import DexPair, DexScreener, PairsResponse
+from models.dex_id import DexId
+from models.event import (
+    MAX_QUOTE_AGE,
+    EventType,
+    PersistedEvent,
+    Queue,
+    ShedReason,
+    get_shed_reason,
+)
+from models.token import Pair, Position, Token, get_quote_timestamp
+from tests.conftest import random_address
+from tests.test_dexscreener import dex_pair
+from tradebot.quote_ingestor import QuoteIngestor, get_pair_shard
+
+
+def test_pair_shards() -> None:
+    pair_addresses = [random_address() for _ in range(100)]
+    ingestors = [
+        QuoteIngestor(session_factory=None, shard_index=index, shard_count=3)  # type: ignore[arg-type]
+        for index in range(3)
+    ]
+
+    for pair_address in pair_addresses:
+        owners = [ingestor.is_owned(pair_address) for ingestor in ingestors]
+        assert owners.count(True) == 1
+        assert owners.index(True) == get_pair_shard(pair_address, 3)
+
+    with pytest.raises(ValueError):
+        QuoteIngestor(session_factory=None, shard_index=3, shard_count=3)  # type: ignore[arg-type]
+
+
+def test_ingest_quotes(
+    session: Session, connection_string: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    token_store = TokenStore(session)
+    base_token = Token(
+        address=random_address(),
+        name="Test",
+        symbol="TST",
+        decimals=18,
+        balance=10**18,
+    )
+    quote_token = Token(
+        address=random_address(), name="Wrapped Ether", symbol="WETH", decimals=18
+    )
+    token_store.add_token(base_token)
+    token_store.add_token(quote_token)
+
+    pair = Pair(
+        address=random_address(),
+        base_address=base_token.address,
+        quote_address=quote_token.address,
+        dex=DexId("uniswap", "v2"),
+        chain="base",
+    )
+    PairStore(session).add_pair(pair)
+    PositionStore(session).add_position(
+        Position(
+            pair_address=pair.address,
+            created_at=int(time.time()),
+            token_bought=10**18,
+            book_value=10**15,
+        )
+    )
+    session.commit()
+
+    fetched_pairs: list[list[str]] = []
+
+    def get_pairs(pair_addresses: list[str], chain: str = "base") -> PairsResponse:
+        fetched_pairs.append(pair_addresses)
+        response_pair = dex_pair(pair.address)
+        # worth twice the book value, over the alert threshold
+        response_pair["priceNative"] = 0.002
+        return PairsResponse(
+            schemaVersion="1.0.0", pairs=[DexPair.model_validate(response_pair)]
+        )
+
+    monkeypatch.setattr(DexScreener, "get_pairs", staticmethod(get_pairs))
+
+    ingestor = QuoteIngestor(session_factory=SessionFactory(connection_string))
+    assert ingestor.ingest() == 1
+    assert pair.address in fetched_pairs[0]
+
+    latest_quote = PairStore(session).get_latest_quote(pair.address)
+    assert latest_quote and latest_quote.price == 2 * 10**15
+
+    price_alert = PairPriceAlertStore(session).get_latest_price_alert(pair.address)
+    assert price_alert and price_alert.pnl_percent == 100
+
+    chat_events = session.scalars(
+        select(PersistedEvent).where(
+            PersistedEvent.queue == Queue.CHAT_BOT.value,
+            PersistedEvent.event_type == EventType.CHAT.value,
+            PersistedEvent.created_at >= price_alert.created_at,
+        )
+    )
+    assert any(
+        event.data["message"].startswith("Price Alert for TST +10%")
+        for event in chat_events
+    )
+
+    # same data, deduplicated and no new alert
+    assert ingestor.ingest() == 0
+
+    # the price didn't move for a while, the stored quote is old
+    latest_quote.timestamp = int(time.time()) - 2 * MAX_QUOTE_AGE
+    session.commit()
+    stale_data = {"quote_timestamp": latest_quote.timestamp}
+    assert (
+        get_shed_reason(
+            event_type=EventType.BUY,
+            expire_at=None,
+            data=stale_data,
+            now=int(time.time()),
+        )
+        == ShedReason.STALE_QUOTE
+    )
+
+    # deduplicated, still checked just now, a buy on it isn't dropped
+    assert ingestor.ingest() == 0
+    session.refresh(pair)
+    quote_timestamp = get_quote_timestamp(
+        pair, PairStore(session).get_latest_quote(pair.address)
+    )
+    assert quote_timestamp and quote_timestamp > latest_quote.timestamp
+    assert not get_shed_reason(
+        event_type=EventType.BUY,
+        expire_at=None,
+        data={"quote_timestamp": quote_timestamp},
+        now=int(time.time()),
+    )
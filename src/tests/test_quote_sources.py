@@ -0,0 +1,199 @@
+from typing import Any, Sequence
+
+from sqlalchemy.orm import Session
+from web3.contract.contract import ContractFunction
+from web3.types import BlockIdentifier
+
+from database.token_store import TokenStore
+from models.dex_id import DexId
+from models.token import Pair, Token
+from tests.conftest import random_address
+from tradebot.quote_sources import (
+    OnChainQuoteSource,
+    get_reserves_price,
+    get_sqrt_price_x96_price,
+)
+from web3_helper.helper import Web3Client
+from web3_helper.multicall import Multicall, MulticallResult
+
+
+def test_reserves_price() -> None:
+    # 1000 base for 1 weth
+    assert (
+        get_reserves_price(
+            base_is_token0=True,
+            reserve0=1000 * 10**18,
+            reserve1=10**18,
+            base_decimals=18,
+            quote_decimals=18,
+        )
+        == 10**15
+    )
+    assert (
+        get_reserves_price(
+            base_is_token0=False,
+            reserve0=10**18,
+            reserve1=1000 * 10**18,
+            base_decimals=18,
+            quote_decimals=18,
+        )
+        == 10**15
+    )
+    # 3000 of a 6 decimals base for 1 weth
+    assert (
+        get_reserves_price(
+            base_is_token0=True,
+            reserve0=3000 * 10**6,
+            reserve1=10**18,
+            base_decimals=6,
+            quote_decimals=18,
+        )
+        == 333333333333333
+    )
+    assert (
+        get_reserves_price(
+            base_is_token0=True,
+            reserve0=0,
+            reserve1=10**18,
+            base_decimals=18,
+            quote_decimals=18,
+        )
+        is None
+    )
+
+
+def test_sqrt_price_x96_price() -> None:
+    # sqrt price of 2, one token0 is worth 4 token1
+    sqrt_price_x96 = 2 * 2**96
+
+    assert (
+        get_sqrt_price_x96_price(
+            base_is_token0=True,
+            sqrt_price_x96=sqrt_price_x96,
+            base_decimals=18,
+            quote_decimals=18,
+        )
+        == 4 * 10**18
+    )
+    assert (
+        get_sqrt_price_x96_price(
+            base_is_token0=False,
+            sqrt_price_x96=sqrt_price_x96,
+            base_decimals=18,
+            quote_decimals=18,
+        )
+        == 25 * 10**16
+    )
+    # a raw 6 decimals token1 base is worth 2**20 raw weth
+    assert (
+        get_sqrt_price_x96_price(
+            base_is_token0=False,
+            sqrt_price_x96=2**86,
+            base_decimals=6,
+            quote_decimals=18,
+        )
+        == 2**20 * 10**6
+    )
+
+
+class FakeMulticall(Multicall):
+    def __init__(self, results: list[Any | None]) -> None:
+        super().__init__(web3_client=Web3Client())
+        self.results = results
+        self.function_names: list[str] = []
+
+    def aggregate(
+        self,
+        functions: Sequence[ContractFunction],
+        *,
+        block_identifier: BlockIdentifier = "latest",
+    ) -> MulticallResult:
+        self.function_names = [function.fn_name for function in functions]
+        return MulticallResult(block_number=1234, results=self.results)
+
+
+def add_pair(session: Session, dex: DexId, quote_token: Token) -> Pair:
+    base_token = Token(address=random_address(), name="Test", symbol="TST", decimals=18)
+    TokenStore(session).add_token(base_token)
+
+    return Pair(
+        address=random_address(),
+        base_address=base_token.address,
+        quote_address=quote_token.address,
+        dex=dex,
+        chain="base",
+    )
+
+
+def test_onchain_quotes(session: Session) -> None:
+    # above any random address, the base token is always token0
+    quote_token = Token(
+        address=f"0x{'f' * 40}", name="Wrapped Ether", symbol="WETH", decimals=18
+    )
+    if not TokenStore(session).get_token(quote_token.address):
+        TokenStore(session).add_token(quote_token)
+
+    v2_pair = add_pair(session, DexId("uniswap", "v2"), quote_token)
+    v3_pair = add_pair(session, DexId("uniswap", "v3"), quote_token)
+    reverted_pair = add_pair(session, DexId("aerodrome", "v1"), quote_token)
+    unsupported_pair = add_pair(session, DexId("uniswap", "v4"), quote_token)
+    session.flush()
+
+    multicall = FakeMulticall(
+        [
+            (1000 * 10**18, 10**18, 0),
+            (2 * 2**96, 0, 0, 0, 0, 0, True),
+            None,
+            None,
+            None,
+        ]
+    )
+    quotes = OnChainQuoteSource(
+        web3_client=Web3Client(), multicall=multicall
+    ).get_quotes(session, [v2_pair, v3_pair, reverted_pair, unsupported_pair])
+
+    assert multicall.function_names == [
+        "getReserves",
+        "slot0",
+        "getReserves",
+        "stable",
+        "getAmountOut",
+    ]
+    assert [(quote.pair_address, quote.price) for quote in quotes] == [
+        (v2_pair.address, 10**15),
+        (v3_pair.address, 4 * 10**18),
+    ]
+    assert all(quote.block_number == 1234 for quote in quotes)
+
+
+def test_onchain_aerodrome_quotes(session: Session) -> None:
+    quote_token = Token(
+        address=f"0x{'f' * 40}", name="Wrapped Ether", symbol="WETH", decimals=18
+    )
+    if not TokenStore(session).get_token(quote_token.address):
+        TokenStore(session).add_token(quote_token)
+
+    volatile_pair = add_pair(session, DexId("aerodrome", "v1"), quote_token)
+    stable_pair = add_pair(session, DexId("aerodrome", "v1"), quote_token)
+    session.flush()
+
+    # same reserves, the stable curve prices the base far above their ratio
+    multicall = FakeMulticall(
+        [
+            (1000 * 10**18, 10**18, 0),
+            False,
+            996 * 10**12,
+            (1000 * 10**18, 10**18, 0),
+            True,
+            999 * 10**15,
+        ]
+    )
+    quotes = OnChainQuoteSource(
+        web3_client=Web3Client(), multicall=multicall
+    ).get_quotes(session, [volatile_pair, stable_pair])
+
+    assert [(quote.pair_address, quote.price) for quote in quotes] == [
+        (volatile_pair.address, 10**15),
+        (stable_pair.address, 999 * 10**15),
+    ]
+    assert quotes[1].data["stable"]
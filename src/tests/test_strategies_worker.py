@@ -0,0 +1,139 @@
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.event_store import EventStore
+from database.notification_listener import (
+    COMPLETED_EVENTS_CHANNEL,
+    PAIR_QUOTES_CHANNEL,
+    Notification,
+)
+from database.pair_store import PairStore
+from database.position_store import PositionStore
+from database.session_factory import SessionFactory
+from database.strategy_state_store import StrategyStateStore
+from database.token_store import TokenStore
+from models.dex_id import DexId
+from models.event import EventType, PersistedEvent, PersistedEventStatus
+from models.token import Pair, PairQuote, Position, Token
+from tests.conftest import random_address
+from tradebot.strategies_worker import StrategiesWorker
+from tradebot.trade_strategies.stop_loss_strategy import StopLossStrategy
+from web3_helper.helper import Web3Client
+
+
+def get_sell_events(session: Session, pair_address: str) -> list[PersistedEvent]:
+    stmt = select(PersistedEvent).where(
+        PersistedEvent.event_type == EventType.SELL.value,
+        PersistedEvent.partition_key == pair_address,
+    )
+    return list(session.scalars(stmt))
+
+
+def test_stop_loss_tick(session: Session, connection_string: str) -> None:
+    token_store = TokenStore(session)
+    base_token = Token(
+        address=random_address(),
+        name="Test",
+        symbol="TST",
+        decimals=18,
+        balance=203275914293585192130411757,
+    )
+    quote_token = Token(
+        address=random_address(), name="Wrapped Ether", symbol="WETH", decimals=18
+    )
+    token_store.add_token(base_token)
+    token_store.add_token(quote_token)
+    session.commit()
+
+    pair = Pair(
+        address=random_address(),
+        base_address=base_token.address,
+        quote_address=quote_token.address,
+        dex=DexId("uniswap", "v2"),
+        chain="base",
+        strategy=StopLossStrategy.NAME,
+    )
+    pair_store = PairStore(session)
+    pair_store.add_pair(pair)
+    session.commit()
+
+    pair_store.add_pair_quote(
+        PairQuote(
+            pair_address=pair.address,
+            price=5000000,
+            data={},
+            timestamp=int(time.time()),
+        )
+    )
+    PositionStore(session).add_position(
+        Position(
+            pair_address=pair.address,
+            created_at=int(time.time()),
+            token_bought=203275914293585192130411757,
+            book_value=2000000000000000,
+        )
+    )
+    session.commit()
+
+    worker = StrategiesWorker(SessionFactory(connection_string), Web3Client())
+
+    # position is ~50% down, a sell is pushed and awaited over the next ticks
+    worker.run_tick(session, {pair.address})
+    worker.run_tick(session, {pair.address})
+
+    sell_events = get_sell_events(session, pair.address)
+    assert len(sell_events) == 1
+
+    db_state = StrategyStateStore(session).get_last_state(
+        pair_address=pair.address, strategy_name=StopLossStrategy.NAME
+    )
+    assert db_state
+    assert db_state.data["pending_event_id"] == sell_events[0].id
+
+    EventStore(session).complete_event(sell_events[0])
+    base_token.balance = 0
+    session.commit()
+
+    worker.run_tick(session)
+    session.refresh(db_state)
+
+    # write-behind, the state is only flushed right away when a trade is pushed
+    assert db_state.data["pending_event_id"] == sell_events[0].id
+
+    worker.state_cache.flush(session)
+    session.refresh(db_state)
+
+    assert db_state.data["pending_event_id"] is None
+    assert len(get_sell_events(session, pair.address)) == 1
+    assert sell_events[0].status == PersistedEventStatus.COMPLETED
+
+
+def test_dirty_pairs(connection_string: str) -> None:
+    worker = StrategiesWorker(SessionFactory(connection_string), Web3Client())
+
+    assert worker._get_dirty_pairs(
+        [
+            Notification(channel=PAIR_QUOTES_CHANNEL, payload="0xpair1"),
+            Notification(
+                channel=COMPLETED_EVENTS_CHANNEL,
+                payload="1:completed:trade-bot:0xpair2",
+            ),
+            Notification(
+                channel=COMPLETED_EVENTS_CHANNEL, payload="2:completed:chat-bot:"
+            ),
+        ]
+    ) == {"0xpair1", "0xpair2"}
+
+    # balance refresh, every pair is evaluated
+    assert (
+        worker._get_dirty_pairs(
+            [
+                Notification(
+                    channel=COMPLETED_EVENTS_CHANNEL, payload="3:failed:trade-bot:"
+                )
+            ]
+        )
+        is None
+    )
@@ -0,0 +1,74 @@
+import logging
+import time
+
+import pytest
+
+from tradebot.strategy_watchdog import StrategyWatchdog
+from tradebot.trade_strategies.trade_strategy import StrategyState, TradeStrategy
+
+
+class SlowStrategy(TradeStrategy[StrategyState]):
+    NAME = "slow"
+    TIME_BUDGET = 0.01
+
+
+class SlowProtectiveStrategy(SlowStrategy):
+    NAME = "slow_protective"
+    PROTECTIVE = True
+
+
+def test_overruns_suspend_the_pair(caplog: pytest.LogCaptureFixture) -> None:
+    watchdog = StrategyWatchdog(max_overruns=2)
+    strategy = SlowStrategy()
+
+    for _ in range(2):
+        assert not watchdog.is_suspended(strategy_name="slow", pair_address="0xpair")
+
+        with watchdog.track(strategy=strategy, pair_address="0xpair"):
+            time.sleep(0.02)
+            with caplog.at_level(logging.WARNING):
+                watchdog.check_running()
+
+    assert "still running" in caplog.text
+    assert watchdog.is_suspended(strategy_name="slow", pair_address="0xpair")
+    # other pairs of the same strategy keep running
+    assert not watchdog.is_suspended(strategy_name="slow", pair_address="0xother")
+
+    stats = watchdog.metrics.summary()["slow"]
+    assert stats["count"] == 2
+    assert stats["overruns"] == 2
+    assert stats["skipped"] == 1
+    assert stats["p50"] >= 0.02
+
+
+def test_suspension_expires() -> None:
+    watchdog = StrategyWatchdog(max_overruns=1, suspend_duration=0)
+
+    with watchdog.track(strategy=SlowStrategy(), pair_address="0xpair"):
+        time.sleep(0.02)
+
+    assert not watchdog.is_suspended(strategy_name="slow", pair_address="0xpair")
+
+    # a run within its budget clears the probation
+    with watchdog.track(strategy=SlowStrategy(), pair_address="0xpair"):
+        pass
+
+    assert not watchdog.is_suspended(strategy_name="slow", pair_address="0xpair")
+
+
+def test_protective_strategy_never_suspended(caplog: pytest.LogCaptureFixture) -> None:
+    watchdog = StrategyWatchdog(max_overruns=1)
+
+    for _ in range(2):
+        with caplog.at_level(logging.ERROR):
+            with watchdog.track(
+                strategy=SlowProtectiveStrategy(), pair_address="0xpair"
+            ):
+                time.sleep(0.02)
+
+        assert not watchdog.is_suspended(
+            strategy_name="slow_protective", pair_address="0xpair"
+        )
+
+    assert "not suspended" in caplog.text
+    assert watchdog.metrics.summary()["slow_protective"]["overruns"] == 2
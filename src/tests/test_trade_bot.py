@@ -0,0 +1,67 @@
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from database.completion_waiter import CompletionWaiter
+from database.event_store import EventStore
+from database.session_factory import SessionFactory
+from models.event import (
+    EventType,
+    PersistedEvent,
+    PersistedEventStatus,
+    Queue,
+    UpdateBalancesEvent,
+)
+from models.event_handler import EventHandler
+from settings import TradeBotSettings
+from tradebot.trade_bot import TradeBot
+
+
+class ReclaimedHandler(EventHandler[UpdateBalancesEvent]):
+    def __init__(self, connection_string: str) -> None:
+        self.connection_string = connection_string
+
+    def run(self, *, event: UpdateBalancesEvent, session: Session) -> None:
+        # the lease ran out mid trade and another worker took the event
+        with SessionFactory(self.connection_string).session() as other_session:
+            persisted_event = other_session.get(PersistedEvent, event.id)
+            assert persisted_event
+            persisted_event.leased_by = "worker-2"
+            other_session.commit()
+
+
+def test_reclaimed_event_not_resolved(
+    session: Session, connection_string: str, trade_bot_settings: TradeBotSettings
+) -> None:
+    session.execute(delete(PersistedEvent))
+    session.commit()
+
+    trade_bot = TradeBot(
+        wallet_private_key=trade_bot_settings["wallet_private_key"],
+        db_session_factory=SessionFactory(connection_string),
+        web3_provider_url=trade_bot_settings["web3_provider_url"],
+        base_scan_api_key="",
+    )
+    trade_bot.completion_waiter = CompletionWaiter(
+        engine=trade_bot.db_session_factory.engine
+    )
+    trade_bot.handlers = {UpdateBalancesEvent: ReclaimedHandler(connection_string)}
+
+    event = EventStore(session).add_event(
+        PersistedEvent(
+            queue=Queue.TRADE_BOT,
+            event_type=EventType.UPDATE_BALANCES,
+            data={},
+            created_at=int(time.time()),
+        )
+    )
+    session.commit()
+    completion = trade_bot.completion_waiter.wait_for(event.id)
+
+    assert trade_bot._process_next_event("worker-1")
+
+    # still processing by the other worker, which resolves it once done
+    session.refresh(event)
+    assert event.status == PersistedEventStatus.PROCESSING
+    assert not completion.done()
@@ -0,0 +1,42 @@
+import time
+
+from sqlalchemy import event
+
+from database.session_factory import SessionFactory
+from models.trade_setting import TradeSettingName
+from settings.trade_settings_manager import TradeSettingsManager
+
+
+def test_cached_reads(connection_string: str) -> None:
+    session_factory = SessionFactory(connection_string)
+    manager = TradeSettingsManager(session_factory)
+    manager.get_setting(TradeSettingName.STOP_LOSS)
+
+    statements: list[str] = []
+    event.listen(
+        session_factory.engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    for _ in range(10):
+        manager.get_setting(TradeSettingName.STOP_LOSS)
+
+    assert statements == []
+
+
+def test_change_propagates(connection_string: str) -> None:
+    manager = TradeSettingsManager(SessionFactory(connection_string))
+    other_manager = TradeSettingsManager(SessionFactory(connection_string))
+
+    manager.save_setting(TradeSettingName.SLIPPAGE, 0.1)
+    assert other_manager.get_setting(TradeSettingName.SLIPPAGE).get_float() == 0.1
+
+    manager.save_setting(TradeSettingName.SLIPPAGE, 0.25)
+    assert manager.get_setting(TradeSettingName.SLIPPAGE).get_float() == 0.25
+
+    # invalidated by the notification of the other process
+    deadline = time.monotonic() + 5
+    while other_manager.get_setting(TradeSettingName.SLIPPAGE).get_float() != 0.25:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
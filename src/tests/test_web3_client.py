@@ -0,0 +1,85 @@
+from typing import Any
+
+import pytest
+import requests
+
+from web3_helper.helper import Web3Client, construct_metrics_middleware
+from web3_helper.rpc_metrics import RPCMetrics
+
+
+class FakeResponse:
+    def __init__(self, body: list[dict[str, Any]]) -> None:
+        self.body = body
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> list[dict[str, Any]]:
+        return self.body
+
+
+class FakeSession(requests.Session):
+    def __init__(self) -> None:
+        super().__init__()
+        self.payloads: list[list[dict[str, Any]]] = []
+        self.error: dict[str, Any] | None = None
+
+    def post(self, url: str | bytes, *args: Any, **kwargs: Any) -> Any:
+        payload = kwargs["json"]
+        self.payloads.append(payload)
+
+        # answered out of order, as nodes are allowed to
+        body = [
+            (
+                {"jsonrpc": "2.0", "id": request["id"], "error": self.error}
+                if self.error
+                else {
+                    "jsonrpc": "2.0",
+                    "id": request["id"],
+                    "result": request["method"],
+                }
+            )
+            for request in reversed(payload)
+        ]
+
+        return FakeResponse(body)
+
+
+def test_batch_request() -> None:
+    web3_client = Web3Client(web3_provider_url="http://localhost:8545")
+    session = FakeSession()
+    web3_client._session = session
+
+    results = web3_client.batch_request(
+        [("eth_blockNumber", []), ("eth_chainId", []), ("eth_gasPrice", [])]
+    )
+
+    # one round-trip, results in the requests order
+    assert len(session.payloads) == 1
+    assert results == ["eth_blockNumber", "eth_chainId", "eth_gasPrice"]
+    assert web3_client.metrics.summary()["eth_chainId"]["count"] == 1
+
+    session.error = {"code": -32000, "message": "header not found"}
+    with pytest.raises(Exception):
+        web3_client.batch_request([("eth_call", [])])
+
+    assert web3_client.metrics.summary()["eth_call"]["errors"] == 1
+
+
+def test_metrics_middleware() -> None:
+    metrics = RPCMetrics()
+    responses: list[Any] = [
+        {"jsonrpc": "2.0", "id": 1, "result": "0x1"},
+        {"jsonrpc": "2.0", "id": 2, "error": {"code": -32000}},
+    ]
+
+    middleware = construct_metrics_middleware(metrics)(
+        lambda method, params: responses.pop(0), None  # type: ignore[arg-type]
+    )
+    middleware("eth_blockNumber", [])  # type: ignore[arg-type]
+    middleware("eth_blockNumber", [])  # type: ignore[arg-type]
+
+    stats = metrics.summary()["eth_blockNumber"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert stats["max"] >= stats["p50"] >= 0
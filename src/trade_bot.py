@@ -1,7 +1,9 @@
 from database.session_factory import SessionFactory
 from settings import SettingsFactory
+from tradebot.event_archiver import EventArchiver
 from tradebot.strategies_worker import StrategiesWorker
 from tradebot.trade_bot import TradeBot
+from web3_helper.allowance_manager import ApprovalPolicy
 from web3_helper.helper import Web3Helper
 
 if __name__ == "__main__":
@@ -16,11 +18,21 @@ if __name__ == "__main__":
 
     strategies_worker.start()
 
+    event_archiver = EventArchiver(
+        session_factory=db_session_factory,
+        retention=bot_settings["event_retention_days"] * 24 * 3600,
+    )
+
+    event_archiver.start()
+
     trade_bot = TradeBot(
         wallet_private_key=bot_settings["wallet_private_key"],
         db_session_factory=db_session_factory,
         web3_provider_url=bot_settings["web3_provider_url"],
         base_scan_api_key=bot_settings["basescan_api_key"],
+        workers=bot_settings["trade_bot_workers"],
+        approval_policy=ApprovalPolicy(bot_settings["approval_policy"]),
+        approval_multiple=bot_settings["approval_multiple"],
     )
 
     trade_bot.run()
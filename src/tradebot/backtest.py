@@ -0,0 +1,487 @@
+import logging
+import time
+from decimal import Decimal
+from itertools import groupby
+from typing import Any, Iterable, Iterator
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from database.pair_store import PairStore
+from database.token_store import TokenStore
+from models.event import (
+    EventPriority,
+    EventType,
+    PersistedEvent,
+    PersistedEventStatus,
+    Queue,
+)
+from models.token import Pair, PairQuote, Position, PositionMetric, Token
+from models.trade_setting import TradeSetting, TradeSettingName
+from models.utils import get_position_metrics
+from tradebot.indicators import DEFAULT_INDICATORS, PairIndicators
+from tradebot.strategies_worker import StrategyFactory
+from tradebot.trade_strategies.trade_strategy import (
+    StrategyContext,
+    StrategyState,
+    TradeStrategy,
+)
+from web3_helper.helper import Web3Client
+
+logger = logging.getLogger(__name__)
+
+WEI_PER_ETHER = 10**18
+
+
+class SimulatedExecution:
+    def __init__(self, *, slippage: float = 0.01, gas_fee: int = 0) -> None:
+        # slippage is a ratio, gas_fee is paid in quote token wei on every fill
+        self.slippage = slippage
+        self.gas_fee = gas_fee
+
+    def buy(self, *, amount_in: int, price: int, decimals: int) -> int:
+        fill_price = int(price * (1 + self.slippage))
+        return amount_in * 10**decimals // fill_price if fill_price > 0 else 0
+
+    def sell(self, *, amount: int, price: int, decimals: int) -> int:
+        fill_price = int(price * (1 - self.slippage))
+        return amount * fill_price // 10**decimals
+
+
+class PairBacktestResult(BaseModel):
+    pair_address: str
+    quote_count: int
+    trade_count: int
+    invested: Decimal
+    profit_and_loss: Decimal
+    return_percent: float
+    max_drawdown_percent: float
+
+
+class BacktestReport(BaseModel):
+    strategy_name: str
+    pairs: list[PairBacktestResult]
+    quote_count: int
+    trade_count: int
+    invested: Decimal
+    profit_and_loss: Decimal
+    return_percent: float
+    max_drawdown_percent: float
+    duration: float
+
+
+class PairBacktest:
+    def __init__(
+        self,
+        *,
+        pair: Pair,
+        base_token: Token,
+        quote_token: Token,
+        strategy: TradeStrategy,
+        execution: SimulatedExecution,
+        settings: dict[TradeSettingName, TradeSetting],
+        buy_amount: int,
+        web3_client: Web3Client,
+    ) -> None:
+        self.pair = pair
+        self.base_token = base_token
+        self.quote_token = quote_token
+        self.strategy = strategy
+        self.execution = execution
+        self.settings = settings
+        self.buy_amount = buy_amount
+        self.web3_client = web3_client
+
+        self.state: StrategyState = strategy.new_state()
+        self.position: Position | None = None
+        self.cash = buy_amount
+        self.tick = 0
+        self.quote_count = 0
+        self.trade_count = 0
+        self.next_event_id = 1
+        self.finished_events: dict[int, PersistedEventStatus] = {}
+        self.peak_equity = buy_amount
+        self.equity = buy_amount
+        self.max_drawdown_percent = 0.0
+        self.indicators = PairIndicators(factories=DEFAULT_INDICATORS)
+        # one quote object per pair, updated in place for every row
+        self.latest_quote = PairQuote(
+            pair_address=pair.address, price=0, data={}, timestamp=0
+        )
+
+    def _open_position(self, *, timestamp: int, price: int) -> None:
+        self.base_token.balance = self.execution.buy(
+            amount_in=self.cash, price=price, decimals=self.base_token.decimals
+        )
+        self.position = Position(
+            pair_address=self.pair.address,
+            created_at=timestamp,
+            token_bought=int(self.base_token.balance),
+            book_value=self.cash,
+        )
+        self.cash = -self.execution.gas_fee
+        self.trade_count += 1
+
+    def fill(self, *, event_type: EventType, data: dict[str, Any]) -> PersistedEvent:
+        price = int(self.latest_quote.price)
+        decimals = self.base_token.decimals
+
+        if event_type == EventType.SELL and self.position:
+            amount = min(int(data["value"]), int(self.base_token.balance))
+            if amount > 0:
+                book_value_sold = (
+                    self.position.book_value
+                    * amount
+                    // max(int(self.base_token.balance), 1)
+                )
+                self.cash += self.execution.sell(
+                    amount=amount, price=price, decimals=decimals
+                )
+                self.cash -= self.execution.gas_fee
+                self.base_token.balance = int(self.base_token.balance) - amount
+                self.position.book_value -= book_value_sold
+                self.trade_count += 1
+
+            if self.base_token.balance <= 0:
+                self.position = None
+        elif event_type == EventType.BUY:
+            amount_in = int(data["value"])
+            bought = self.execution.buy(
+                amount_in=amount_in, price=price, decimals=decimals
+            )
+            self.cash -= amount_in + self.execution.gas_fee
+            self.base_token.balance = int(self.base_token.balance) + bought
+            if self.position:
+                self.position.book_value += amount_in
+            else:
+                self.position = Position(
+                    pair_address=self.pair.address,
+                    created_at=self.latest_quote.timestamp,
+                    token_bought=bought,
+                    book_value=amount_in,
+                )
+            self.trade_count += 1
+
+        event = PersistedEvent(
+            queue=Queue.TRADE_BOT,
+            event_type=event_type,
+            data=data,
+            created_at=self.latest_quote.timestamp,
+        )
+        event.id = self.next_event_id
+        self.next_event_id += 1
+        # fills are immediate, the strategy sees them finished on its next run
+        self.finished_events[event.id] = PersistedEventStatus.COMPLETED
+
+        return event
+
+    def _update_equity(self, price: int) -> None:
+        market_value = (
+            int(self.base_token.balance) // 10**self.base_token.decimals * price
+            if self.position
+            else 0
+        )
+        self.equity = self.cash + market_value
+
+        if self.equity > self.peak_equity:
+            self.peak_equity = self.equity
+        elif self.peak_equity > 0:
+            drawdown = (self.peak_equity - self.equity) / self.peak_equity * 100.00
+            self.max_drawdown_percent = max(self.max_drawdown_percent, drawdown)
+
+    def _get_metrics(self, prices: list[int]) -> list[PositionMetric | None]:
+        if not self.pair.strategy or not self.position or self.base_token.balance <= 0:
+            return [None] * len(prices)
+
+        return list(
+            get_position_metrics(
+                balances=[int(self.base_token.balance)] * len(prices),
+                decimals=[self.base_token.decimals] * len(prices),
+                book_values=[int(self.position.book_value)] * len(prices),
+                prices=prices,
+            )
+        )
+
+    def run_quotes(self, session: Session, rows: list[tuple[int, int]]) -> None:
+        # rows are (timestamp, price) in timestamp order
+        if self.quote_count == 0 and rows:
+            self._open_position(timestamp=rows[0][0], price=rows[0][1])
+
+        start = 0
+        while start < len(rows):
+            # metrics of the whole chunk in one pass, recomputed after a fill
+            metrics = self._get_metrics([price for _, price in rows[start:]])
+            filled_at: int | None = None
+
+            for index, position_metric in enumerate(metrics, start=start):
+                timestamp, price = rows[index]
+                self.latest_quote.timestamp = timestamp
+                self.latest_quote.price = price
+                self.indicators.update(timestamp=timestamp, price=price, volume=None)
+                trade_count = self.trade_count
+
+                self._run_strategy(session, position_metric)
+                self._update_equity(price)
+                self.quote_count += 1
+
+                if self.trade_count != trade_count:
+                    filled_at = index
+                    break
+
+            start = filled_at + 1 if filled_at is not None else len(rows)
+
+    def _run_strategy(
+        self, session: Session, position_metric: PositionMetric | None
+    ) -> None:
+        if not self.pair.strategy:
+            return
+
+        context = BacktestContext(
+            backtest=self,
+            pair=self.pair,
+            tick=self.tick,
+            state=self.state,
+            latest_quote=self.latest_quote,
+            base_token=self.base_token,
+            quote_token=self.quote_token,
+            position=self.position,
+            position_metric=position_metric,
+            web3_client=self.web3_client,
+            indicators=self.indicators.values,
+            pending_event_status=(
+                self.finished_events.get(self.state.pending_event_id)
+                if self.state.pending_event_id is not None
+                else None
+            ),
+        )
+
+        self.state = self.strategy.run(session=session, context=context).state
+        self.tick += 1
+
+    def get_result(self) -> PairBacktestResult:
+        profit_n_loss = self.equity - self.buy_amount
+
+        return PairBacktestResult(
+            pair_address=self.pair.address,
+            quote_count=self.quote_count,
+            trade_count=self.trade_count,
+            invested=Decimal(self.buy_amount) / WEI_PER_ETHER,
+            profit_and_loss=Decimal(profit_n_loss) / WEI_PER_ETHER,
+            return_percent=(
+                profit_n_loss / self.buy_amount * 100.00 if self.buy_amount else 0
+            ),
+            max_drawdown_percent=self.max_drawdown_percent,
+        )
+
+
+class BacktestContext(StrategyContext):
+    def __init__(self, *, backtest: PairBacktest, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.backtest = backtest
+
+    def push_trade_event(
+        self,
+        *,
+        session: Session,
+        event_type: EventType,
+        message_data: dict[str, Any],
+        priority: EventPriority | None = None,
+    ) -> PersistedEvent:
+        event = self.backtest.fill(event_type=event_type, data=message_data)
+        self.pushed_events.append(event)
+
+        return event
+
+    def push_chat_event(
+        self, *, session: Session, message_data: dict[str, Any]
+    ) -> None:
+        pass
+
+    def get_setting(
+        self, *, session: Session, setting_name: TradeSettingName
+    ) -> TradeSetting | None:
+        return self.backtest.settings.get(setting_name)
+
+    def disable_strategy(self, *, session: Session) -> None:
+        self.pair.strategy = ""
+
+
+class Backtest:
+    def __init__(
+        self,
+        *,
+        strategy_name: str,
+        web3_client: Web3Client,
+        strategy_factory: StrategyFactory | None = None,
+        buy_amount: int = WEI_PER_ETHER // 100,
+        execution: SimulatedExecution | None = None,
+        settings: dict[TradeSettingName, str | float] = {},
+        strategy_params: dict[str, Any] = {},
+        chunk_size: int = 10000,
+    ) -> None:
+        self.strategy_name = strategy_name
+        self.strategy_params = strategy_params
+        self.strategy_factory = strategy_factory or StrategyFactory()
+        self.web3_client = web3_client
+        self.buy_amount = buy_amount
+        self.execution = execution or SimulatedExecution()
+        self.settings = {
+            setting_name: TradeSetting(name=setting_name.value, value=value)
+            for setting_name, value in settings.items()
+        }
+        self.chunk_size = chunk_size
+
+    def _create_pair_backtest(
+        self, pair: Pair, tokens: dict[str, Token]
+    ) -> PairBacktest | None:
+        base_token = tokens.get(pair.base_address)
+        quote_token = tokens.get(pair.quote_address)
+        strategy = self.strategy_factory.create(
+            self.strategy_name, **self.strategy_params
+        )
+
+        if not base_token or not quote_token or not strategy:
+            return None
+
+        # detached copies, the simulation never writes to the database
+        return PairBacktest(
+            pair=Pair(
+                address=pair.address,
+                base_address=pair.base_address,
+                quote_address=pair.quote_address,
+                dex=pair.dex,
+                chain=pair.chain,
+                strategy=self.strategy_name,
+            ),
+            base_token=Token(
+                address=base_token.address,
+                name=base_token.name,
+                symbol=base_token.symbol,
+                decimals=base_token.decimals,
+            ),
+            quote_token=Token(
+                address=quote_token.address,
+                name=quote_token.name,
+                symbol=quote_token.symbol,
+                decimals=quote_token.decimals,
+            ),
+            strategy=strategy,
+            execution=self.execution,
+            settings=self.settings,
+            buy_amount=self.buy_amount,
+            web3_client=self.web3_client,
+        )
+
+    def load_pairs(
+        self, session: Session, pair_addresses: list[str] | None = None
+    ) -> tuple[list[Pair], dict[str, Token]]:
+        pairs = [
+            pair
+            for pair in PairStore(session).get_all_pairs()
+            if pair_addresses is None or pair.address in pair_addresses
+        ]
+        tokens = {
+            token.address: token
+            for token in TokenStore(session).get_tokens_by_addresses(
+                list(
+                    {pair.base_address for pair in pairs}
+                    | {pair.quote_address for pair in pairs}
+                )
+            )
+        }
+
+        return pairs, tokens
+
+    def replay(
+        self,
+        session: Session,
+        *,
+        pairs: list[Pair],
+        tokens: dict[str, Token],
+        quotes: Iterable[tuple[str, list[tuple[int, int]]]],
+    ) -> BacktestReport:
+        # quotes are (pair address, [(timestamp, price), ...]) batches, in
+        # timestamp order for each pair
+        started_at = time.monotonic()
+
+        backtests: dict[str, PairBacktest] = {}
+        for pair in pairs:
+            if pair_backtest := self._create_pair_backtest(pair, tokens):
+                backtests[pair.address] = pair_backtest
+
+        for pair_address, rows in quotes:
+            if pair_backtest := backtests.get(pair_address):
+                pair_backtest.run_quotes(session, rows)
+
+        return self._build_report(
+            [
+                pair_backtest.get_result()
+                for pair_backtest in backtests.values()
+                if pair_backtest.quote_count > 0
+            ],
+            time.monotonic() - started_at,
+        )
+
+    def _stream_quotes(
+        self,
+        session: Session,
+        *,
+        pair_addresses: list[str],
+        since: int | None,
+        until: int | None,
+    ) -> Iterator[tuple[str, list[tuple[int, int]]]]:
+        for rows in PairStore(session).iter_quote_prices(
+            pair_addresses=pair_addresses,
+            since=since,
+            until=until,
+            chunk_size=self.chunk_size,
+        ):
+            for pair_address, pair_rows in groupby(rows, key=lambda row: row[0]):
+                yield pair_address, [
+                    (timestamp, int(price)) for _, timestamp, price in pair_rows
+                ]
+
+    def run(
+        self,
+        session: Session,
+        *,
+        pair_addresses: list[str] | None = None,
+        since: int | None = None,
+        until: int | None = None,
+    ) -> BacktestReport:
+        pairs, tokens = self.load_pairs(session, pair_addresses)
+
+        return self.replay(
+            session,
+            pairs=pairs,
+            tokens=tokens,
+            quotes=self._stream_quotes(
+                session,
+                pair_addresses=[pair.address for pair in pairs],
+                since=since,
+                until=until,
+            ),
+        )
+
+    def _build_report(
+        self, results: Iterable[PairBacktestResult], duration: float
+    ) -> BacktestReport:
+        results = list(results)
+        invested = sum((result.invested for result in results), Decimal(0))
+        profit_n_loss = sum((result.profit_and_loss for result in results), Decimal(0))
+
+        return BacktestReport(
+            strategy_name=self.strategy_name,
+            pairs=results,
+            quote_count=sum(result.quote_count for result in results),
+            trade_count=sum(result.trade_count for result in results),
+            invested=invested,
+            profit_and_loss=profit_n_loss,
+            return_percent=(
+                float(profit_n_loss / invested) * 100.00 if invested else 0
+            ),
+            max_drawdown_percent=max(
+                (result.max_drawdown_percent for result in results), default=0
+            ),
+            duration=duration,
+        )
@@ -0,0 +1,52 @@
+import logging
+import time
+from threading import Thread
+
+from database.event_store import EventStore
+from database.session_factory import SessionFactory
+
+logger = logging.getLogger(__name__)
+
+
+class EventArchiver(Thread):
+    def __init__(
+        self,
+        *,
+        session_factory: SessionFactory,
+        retention: int,
+        interval: float = 600.0,
+        batch_size: int = 500,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.session_factory = session_factory
+        self.retention = retention
+        self.interval = interval
+        self.batch_size = batch_size
+
+    def archive(self) -> int:
+        older_than = int(time.time()) - self.retention
+        archived_count = 0
+
+        while True:
+            # small batches keep the row locks and transactions short
+            with self.session_factory.session() as session:
+                batch_count = EventStore(session).archive_events(
+                    older_than=older_than, batch_size=self.batch_size
+                )
+                session.commit()
+
+            archived_count += batch_count
+            if batch_count < self.batch_size:
+                return archived_count
+
+    def run(self) -> None:
+        logger.info(f"Starting {self.__class__.__name__} thread")
+
+        while True:
+            try:
+                if archived_count := self.archive():
+                    logger.info(f"Archived {archived_count} events")
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} error")
+
+            time.sleep(self.interval)
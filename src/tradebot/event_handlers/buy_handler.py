@@ -9,11 +9,11 @@ from database.event_store import EventStore
 from database.pair_store import PairStore
 from database.position_store import PositionStore
 from database.token_store import TokenStore
-from database.trade_setting_store import TradeSettingStore
 from models.event import BuyEvent, ChatMessageType, EventType, PersistedEvent, Queue
 from models.event_handler import EventHandler
 from models.token import TOKEN_ADDRESSES, Position, TokenName
 from models.trade_setting import TradeSettingName
+from settings.trade_settings_manager import TradeSettingsManager
 from tradebot.event_handlers.error import TradeException, TradeInformationBuilder
 from tradebot.trade_handler.aerodrome.aerodrome_buy_handler import AerodromeBuyHandler
 from tradebot.trade_handler.handler import BaseTradeHandler, TradeStatus
@@ -22,6 +22,8 @@ from tradebot.trade_handler.sushiswap.sushiswap_buy_handler import SushiSwapBuyH
 from tradebot.trade_handler.uniswap.uniswap_buy_handler import UniswapBuyHandler
 from tradebot.utils import get_pair_latest_quote, push_chat_event
 from web3_helper.abi import ABIFetcher, ABIManager
+from web3_helper.allowance_manager import AllowanceManager
+from web3_helper.balance_reader import BalanceReader
 from web3_helper.helper import Web3Client
 
 logger = logging.getLogger(__name__)
@@ -34,12 +36,17 @@ class BuyHandler(EventHandler[BuyEvent]):
         wallet: LocalAccount,
         web3_client: Web3Client,
         abi_fetcher: ABIFetcher,
+        trade_settings: TradeSettingsManager,
+        allowance_manager: AllowanceManager,
     ) -> None:
         super().__init__()
 
         self.wallet = wallet
         self.abi_fetcher = abi_fetcher
         self.web3_client = web3_client
+        self.trade_settings = trade_settings
+        self.allowance_manager = allowance_manager
+        self.balance_reader = BalanceReader(web3_client=web3_client)
 
     def run(self, *, event: BuyEvent, session: Session) -> None:
         try:
@@ -64,9 +71,8 @@ class BuyHandler(EventHandler[BuyEvent]):
                     session.commit()
 
                 slippage: float = 0.0
-                trade_setting_store = TradeSettingStore(session)
                 if not event.slippage:
-                    slippage_setting = trade_setting_store.get_setting(
+                    slippage_setting = self.trade_settings.get_setting(
                         TradeSettingName.SLIPPAGE
                     )
                     if not slippage_setting:
@@ -76,10 +82,10 @@ class BuyHandler(EventHandler[BuyEvent]):
                 else:
                     slippage = event.slippage
 
-                minimum_eth_setting = trade_setting_store.get_setting(
+                minimum_eth_setting = self.trade_settings.get_setting(
                     TradeSettingName.MIN_ETH_REQUIRED
                 )
-                minimum_weth_setting = trade_setting_store.get_setting(
+                minimum_weth_setting = self.trade_settings.get_setting(
                     TradeSettingName.MIN_WETH_REQUIRED
                 )
                 w3 = self.web3_client.web3
@@ -100,26 +106,17 @@ class BuyHandler(EventHandler[BuyEvent]):
                 if not pair.chain == "base":
                     raise TradeException(message=f"Chain {pair.chain} isn't supported")
 
-                base_abi = abi_manager.get_abi(address=pair.base_address)
-                quote_abi = abi_manager.get_abi(address=pair.quote_address)
-
-                base_contract = w3.eth.contract(
-                    self.web3_client.to_checksum_address(pair.base_address),
-                    abi=base_abi,
+                balances = self.balance_reader.get_balances(
+                    wallet_address=self.wallet.address,
+                    token_addresses=[
+                        pair.base_address,
+                        pair.quote_address,
+                        eth_token.address,
+                    ],
                 )
-
-                base_balance_before = base_contract.functions.balanceOf(
-                    self.wallet.address
-                ).call()
-                eth_balance = w3.eth.get_balance(self.wallet.address)
-
-                quote_contract = w3.eth.contract(
-                    self.web3_client.to_checksum_address(pair.quote_address),
-                    abi=quote_abi,
-                )
-                previous_quote_balance = quote_contract.functions.balanceOf(
-                    self.wallet.address
-                ).call()
+                base_balance_before = balances.get(pair.base_address)
+                previous_quote_balance = balances.get(pair.quote_address)
+                eth_balance = balances.get(eth_token.address)
 
                 if previous_quote_balance < event.value:
                     raise TradeException(
@@ -164,18 +161,21 @@ class BuyHandler(EventHandler[BuyEvent]):
                         wallet=self.wallet,
                         web3_client=self.web3_client,
                         abi_manager=abi_manager,
+                        allowance_manager=self.allowance_manager,
                     )
                 elif pair.dex.name == "sushiswap":
                     trade_handler = SushiSwapBuyHandler(
                         wallet=self.wallet,
                         web3_client=self.web3_client,
                         abi_manager=abi_manager,
+                        allowance_manager=self.allowance_manager,
                     )
                 # elif pair.dex.name == "aerodrome":
                 #    trade_handler = AerodromeBuyHandler(
                 #        wallet=self.wallet,
                 #        web3_client=self.web3_client,
                 #        abi_manager=abi_manager,
+                #        allowance_manager=self.allowance_manager,
                 #    )
 
                 if not trade_handler:
@@ -204,14 +204,12 @@ class BuyHandler(EventHandler[BuyEvent]):
                         )
 
                     # update quote, base and quote balance
-                    quote_balance = quote_contract.functions.balanceOf(
-                        self.wallet.address
-                    ).call()
-                    quote_token.balance = quote_balance
-
-                    base_balance = base_contract.functions.balanceOf(
-                        self.wallet.address
-                    ).call()
+                    balances = self.balance_reader.get_balances(
+                        wallet_address=self.wallet.address,
+                        token_addresses=[pair.base_address, pair.quote_address],
+                    )
+                    quote_token.balance = balances.get(pair.quote_address)
+                    base_balance = balances.get(pair.base_address)
                     base_token.balance = base_balance
 
                     token_bought = base_balance - base_balance_before
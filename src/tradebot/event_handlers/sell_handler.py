@@ -10,13 +10,13 @@ from database.event_store import EventStore
 from database.pair_store import PairStore
 from database.position_store import PositionStore
 from database.token_store import TokenStore
-from database.trade_setting_store import TradeSettingStore
 from models.data_dump import DumpType
 from models.event import ChatMessageType, EventType, PersistedEvent, Queue, SellEvent
 from models.event_handler import EventHandler
 from models.token import TOKEN_ADDRESSES, TokenName
 from models.trade_setting import TradeSettingName
 from models.utils import get_position_metric
+from settings.trade_settings_manager import TradeSettingsManager
 from tradebot.event_handlers.error import TradeException, TradeInformationBuilder
 from tradebot.trade_handler.aerodrome.aerodrome_sell_handler import AerodromeSellHandler
 from tradebot.trade_handler.handler import BaseTradeHandler, TradeStatus
@@ -25,6 +25,8 @@ from tradebot.trade_handler.sushiswap.sushiswap_sell_handler import SushiSwapSel
 from tradebot.trade_handler.uniswap.uniswap_sell_handler import UniswapSellHandler
 from tradebot.utils import get_pair_latest_quote, push_chat_event
 from web3_helper.abi import ABIFetcher, ABIManager
+from web3_helper.allowance_manager import AllowanceManager
+from web3_helper.balance_reader import BalanceReader
 from web3_helper.helper import Web3Client
 
 logger = logging.getLogger(__name__)
@@ -37,12 +39,17 @@ class SellHandler(EventHandler[SellEvent]):
         wallet: LocalAccount,
         web3_client: Web3Client,
         abi_fetcher: ABIFetcher,
+        trade_settings: TradeSettingsManager,
+        allowance_manager: AllowanceManager,
     ) -> None:
         super().__init__()
 
         self.wallet = wallet
         self.abi_fetcher = abi_fetcher
         self.web3_client = web3_client
+        self.trade_settings = trade_settings
+        self.allowance_manager = allowance_manager
+        self.balance_reader = BalanceReader(web3_client=web3_client)
 
     def run(self, *, event: SellEvent, session: Session) -> None:
         try:
@@ -58,11 +65,10 @@ class SellHandler(EventHandler[SellEvent]):
                 eth_token = token_store.get_token(TOKEN_ADDRESSES[TokenName.ETH])
                 position = position_store.get_position(pair.address)
 
-                trade_setting_store = TradeSettingStore(session)
                 slippage: float = 0.0
 
                 if not event.slippage:
-                    slippage_setting = trade_setting_store.get_setting(
+                    slippage_setting = self.trade_settings.get_setting(
                         TradeSettingName.SLIPPAGE
                     )
 
@@ -79,7 +85,7 @@ class SellHandler(EventHandler[SellEvent]):
                 else:
                     slippage = event.slippage
 
-                minimum_eth_setting = trade_setting_store.get_setting(
+                minimum_eth_setting = self.trade_settings.get_setting(
                     TradeSettingName.MIN_ETH_REQUIRED
                 )
                 w3 = self.web3_client.web3
@@ -117,32 +123,23 @@ class SellHandler(EventHandler[SellEvent]):
                         ).build(),
                     )
 
-                base_abi = abi_manager.get_abi(address=pair.base_address)
-                quote_abi = abi_manager.get_abi(address=pair.quote_address)
-
                 latest_quote = get_pair_latest_quote(
                     session=session,
                     pair_address=pair.address,
                     web3_client=self.web3_client,
                 )
 
-                base_contract = w3.eth.contract(
-                    self.web3_client.to_checksum_address(pair.base_address),
-                    abi=base_abi,
-                )
-
-                base_balance_before = base_contract.functions.balanceOf(
-                    self.wallet.address
-                ).call()
-                eth_balance = w3.eth.get_balance(self.wallet.address)
-
-                quote_contract = w3.eth.contract(
-                    self.web3_client.to_checksum_address(pair.quote_address),
-                    abi=quote_abi,
+                balances = self.balance_reader.get_balances(
+                    wallet_address=self.wallet.address,
+                    token_addresses=[
+                        pair.base_address,
+                        pair.quote_address,
+                        eth_token.address,
+                    ],
                 )
-                quote_balance_before = quote_contract.functions.balanceOf(
-                    self.wallet.address
-                ).call()
+                base_balance_before = balances.get(pair.base_address)
+                quote_balance_before = balances.get(pair.quote_address)
+                eth_balance = balances.get(eth_token.address)
 
                 if base_balance_before < event.value:
                     raise TradeException(
@@ -185,18 +182,21 @@ class SellHandler(EventHandler[SellEvent]):
                         wallet=self.wallet,
                         web3_client=self.web3_client,
                         abi_manager=abi_manager,
+                        allowance_manager=self.allowance_manager,
                     )
                 elif pair.dex.name == "sushiswap":
                     trade_handler = SushiSwapSellHandler(
                         wallet=self.wallet,
                         web3_client=self.web3_client,
                         abi_manager=abi_manager,
+                        allowance_manager=self.allowance_manager,
                     )
                 # elif pair.dex.name == "aerodrome":
                 #    trade_handler = AerodromeSellHandler(
                 #        wallet=self.wallet,
                 #        web3_client=self.web3_client,
                 #        abi_manager=abi_manager,
+                #        allowance_manager=self.allowance_manager,
                 #    )
 
                 if not trade_handler:
@@ -234,19 +234,17 @@ class SellHandler(EventHandler[SellEvent]):
 
                     position_metric = get_position_metric(
                         position=position,
-                        web3_client=self.web3_client,
                         base_token=base_token,
                         latest_quote=latest_quote,
                     )
 
-                    quote_balance = quote_contract.functions.balanceOf(
-                        self.wallet.address
-                    ).call()
+                    balances = self.balance_reader.get_balances(
+                        wallet_address=self.wallet.address,
+                        token_addresses=[pair.base_address, pair.quote_address],
+                    )
+                    quote_balance = balances.get(pair.quote_address)
                     quote_token.balance = quote_balance
-
-                    base_balance = base_contract.functions.balanceOf(
-                        self.wallet.address
-                    ).call()
+                    base_balance = balances.get(pair.base_address)
                     base_token.balance = base_balance
 
                     token_ratio = (
@@ -6,8 +6,8 @@ from sqlalchemy.orm import Session
 from database.token_store import TokenStore
 from models.event import UpdateBalancesEvent
 from models.event_handler import EventHandler
-from models.token import TOKEN_ADDRESSES, TokenName
-from web3_helper.abi import ABIFetcher, ABIManager
+from web3_helper.abi import ABIFetcher
+from web3_helper.balance_reader import BalanceReader
 from web3_helper.helper import Web3Client
 
 logger = logging.getLogger(__name__)
@@ -22,23 +22,20 @@ class UpdateBalancesHandler(EventHandler[UpdateBalancesEvent]):
         self.wallet = wallet
         self.abi_fetcher = abi_fetcher
         self.web3_client = web3_client
+        self.balance_reader = BalanceReader(web3_client=web3_client)
 
     def run(self, *, event: UpdateBalancesEvent, session: Session) -> None:
-        abi_manager = ABIManager(session=session, abi_fetcher=self.abi_fetcher)
-
-        for token in TokenStore(session).get_tokens_by_addresses(event.addresses):
-            logger.info(f"Updating balance of {token.symbol}...")
-            if token.address == TOKEN_ADDRESSES[TokenName.ETH]:
-                token.balance = int(
-                    self.web3_client.web3.eth.get_balance(account=self.wallet.address)
-                )
-            else:
-                token_contract = self.web3_client.web3.eth.contract(
-                    self.web3_client.to_checksum_address(token.address),
-                    abi=abi_manager.get_abi(address=token.address),
-                )
-                token.balance = int(
-                    token_contract.functions.balanceOf(self.wallet.address).call()
-                )
+        tokens = list(TokenStore(session).get_tokens_by_addresses(event.addresses))
+        logger.info(f"Updating balance of {len(tokens)} tokens...")
+
+        # every balance in one call, from the same block
+        balances = self.balance_reader.get_balances(
+            wallet_address=self.wallet.address,
+            token_addresses=[token.address for token in tokens],
+        )
+
+        for token in tokens:
+            if token.address in balances.balances:
+                token.balance = balances.get(token.address)
 
         session.commit()
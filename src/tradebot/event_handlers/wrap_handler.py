@@ -9,7 +9,8 @@ from models.event_handler import EventHandler
 from models.token import Addresses
 from tradebot.utils import push_chat_event
 from web3_helper.abi import ABIFetcher, ABIManager
-from web3_helper.gas import GasHelper
+from web3_helper.balance_reader import BalanceReader
+from web3_helper.gas import get_gas_oracle
 from web3_helper.helper import Web3Client
 from web3_helper.transaction_helper import TransactionHelper
 
@@ -25,6 +26,7 @@ class WrapHandler(EventHandler[WrapEvent]):
         self.wallet = wallet
         self.abi_fetcher = abi_fetcher
         self.web3_client = web3_client
+        self.balance_reader = BalanceReader(web3_client=web3_client)
 
     def run(self, *, event: WrapEvent, session: Session) -> None:
         try:
@@ -36,18 +38,13 @@ class WrapHandler(EventHandler[WrapEvent]):
             if not eth_token or not weth_token:
                 raise Exception("Missing token reference")
 
-            weth_contract = self.web3_client.web3.eth.contract(
-                self.web3_client.to_checksum_address(weth_token.address),
-                abi=abi_manager.get_abi(address=weth_token.address),
-            )
-
             if eth_token.balance < event.value:
                 raise Exception("Not enough ETH to wrap")
 
             transaction_helper = TransactionHelper(
                 web3_client=self.web3_client,
                 abi_manager=abi_manager,
-                gas_helper=GasHelper(web3_client=self.web3_client),
+                gas_oracle=get_gas_oracle(web3_client=self.web3_client),
             )
 
             result = transaction_helper.wrap_eth(
@@ -56,12 +53,12 @@ class WrapHandler(EventHandler[WrapEvent]):
                 wallet=self.wallet,
             )
 
-            eth_token.balance = int(
-                self.web3_client.web3.eth.get_balance(self.wallet.address)
-            )
-            weth_token.balance = int(
-                weth_contract.functions.balanceOf(self.wallet.address).call()
+            balances = self.balance_reader.get_balances(
+                wallet_address=self.wallet.address,
+                token_addresses=[eth_token.address, weth_token.address],
             )
+            eth_token.balance = balances.get(eth_token.address)
+            weth_token.balance = balances.get(weth_token.address)
 
             session.commit()
 
@@ -0,0 +1,265 @@
+from collections import deque
+from functools import partial
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database.pair_store import PairStore
+
+WEI_PER_ETHER = 10**18
+
+
+class RingBuffer:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def is_full(self) -> bool:
+        return self._count == self.capacity
+
+    def oldest(self) -> float:
+        # next value to be overwritten once full
+        return float(self._values[self._head if self.is_full() else 0])
+
+    def append(self, value: float) -> None:
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def to_array(self) -> np.ndarray:
+        if not self.is_full():
+            values = self._values[: self._count].copy()
+        else:
+            values = np.concatenate(
+                (self._values[self._head :], self._values[: self._head])
+            )
+
+        values.setflags(write=False)
+        return values
+
+
+class Indicator:
+    def __init__(self) -> None:
+        self.value: float | None = None
+
+    def update(self, price: float, volume: float) -> None:
+        raise NotImplementedError()
+
+
+class EMA(Indicator):
+    def __init__(self, period: int) -> None:
+        super().__init__()
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self._count = 0
+        self._seed_sum = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        if self.value is not None:
+            self.value += self.alpha * (price - self.value)
+            return
+
+        # seeded with the simple average of the first period
+        self._count += 1
+        self._seed_sum += price
+        if self._count == self.period:
+            self.value = self._seed_sum / self.period
+
+
+class VWAP(Indicator):
+    def __init__(self, window: int) -> None:
+        super().__init__()
+        self.window = window
+        self._price_volumes = RingBuffer(window)
+        self._volumes = RingBuffer(window)
+        self._price_volume_sum = 0.0
+        self._volume_sum = 0.0
+        self._updates = 0
+
+    def update(self, price: float, volume: float) -> None:
+        if self._volumes.is_full():
+            self._price_volume_sum -= self._price_volumes.oldest()
+            self._volume_sum -= self._volumes.oldest()
+
+        self._price_volumes.append(price * volume)
+        self._volumes.append(volume)
+        self._price_volume_sum += price * volume
+        self._volume_sum += volume
+
+        # running sums drift, they are recomputed once per window
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._price_volume_sum = float(self._price_volumes.to_array().sum())
+            self._volume_sum = float(self._volumes.to_array().sum())
+
+        self.value = (
+            self._price_volume_sum / self._volume_sum if self._volume_sum > 0 else None
+        )
+
+
+class ATR(Indicator):
+    # quotes have a single price, the true range is the move from the
+    # previous quote, smoothed the Wilder way
+    def __init__(self, period: int) -> None:
+        super().__init__()
+        self.period = period
+        self._previous_price: float | None = None
+        self._count = 0
+        self._seed_sum = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        previous_price = self._previous_price
+        self._previous_price = price
+        if previous_price is None:
+            return
+
+        true_range = abs(price - previous_price)
+        if self.value is not None:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+            return
+
+        self._count += 1
+        self._seed_sum += true_range
+        if self._count == self.period:
+            self.value = self._seed_sum / self.period
+
+
+class RollingExtremum(Indicator):
+    def __init__(self, window: int, *, maximum: bool) -> None:
+        super().__init__()
+        self.window = window
+        self.maximum = maximum
+        # monotonic (index, price), the extremum is in front, at most window
+        # entries
+        self._candidates: deque[tuple[int, float]] = deque()
+        self._index = 0
+
+    def update(self, price: float, volume: float) -> None:
+        while self._candidates and (
+            self._candidates[-1][1] <= price
+            if self.maximum
+            else self._candidates[-1][1] >= price
+        ):
+            self._candidates.pop()
+
+        self._candidates.append((self._index, price))
+        if self._candidates[0][0] <= self._index - self.window:
+            self._candidates.popleft()
+
+        self._index += 1
+        self.value = self._candidates[0][1]
+
+
+class RollingMax(RollingExtremum):
+    def __init__(self, window: int) -> None:
+        super().__init__(window, maximum=True)
+
+
+class RollingMin(RollingExtremum):
+    def __init__(self, window: int) -> None:
+        super().__init__(window, maximum=False)
+
+
+IndicatorFactories = dict[str, Callable[[], Indicator]]
+
+DEFAULT_INDICATORS: IndicatorFactories = {
+    "ema_12": partial(EMA, 12),
+    "ema_26": partial(EMA, 26),
+    "vwap_20": partial(VWAP, 20),
+    "atr_14": partial(ATR, 14),
+    "max_60": partial(RollingMax, 60),
+    "min_60": partial(RollingMin, 60),
+}
+
+
+class PairIndicators:
+    def __init__(
+        self, *, factories: IndicatorFactories, history_size: int = 256
+    ) -> None:
+        self._indicators = {name: factory() for name, factory in factories.items()}
+        self._values: dict[str, float | None] = {
+            name: None for name in self._indicators
+        }
+        # live read only view handed to the strategies
+        self.values: Mapping[str, float | None] = MappingProxyType(self._values)
+        self.prices = RingBuffer(history_size)
+        self.last_timestamp: int | None = None
+        self.last_quote_id: int | None = None
+
+    def update(
+        self,
+        *,
+        timestamp: int,
+        price: int,
+        volume: float | None,
+        quote_id: int | None = None,
+    ) -> None:
+        # prices are wei per whole token, indicators work in ether
+        price_ether = price / WEI_PER_ETHER
+        # without a volume, every quote weights the same
+        quote_volume = volume if volume and volume > 0 else 1.0
+
+        for name, indicator in self._indicators.items():
+            indicator.update(price_ether, quote_volume)
+            self._values[name] = indicator.value
+
+        self.prices.append(price_ether)
+        self.last_timestamp = timestamp
+        self.last_quote_id = quote_id
+
+
+class IndicatorEngine:
+    def __init__(
+        self,
+        *,
+        factories: IndicatorFactories = DEFAULT_INDICATORS,
+        history_size: int = 256,
+    ) -> None:
+        self.factories = factories
+        self.history_size = history_size
+        self._pairs: dict[str, PairIndicators] = {}
+
+    def get(self, pair_address: str) -> PairIndicators:
+        if pair_address not in self._pairs:
+            self._pairs[pair_address] = PairIndicators(
+                factories=self.factories, history_size=self.history_size
+            )
+
+        return self._pairs[pair_address]
+
+    def pair_addresses(self) -> list[str]:
+        return list(self._pairs.keys())
+
+    def remove(self, pair_address: str) -> None:
+        self._pairs.pop(pair_address, None)
+
+    def sync(self, session: Session, pair_addresses: list[str]) -> None:
+        # feeds the quotes stored since the last sync, a new pair is rebuilt
+        # from its latest history_size quotes
+        if not pair_addresses:
+            return
+
+        since_by_pair = {
+            pair_address: (
+                self.get(pair_address).last_timestamp or 0,
+                self.get(pair_address).last_quote_id or 0,
+            )
+            for pair_address in pair_addresses
+        }
+
+        for pair_address, timestamp, quote_id, price, volume in PairStore(
+            session
+        ).get_recent_quote_rows(since_by_pair, limit_per_pair=self.history_size):
+            self.get(pair_address).update(
+                timestamp=timestamp,
+                price=int(price),
+                volume=volume,
+                quote_id=quote_id,
+            )
@@ -0,0 +1,148 @@
+import logging
+import time
+from collections import deque
+from enum import StrEnum
+from threading import Lock
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueueLane(StrEnum):
+    EXIT = "exit"
+    OTHER = "other"
+
+
+class LaneStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.shed: dict[str, int] = {}
+        self.repriced = 0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def asdict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_wait": self.total_wait / self.count if self.count else 0.0,
+            "max_wait": self.max_wait,
+            "shed": dict(self.shed),
+            "repriced": self.repriced,
+        }
+
+
+class QueueMetrics:
+    def __init__(self, *, log_interval: float = 300.0) -> None:
+        self.log_interval = log_interval
+        self._lanes: dict[QueueLane, LaneStats] = {}
+        self._lock = Lock()
+        self._last_log = time.monotonic()
+
+    def record(self, lane: QueueLane, wait: float) -> None:
+        with self._lock:
+            self._lanes.setdefault(lane, LaneStats()).record(wait)
+
+    def record_shed(self, lane: QueueLane, reason: str) -> None:
+        with self._lock:
+            stats = self._lanes.setdefault(lane, LaneStats())
+            stats.shed[reason] = stats.shed.get(reason, 0) + 1
+
+    def record_repriced(self, lane: QueueLane) -> None:
+        with self._lock:
+            self._lanes.setdefault(lane, LaneStats()).repriced += 1
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {lane.value: stats.asdict() for lane, stats in self._lanes.items()}
+
+    def log_summary(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_log < self.log_interval:
+            return
+
+        self._last_log = now
+        for lane, stats in self.summary().items():
+            logger.info(
+                f"Queue lane={lane} count={stats['count']} "
+                f"avg_wait={stats['avg_wait']:.2f}s max_wait={stats['max_wait']:.2f}s "
+                f"shed={stats['shed']} repriced={stats['repriced']}"
+            )
+
+
+class StrategyStats:
+    def __init__(self, *, window: int = 1000) -> None:
+        # percentiles are computed over the latest window runs
+        self.durations: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.max_duration = 0.0
+        self.overruns = 0
+        self.skipped = 0
+
+    def record(self, duration: float, overrun: bool) -> None:
+        self.durations.append(duration)
+        self.count += 1
+        self.max_duration = max(self.max_duration, duration)
+        if overrun:
+            self.overruns += 1
+
+    def asdict(self) -> dict:
+        p50, p95, p99 = (
+            np.percentile(self.durations, [50, 95, 99]).tolist()
+            if self.durations
+            else (0.0, 0.0, 0.0)
+        )
+
+        return {
+            "count": self.count,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "max": self.max_duration,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+        }
+
+
+class StrategyMetrics:
+    def __init__(self, *, log_interval: float = 300.0) -> None:
+        self.log_interval = log_interval
+        self._strategies: dict[str, StrategyStats] = {}
+        self._lock = Lock()
+        self._last_log = time.monotonic()
+
+    def record(self, strategy_name: str, duration: float, overrun: bool) -> None:
+        with self._lock:
+            self._strategies.setdefault(strategy_name, StrategyStats()).record(
+                duration, overrun
+            )
+
+    def record_skipped(self, strategy_name: str) -> None:
+        with self._lock:
+            self._strategies.setdefault(strategy_name, StrategyStats()).skipped += 1
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                strategy_name: stats.asdict()
+                for strategy_name, stats in self._strategies.items()
+            }
+
+    def log_summary(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_log < self.log_interval:
+            return
+
+        self._last_log = now
+        for strategy_name, stats in self.summary().items():
+            logger.info(
+                f"Strategy {strategy_name} runs={stats['count']} "
+                f"p50={stats['p50'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms "
+                f"p99={stats['p99'] * 1000:.1f}ms max={stats['max'] * 1000:.1f}ms "
+                f"overruns={stats['overruns']} skipped={stats['skipped']}"
+            )
@@ -0,0 +1,296 @@
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterator
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from database.pair_store import PairStore
+from models.token import Pair, Token
+from models.trade_setting import TradeSettingName
+from tradebot.backtest import Backtest, SimulatedExecution
+from tradebot.strategies_worker import StrategyFactory
+from web3_helper.helper import Web3Client
+
+logger = logging.getLogger(__name__)
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+class QuoteHistory:
+    # quotes of every pair concatenated in two shared memory blocks, pickled
+    # as the block names so pool workers map the same arrays without a copy
+    def __init__(
+        self,
+        *,
+        pairs: list[Pair],
+        tokens: dict[str, Token],
+        offsets: dict[str, tuple[int, int]],
+        size: int,
+        timestamps_name: str | None = None,
+        prices_name: str | None = None,
+    ) -> None:
+        self.pairs = pairs
+        self.tokens = tokens
+        self.offsets = offsets
+        self.size = size
+        self.owner = timestamps_name is None
+
+        self._timestamps_memory = self._open_memory(timestamps_name)
+        self._prices_memory = self._open_memory(prices_name)
+        self.timestamps: np.ndarray = np.ndarray(
+            (size,), dtype=np.int64, buffer=self._timestamps_memory.buf
+        )
+        self.prices: np.ndarray = np.ndarray(
+            (size,), dtype=np.int64, buffer=self._prices_memory.buf
+        )
+
+    def _open_memory(self, name: str | None) -> SharedMemory:
+        if name is None:
+            return SharedMemory(create=True, size=max(self.size * 8, 1))
+
+        memory = SharedMemory(name=name)
+        # the owner process unlinks the block, not the workers attaching it
+        resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]
+
+        return memory
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (
+            _attach_quote_history,
+            (
+                self.pairs,
+                self.tokens,
+                self.offsets,
+                self.size,
+                self._timestamps_memory.name,
+                self._prices_memory.name,
+            ),
+        )
+
+    @classmethod
+    def load(
+        cls,
+        session: Session,
+        *,
+        pairs: list[Pair],
+        tokens: dict[str, Token],
+        since: int | None = None,
+        until: int | None = None,
+        chunk_size: int = 10000,
+    ) -> "QuoteHistory":
+        timestamps_chunks: list[np.ndarray] = []
+        prices_chunks: list[np.ndarray] = []
+        offsets: dict[str, tuple[int, int]] = {}
+        skipped_pairs: set[str] = set()
+        size = 0
+
+        for rows in PairStore(session).iter_quote_prices(
+            pair_addresses=[pair.address for pair in pairs],
+            since=since,
+            until=until,
+            chunk_size=chunk_size,
+        ):
+            rows = [row for row in rows if row[0] not in skipped_pairs]
+            if overflow_pairs := {row[0] for row in rows if row[2] > INT64_MAX}:
+                logger.warning(f"Prices above int64, skipping {overflow_pairs}")
+                skipped_pairs |= overflow_pairs
+                rows = [row for row in rows if row[0] not in skipped_pairs]
+
+            for pair_address, _, _ in rows:
+                start, end = offsets.get(pair_address, (size, size))
+                offsets[pair_address] = (start, end + 1)
+                size += 1
+
+            timestamps_chunks.append(
+                np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+            )
+            prices_chunks.append(
+                np.fromiter(
+                    (int(row[2]) for row in rows), dtype=np.int64, count=len(rows)
+                )
+            )
+
+        # quotes of a skipped pair loaded before its overflow are left unused
+        for pair_address in skipped_pairs:
+            offsets.pop(pair_address, None)
+
+        history = cls(
+            pairs=[pair for pair in pairs if pair.address in offsets],
+            tokens=tokens,
+            offsets=offsets,
+            size=size,
+        )
+        if size:
+            np.concatenate(timestamps_chunks, out=history.timestamps)
+            np.concatenate(prices_chunks, out=history.prices)
+
+        return history
+
+    def iter_quotes(
+        self, chunk_size: int = 10000
+    ) -> Iterator[tuple[str, list[tuple[int, int]]]]:
+        for pair_address, (start, end) in self.offsets.items():
+            for chunk_start in range(start, end, chunk_size):
+                chunk_end = min(chunk_start + chunk_size, end)
+                yield pair_address, list(
+                    zip(
+                        self.timestamps[chunk_start:chunk_end].tolist(),
+                        self.prices[chunk_start:chunk_end].tolist(),
+                    )
+                )
+
+    def close(self) -> None:
+        del self.timestamps
+        del self.prices
+        self._timestamps_memory.close()
+        self._prices_memory.close()
+
+        if self.owner:
+            self._timestamps_memory.unlink()
+            self._prices_memory.unlink()
+
+
+def _attach_quote_history(
+    pairs: list[Pair],
+    tokens: dict[str, Token],
+    offsets: dict[str, tuple[int, int]],
+    size: int,
+    timestamps_name: str,
+    prices_name: str,
+) -> QuoteHistory:
+    return QuoteHistory(
+        pairs=pairs,
+        tokens=tokens,
+        offsets=offsets,
+        size=size,
+        timestamps_name=timestamps_name,
+        prices_name=prices_name,
+    )
+
+
+class SweepResult(BaseModel):
+    params: dict[str, Any]
+    quote_count: int
+    trade_count: int
+    profit_and_loss: Decimal
+    return_percent: float
+    max_drawdown_percent: float
+    score: float
+
+
+_worker_history: QuoteHistory | None = None
+
+
+def _init_worker(history: QuoteHistory) -> None:
+    global _worker_history
+    _worker_history = history
+
+
+def _run_backtest(
+    *,
+    strategy_name: str,
+    params: dict[str, Any],
+    buy_amount: int,
+    execution: SimulatedExecution,
+    settings: dict[TradeSettingName, str | float],
+) -> SweepResult:
+    history = _worker_history
+    assert history is not None
+
+    backtest = Backtest(
+        strategy_name=strategy_name,
+        web3_client=Web3Client(),
+        buy_amount=buy_amount,
+        execution=execution,
+        settings=settings,
+        strategy_params=params,
+    )
+    # the backtest context never queries, an unbound session is enough
+    report = backtest.replay(
+        Session(),
+        pairs=history.pairs,
+        tokens=history.tokens,
+        quotes=history.iter_quotes(),
+    )
+
+    return SweepResult(
+        params=params,
+        quote_count=report.quote_count,
+        trade_count=report.trade_count,
+        profit_and_loss=report.profit_and_loss,
+        return_percent=report.return_percent,
+        max_drawdown_percent=report.max_drawdown_percent,
+        # return over max drawdown, a 1% floor keeps flat runs comparable
+        score=report.return_percent / max(report.max_drawdown_percent, 1.0),
+    )
+
+
+class ParameterSweep:
+    def __init__(
+        self,
+        *,
+        strategy_name: str,
+        grid: dict[str, list[Any]],
+        buy_amount: int,
+        execution: SimulatedExecution | None = None,
+        settings: dict[TradeSettingName, str | float] = {},
+        workers: int | None = None,
+        strategy_factory: StrategyFactory | None = None,
+    ) -> None:
+        self.strategy_name = strategy_name
+        self.grid = grid
+        self.buy_amount = buy_amount
+        self.execution = execution or SimulatedExecution()
+        self.settings = settings
+        self.workers = workers
+        self.strategy_factory = strategy_factory or StrategyFactory()
+
+    def get_param_sets(self) -> list[dict[str, Any]]:
+        names = list(self.grid.keys())
+        param_sets = [
+            dict(zip(names, values))
+            for values in itertools.product(*(self.grid[name] for name in names))
+        ]
+
+        # fails here on an unknown strategy or parameter, not in a worker
+        for params in param_sets:
+            try:
+                strategy = self.strategy_factory.create(self.strategy_name, **params)
+            except TypeError as e:
+                raise ValueError(f"Invalid parameters {params}: {e}") from e
+
+            if not strategy:
+                raise ValueError(f"Unknown strategy {self.strategy_name}")
+
+        return param_sets
+
+    def run(self, history: QuoteHistory) -> list[SweepResult]:
+        param_sets = self.get_param_sets()
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(history,)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_backtest,
+                    strategy_name=self.strategy_name,
+                    params=params,
+                    buy_amount=self.buy_amount,
+                    execution=self.execution,
+                    settings=self.settings,
+                )
+                for params in param_sets
+            ]
+            results = [future.result() for future in futures]
+
+        return sorted(
+            results,
+            key=lambda result: (result.score, result.return_percent),
+            reverse=True,
+        )
@@ -0,0 +1,206 @@
+import logging
+import time
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from database.pair_price_alert_store import PairPriceAlertStore
+from database.pair_store import PairStore
+from database.position_store import PositionStore
+from database.session_factory import SessionFactory
+from database.token_store import TokenStore
+from models.token import Pair, PairPriceAlert, PairQuote, PositionMetric, Token
+from models.utils import get_pairs_position_metrics
+from tradebot.quote_sources import DexScreenerQuoteSource, QuoteSource
+from tradebot.utils import push_chat_event
+
+logger = logging.getLogger(__name__)
+
+
+def get_pair_shard(pair_address: str, shard_count: int) -> int:
+    # addresses are uniformly distributed hex, stable across processes
+    return int(pair_address, 16) % shard_count
+
+
+class QuoteIngestor:
+    ALERT_THRESHOLD = 10
+    QUOTE_EXPIRATION = 3600 * 24 * 31
+
+    def __init__(
+        self,
+        *,
+        session_factory: SessionFactory,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        interval: float = 10.0,
+        clean_interval: float = 3600.0,
+        quote_source: QuoteSource | None = None,
+    ) -> None:
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+
+        self.session_factory = session_factory
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.interval = interval
+        self.clean_interval = clean_interval
+        self.quote_source = quote_source or DexScreenerQuoteSource()
+        self._last_clean = 0.0
+
+    def is_owned(self, pair_address: str) -> bool:
+        return get_pair_shard(pair_address, self.shard_count) == self.shard_index
+
+    def ingest(self) -> int:
+        with self.session_factory.session() as session:
+            pair_store = PairStore(session)
+            pairs = {
+                pair.address: pair
+                for pair in pair_store.get_all_pairs()
+                if self.is_owned(pair.address)
+            }
+
+            quotes = self.quote_source.get_quotes(session, list(pairs.values()))
+            # stored or deduplicated, these quotes are the current price
+            pair_store.set_quote_checked_at(
+                list({quote.pair_address for quote in quotes}), int(time.time())
+            )
+            existing_hashes = pair_store.get_existing_quote_hashes(
+                [(quote.pair_address, quote.data_hash) for quote in quotes]
+            )
+
+            new_quotes: dict[str, PairQuote] = {}
+            for quote in quotes:
+                if (quote.pair_address, quote.data_hash) in existing_hashes:
+                    logger.debug(
+                        f"Quote with same hash for {quote.pair_address} already exists"
+                    )
+                    continue
+
+                pair_store.add_pair_quote(quote)
+                new_quotes[quote.pair_address] = quote
+
+            # one transaction, the strategies are notified once it commits
+            session.commit()
+
+            self.detect_alerts(
+                session,
+                pairs=[pairs[pair_address] for pair_address in new_quotes],
+                latest_quotes=new_quotes,
+            )
+
+            return len(new_quotes)
+
+    def detect_alerts(
+        self,
+        session: Session,
+        *,
+        pairs: list[Pair],
+        latest_quotes: dict[str, PairQuote],
+    ) -> None:
+        if not pairs:
+            return
+
+        tokens = {
+            token.address: token
+            for token in TokenStore(session).get_tokens_by_addresses(
+                [pair.base_address for pair in pairs]
+            )
+        }
+        positions = {
+            position.pair_address: position
+            for position in PositionStore(session).get_positions_by_pair_addresses(
+                [pair.address for pair in pairs]
+            )
+        }
+        position_metrics = get_pairs_position_metrics(
+            pairs=pairs,
+            positions=positions,
+            tokens=tokens,
+            latest_quotes=latest_quotes,
+        )
+
+        for pair in pairs:
+            if position_metric := position_metrics.get(pair.address):
+                self.analyze_pair_price_change(
+                    session,
+                    pair=pair,
+                    latest_quote=latest_quotes[pair.address],
+                    base_token=tokens[pair.base_address],
+                    position_metric=position_metric,
+                )
+
+    def analyze_pair_price_change(
+        self,
+        session: Session,
+        *,
+        pair: Pair,
+        latest_quote: PairQuote,
+        base_token: Token,
+        position_metric: PositionMetric,
+    ) -> None:
+        pair_price_alert_store = PairPriceAlertStore(session)
+        latest_price_alert = pair_price_alert_store.get_latest_price_alert(pair.address)
+
+        latest_alert_pnl_percent = (
+            latest_price_alert.pnl_percent if latest_price_alert else Decimal(0)
+        )
+
+        current_diff = (
+            Decimal(position_metric.profit_and_loss_percent) - latest_alert_pnl_percent
+        )
+
+        if abs(current_diff) <= self.ALERT_THRESHOLD:
+            return
+
+        pair_price_alert_store.add_price_alert(
+            PairPriceAlert(
+                pair_address=pair.address,
+                price=latest_quote.price,
+                pnl_percent=Decimal(position_metric.profit_and_loss_percent),
+                pnl=position_metric.profit_and_loss,
+                created_at=int(time.time()),
+            )
+        )
+
+        sign = "+" if current_diff > 0 else "-"
+        messages = [
+            f"Price Alert for {base_token.symbol} {sign}{self.ALERT_THRESHOLD}%",
+            f"PnL WETH (%): {sign}{abs(position_metric.profit_and_loss)} ({'{0:.2f}'.format(position_metric.profit_and_loss_percent)} %)",
+        ]
+
+        # posted by the chat bot, committed with the alert
+        push_chat_event(session=session, message_data={"message": "\n".join(messages)})
+
+    def clean_quotes(self) -> None:
+        # a single shard owns the cleanup, it covers every pair
+        if self.shard_index != 0:
+            return
+
+        if time.monotonic() - self._last_clean < self.clean_interval:
+            return
+
+        with self.session_factory.session() as session:
+            PairStore(session).clean_quotes_before_timestamp(
+                int(time.time()) - self.QUOTE_EXPIRATION
+            )
+            session.commit()
+
+        self._last_clean = time.monotonic()
+
+    def run(self) -> None:
+        logger.info(
+            f"Starting {self.__class__.__name__} shard "
+            f"{self.shard_index + 1}/{self.shard_count}"
+        )
+
+        while True:
+            started_at = time.monotonic()
+            try:
+                if quote_count := self.ingest():
+                    logger.info(f"Stored {quote_count} new quotes")
+
+                self.clean_quotes()
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} error")
+
+            time.sleep(max(self.interval - (time.monotonic() - started_at), 0.0))
@@ -0,0 +1,270 @@
+import logging
+import time
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy.orm import Session
+from web3 import Web3
+from web3.contract.contract import ContractFunction
+
+from database.token_store import TokenStore
+from ext_api.dexscreener import DexScreener
+from models.dex_id import DexId
+from models.token import Pair, PairQuote, Token
+from web3_helper.abi import get_contract
+from web3_helper.helper import Web3Client
+from web3_helper.multicall import Multicall
+from web3_helper.standard_abi import (
+    AERODROME_CL_POOL_ABI,
+    AERODROME_POOL_ABI,
+    UNISWAP_V3_POOL_ABI,
+    V2_PAIR_ABI,
+)
+
+logger = logging.getLogger(__name__)
+
+# quote prices are in wei of the quote token for one whole base token
+PRICE_DECIMALS = 18
+Q192 = 2**192
+
+
+class PoolKind(StrEnum):
+    RESERVES = "reserves"
+    AERODROME = "aerodrome"
+    UNISWAP_V3 = "uniswap_v3"
+    AERODROME_CL = "aerodrome_cl"
+
+
+def get_pool_kind(dex: DexId) -> PoolKind | None:
+    if dex.name == "uniswap":
+        if dex.version == "v2":
+            return PoolKind.RESERVES
+        if dex.version == "v3":
+            return PoolKind.UNISWAP_V3
+    elif dex.name == "sushiswap":
+        return PoolKind.RESERVES
+    elif dex.name == "aerodrome":
+        if dex.version in ("v3", "cl", "slipstream"):
+            return PoolKind.AERODROME_CL
+        return PoolKind.AERODROME
+
+    return None
+
+
+def is_token0(token_address: str, other_token_address: str) -> bool:
+    # pools sort their two tokens by address
+    return int(token_address, 16) < int(other_token_address, 16)
+
+
+def get_reserves_price(
+    *,
+    base_is_token0: bool,
+    reserve0: int,
+    reserve1: int,
+    base_decimals: int,
+    quote_decimals: int,
+) -> int | None:
+    base_reserve, quote_reserve = (
+        (reserve0, reserve1) if base_is_token0 else (reserve1, reserve0)
+    )
+    if base_reserve == 0:
+        return None
+
+    return (quote_reserve * 10 ** (base_decimals + PRICE_DECIMALS)) // (
+        base_reserve * 10**quote_decimals
+    )
+
+
+def get_sqrt_price_x96_price(
+    *,
+    base_is_token0: bool,
+    sqrt_price_x96: int,
+    base_decimals: int,
+    quote_decimals: int,
+) -> int | None:
+    if sqrt_price_x96 == 0:
+        return None
+
+    # (sqrtPriceX96 / 2**96) ** 2 is the raw token1 amount per raw token0
+    numerator, denominator = (
+        (sqrt_price_x96**2, Q192) if base_is_token0 else (Q192, sqrt_price_x96**2)
+    )
+
+    return (numerator * 10 ** (base_decimals + PRICE_DECIMALS)) // (
+        denominator * 10**quote_decimals
+    )
+
+
+def get_amount_out_price(*, amount_out: int, quote_decimals: int) -> int | None:
+    # what one whole base token swaps for, net of the pool fee
+    if amount_out == 0:
+        return None
+
+    return amount_out * 10**PRICE_DECIMALS // 10**quote_decimals
+
+
+class QuoteSource:
+    def get_quotes(self, session: Session, pairs: list[Pair]) -> list[PairQuote]:
+        raise NotImplementedError()
+
+
+class DexScreenerQuoteSource(QuoteSource):
+    def get_quotes(self, session: Session, pairs: list[Pair]) -> list[PairQuote]:
+        if not pairs:
+            return []
+
+        pair_addresses = {pair.address for pair in pairs}
+        timestamp = int(time.time())
+
+        return [
+            PairQuote(
+                pair_address=dex_pair.pairAddress,
+                price=Web3.to_wei(dex_pair.priceNative, "ether"),
+                data=dex_pair.model_dump(),
+                timestamp=timestamp,
+            )
+            for dex_pair in DexScreener.get_pairs(list(pair_addresses)).pairs
+            if dex_pair.pairAddress in pair_addresses
+        ]
+
+
+class OnChainQuoteSource(QuoteSource):
+    def __init__(
+        self, *, web3_client: Web3Client, multicall: Multicall | None = None
+    ) -> None:
+        self.web3_client = web3_client
+        self.multicall = multicall or Multicall(web3_client=web3_client)
+
+    def _get_pool_functions(
+        self, pair: Pair, pool_kind: PoolKind, base_token: Token
+    ) -> list[ContractFunction]:
+        abi = {
+            PoolKind.RESERVES: V2_PAIR_ABI,
+            PoolKind.AERODROME: AERODROME_POOL_ABI,
+            PoolKind.UNISWAP_V3: UNISWAP_V3_POOL_ABI,
+            PoolKind.AERODROME_CL: AERODROME_CL_POOL_ABI,
+        }[pool_kind]
+        contract = get_contract(self.web3_client, address=pair.address, abi=abi)
+
+        if pool_kind == PoolKind.RESERVES:
+            return [contract.functions.getReserves()]
+
+        if pool_kind == PoolKind.AERODROME:
+            # read along in the same call, used when the pool turns out stable
+            return [
+                contract.functions.getReserves(),
+                contract.functions.stable(),
+                contract.functions.getAmountOut(
+                    10**base_token.decimals,
+                    Web3.to_checksum_address(base_token.address),
+                ),
+            ]
+
+        return [contract.functions.slot0()]
+
+    def get_quotes(self, session: Session, pairs: list[Pair]) -> list[PairQuote]:
+        tokens = {
+            token.address: token
+            for token in TokenStore(session).get_tokens_by_addresses(
+                list(
+                    {pair.base_address for pair in pairs}
+                    | {pair.quote_address for pair in pairs}
+                )
+            )
+        }
+
+        pool_pairs: list[tuple[Pair, PoolKind]] = []
+        for pair in pairs:
+            pool_kind = get_pool_kind(pair.dex)
+            if not pool_kind:
+                logger.debug(
+                    f"No on-chain quote for {pair.address} on {pair.dex.to_str()}"
+                )
+                continue
+
+            if pair.base_address in tokens and pair.quote_address in tokens:
+                pool_pairs.append((pair, pool_kind))
+
+        if not pool_pairs:
+            return []
+
+        pool_functions = [
+            self._get_pool_functions(pair, pool_kind, tokens[pair.base_address])
+            for pair, pool_kind in pool_pairs
+        ]
+
+        # every pool read in one eth_call, from the same block
+        multicall_result = self.multicall.aggregate(
+            [function for functions in pool_functions for function in functions]
+        )
+        timestamp = int(time.time())
+
+        quotes: list[PairQuote] = []
+        offset = 0
+        for (pair, pool_kind), functions in zip(pool_pairs, pool_functions):
+            results: list[Any] = multicall_result.results[
+                offset : offset + len(functions)
+            ]
+            offset += len(functions)
+
+            if any(result is None for result in results):
+                logger.warning(f"Unable to read pool {pair.address}")
+                continue
+
+            result = results[0]
+            base_token = tokens[pair.base_address]
+            quote_token = tokens[pair.quote_address]
+            base_is_token0 = is_token0(base_token.address, quote_token.address)
+
+            if pool_kind == PoolKind.AERODROME and results[1]:
+                price = get_amount_out_price(
+                    amount_out=results[2], quote_decimals=quote_token.decimals
+                )
+                data = {
+                    "source": "onchain",
+                    "reserve0": result[0],
+                    "reserve1": result[1],
+                    "stable": True,
+                    "amountOut": results[2],
+                }
+            elif pool_kind in (PoolKind.RESERVES, PoolKind.AERODROME):
+                price = get_reserves_price(
+                    base_is_token0=base_is_token0,
+                    reserve0=result[0],
+                    reserve1=result[1],
+                    base_decimals=base_token.decimals,
+                    quote_decimals=quote_token.decimals,
+                )
+                data = {
+                    "source": "onchain",
+                    "reserve0": result[0],
+                    "reserve1": result[1],
+                }
+            else:
+                price = get_sqrt_price_x96_price(
+                    base_is_token0=base_is_token0,
+                    sqrt_price_x96=result[0],
+                    base_decimals=base_token.decimals,
+                    quote_decimals=quote_token.decimals,
+                )
+                data = {
+                    "source": "onchain",
+                    "sqrtPriceX96": result[0],
+                    "tick": result[1],
+                }
+
+            if price is None:
+                continue
+
+            # no block number in the data, an unchanged pool is deduplicated
+            quotes.append(
+                PairQuote(
+                    pair_address=pair.address,
+                    price=price,
+                    data=data,
+                    timestamp=timestamp,
+                    block_number=multicall_result.block_number,
+                )
+            )
+
+        return quotes
@@ -1,16 +1,35 @@
 import logging
 import time
 from threading import Thread
+from typing import Any
 
+from sqlalchemy.orm import Session
+
+from database.event_store import EventStore
+from database.notification_listener import (
+    COMPLETED_EVENTS_CHANNEL,
+    PAIR_QUOTES_CHANNEL,
+    Notification,
+    NotificationListener,
+)
 from database.pair_store import PairStore
 from database.position_store import PositionStore
 from database.session_factory import SessionFactory
-from database.strategy_state_store import StrategyStateStore
 from database.token_store import TokenStore
-from models.strategy_state import StrategyState
+from models.event import PersistedEventStatus, Queue
+from models.token import Pair
+from models.utils import get_pairs_position_metrics
+from settings.trade_settings_manager import get_trade_settings_manager
+from tradebot.indicators import IndicatorEngine
+from tradebot.strategy_state_cache import StrategyStateCache
+from tradebot.strategy_watchdog import StrategyWatchdog
 from tradebot.trade_strategies.prudent_pump_strategy import PrudentPumpStrategy
 from tradebot.trade_strategies.stop_loss_strategy import StopLossStrategy
-from tradebot.trade_strategies.trade_strategy import StrategyContext, TradeStrategy
+from tradebot.trade_strategies.trade_strategy import (
+    StrategyContext,
+    StrategyState,
+    TradeStrategy,
+)
 from web3_helper.helper import Web3Client
 
 logger = logging.getLogger(__name__)
@@ -26,134 +45,250 @@ class StrategyFactory:
     def all_names(self) -> list[str]:
         return ["none"] + list(self.mapping.keys())
 
-    def create(self, strategy_name) -> TradeStrategy | None:
+    def create(self, strategy_name, **params: Any) -> TradeStrategy | None:
         if strategy_name not in self.mapping:
             return None
 
-        return self.mapping[strategy_name]()
+        return self.mapping[strategy_name](**params)
 
 
-class PairStrategyWorker(Thread):
+class StrategiesWorker(Thread):
     def __init__(
         self,
         session_factory: SessionFactory,
         web3_client: Web3Client,
-        pair_address: str,
+        heartbeat_interval: float = 60.0,
+        batch_delay: float = 0.05,
     ) -> None:
         super().__init__()
         self.session_factory = session_factory
-        self.web3_client = web3_client
-        self.pair_address = pair_address
         self.strategy_factory = StrategyFactory()
-        self.ended = False
+        self.web3_client = web3_client
+        self.heartbeat_interval = heartbeat_interval
+        self.batch_delay = batch_delay
+        self.strategies: dict[tuple[str, str], TradeStrategy] = {}
+        self.ticks: dict[str, int] = {}
+        self.state_cache = StrategyStateCache()
+        self.indicators = IndicatorEngine()
+        self.watchdog = StrategyWatchdog()
+        self.trade_settings = get_trade_settings_manager(session_factory)
 
-    def run(self) -> None:
-        try:
-            self.inner_run()
-        except Exception as exp:
-            logger.exception(f"PairStrategyWorker error")
+    def _get_strategy(self, pair: Pair) -> TradeStrategy | None:
+        key = (pair.address, str(pair.strategy))
+        if key not in self.strategies:
+            if not (strategy := self.strategy_factory.create(pair.strategy)):
+                return None
 
-        self.ended = True
+            self.strategies[key] = strategy
 
-    def inner_run(self) -> None:
-        while True:
-            tick = 0
-            with self.session_factory.session() as session:
-
-                pair_store = PairStore(session)
-                token_store = TokenStore(session)
-                position_store = PositionStore(session)
-                strategy_state_store = StrategyStateStore(session)
-
-                pair = pair_store.get_pair(self.pair_address)
-                if not pair:
-                    logger.info(f"Pair {self.pair_address} doesn't exists...")
-                    break
-
-                if pair.strategy:
-                    position = position_store.get_position(pair.address)
-                    base_token = token_store.get_token(pair.base_address)
-                    quote_token = token_store.get_token(pair.quote_address)
-                    latest_quote = pair_store.get_latest_quote(pair.address)
-
-                    if not base_token or not quote_token or not latest_quote:
-                        # TODO
-                        logger.warning(f"missing some fields...")
-                        continue
-
-                    if strategy := self.strategy_factory.create(pair.strategy):
-                        db_last_state = strategy_state_store.get_last_state(
-                            pair_address=pair.address,
-                            strategy_name=pair.strategy,
-                        )
-
-                        last_state = (
-                            strategy.state_from_dict(db_last_state.data)
-                            if db_last_state
-                            else strategy.new_state()
-                        )
-
-                        strategy_context = StrategyContext(
-                            pair=pair,
-                            tick=tick,
-                            state=last_state,
-                            latest_quote=latest_quote,
-                            base_token=base_token,
-                            quote_token=quote_token,
-                            position=position,
-                            web3_client=self.web3_client,
-                        )
-
-                        result = strategy.run(
-                            session=session,
-                            context=strategy_context,
-                        )
-                        tick += 1
-                        strategy_state_store.add_or_update_state(
-                            StrategyState(
-                                pair_address=pair.address,
-                                strategy_name=pair.strategy,
-                                data=strategy.dump_state(result.state),
-                                created_at=int(time.time()),
-                            )
-                        )
-
-                        session.commit()
-
-            time.sleep(0.25)
-
-        self.ended = True
+        return self.strategies[key]
 
+    def _get_event_statuses(
+        self, session: Session, event_ids: list[int]
+    ) -> dict[int, PersistedEventStatus]:
+        if not event_ids:
+            return {}
 
-class StrategiesWorker(Thread):
-    def __init__(
-        self, session_factory: SessionFactory, web3_client: Web3Client
+        event_store = EventStore(session)
+        statuses = {
+            event.id: event.status for event in event_store.get_events_by_ids(event_ids)
+        }
+
+        for event_id in event_ids:
+            if event_id not in statuses:
+                # finished long ago and moved to the archive
+                archived_event = event_store.get_archived_event_by_id(event_id)
+                statuses[event_id] = (
+                    archived_event.status
+                    if archived_event
+                    else PersistedEventStatus.EXPIRED
+                )
+
+        return statuses
+
+    def run_tick(
+        self, session: Session, pair_addresses: set[str] | None = None
     ) -> None:
-        super().__init__()
-        self.session_factory = session_factory
-        self.strategy_factory = StrategyFactory()
-        self.web3_client = web3_client
-        self.pair_strategy_workers: dict[str, PairStrategyWorker] = {}
+        # pair_addresses limits the tick to the pairs with new data
+        pairs = [
+            pair
+            for pair in PairStore(session).get_strategy_pairs()
+            if pair_addresses is None or pair.address in pair_addresses
+        ]
+        if not pairs:
+            return
+
+        tick_pair_addresses = [pair.address for pair in pairs]
+
+        if pair_addresses is None:
+            # bounded memory, untracked pairs are dropped on full ticks
+            for pair_address in self.indicators.pair_addresses():
+                if pair_address not in tick_pair_addresses:
+                    self.indicators.remove(pair_address)
+
+        self.indicators.sync(session, tick_pair_addresses)
+        token_addresses = list(
+            {pair.base_address for pair in pairs}
+            | {pair.quote_address for pair in pairs}
+        )
+
+        tokens = {
+            token.address: token
+            for token in TokenStore(session).get_tokens_by_addresses(token_addresses)
+        }
+        positions = {
+            position.pair_address: position
+            for position in PositionStore(session).get_positions_by_pair_addresses(
+                tick_pair_addresses
+            )
+        }
+        latest_quotes = {
+            quote.pair_address: quote
+            for quote in PairStore(session).get_latest_quotes(tick_pair_addresses)
+        }
+
+        # one vectorized pass for every open position of the tick
+        position_metrics = get_pairs_position_metrics(
+            pairs=pairs,
+            positions=positions,
+            tokens=tokens,
+            latest_quotes=latest_quotes,
+        )
+
+        self.state_cache.load(session, tick_pair_addresses)
+
+        states: dict[str, StrategyState] = {}
+        for pair in pairs:
+            if strategy := self._get_strategy(pair):
+                state_data = self.state_cache.get((pair.address, str(pair.strategy)))
+                states[pair.address] = (
+                    strategy.state_from_dict(state_data)
+                    if state_data is not None
+                    else strategy.new_state()
+                )
+
+        event_statuses = self._get_event_statuses(
+            session,
+            [
+                state.pending_event_id
+                for state in states.values()
+                if state.pending_event_id is not None
+            ],
+        )
+
+        for pair in pairs:
+            strategy = self._get_strategy(pair)
+            base_token = tokens.get(pair.base_address)
+            quote_token = tokens.get(pair.quote_address)
+            latest_quote = latest_quotes.get(pair.address)
+
+            if not strategy or not base_token or not quote_token or not latest_quote:
+                continue
+
+            # the strategy can be unset by its own run
+            strategy_name = str(pair.strategy)
+            if self.watchdog.is_suspended(
+                strategy_name=strategy.NAME, pair_address=pair.address
+            ):
+                continue
+
+            state = states[pair.address]
+            tick = self.ticks.get(pair.address, 0)
+            strategy_context = StrategyContext(
+                pair=pair,
+                tick=tick,
+                state=state,
+                latest_quote=latest_quote,
+                base_token=base_token,
+                quote_token=quote_token,
+                position=positions.get(pair.address),
+                position_metric=position_metrics.get(pair.address),
+                web3_client=self.web3_client,
+                pending_event_status=(
+                    event_statuses.get(state.pending_event_id)
+                    if state.pending_event_id is not None
+                    else None
+                ),
+                indicators=self.indicators.get(pair.address).values,
+                trade_settings=self.trade_settings,
+            )
+
+            try:
+                with self.watchdog.track(strategy=strategy, pair_address=pair.address):
+                    result = strategy.run(session=session, context=strategy_context)
+            except Exception:
+                logger.exception(f"Strategy {pair.strategy} error on {pair.address}")
+                session.rollback()
+                continue
+
+            self.ticks[pair.address] = tick + 1
+
+            # only states that changed are marked dirty and written back
+            self.state_cache.set(
+                (pair.address, strategy_name), strategy.dump_state(result.state)
+            )
+
+            if strategy_context.pushed_events:
+                # the trade events and the state referencing them are
+                # committed together
+                self.state_cache.flush(session)
+
+        if self.state_cache.should_flush():
+            self.state_cache.flush(session)
+        else:
+            session.commit()
+
+    def _get_dirty_pairs(self, notifications: list[Notification]) -> set[str] | None:
+        dirty_pairs: set[str] = set()
+
+        for notification in notifications:
+            if notification.channel == PAIR_QUOTES_CHANNEL:
+                dirty_pairs.add(notification.payload)
+            else:
+                _, _, queue, pair_address = notification.payload.split(":")
+                if queue != Queue.TRADE_BOT:
+                    continue
+
+                # trade events are partitioned by pair, other trade events
+                # (balance refreshes, wraps) can change any pair
+                if not pair_address:
+                    return None
+
+                dirty_pairs.add(pair_address)
+
+        return dirty_pairs
 
     def run(self) -> None:
         logger.info(f"Starting {self.__class__.__name__} thread")
+        self.watchdog.start()
+
+        listener = NotificationListener(
+            engine=self.session_factory.engine,
+            channels=[PAIR_QUOTES_CHANNEL, COMPLETED_EVENTS_CHANNEL],
+        )
+        next_heartbeat = 0.0
 
         while True:
-            with self.session_factory.session() as session:
-                for pair in PairStore(session).get_all_pairs():
-                    if pair.address not in self.pair_strategy_workers:
-                        self.pair_strategy_workers[pair.address] = PairStrategyWorker(
-                            self.session_factory, self.web3_client, pair.address
-                        )
+            # strategies only run when a quote or a balance changed, and on
+            # a low frequency heartbeat for everything else
+            dirty_pairs: set[str] | None = set()
+            timeout = max(next_heartbeat - time.monotonic(), 0)
 
-                        self.pair_strategy_workers[pair.address].start()
+            if notifications := listener.wait(timeout=timeout):
+                # quotes are inserted in bursts, group them in one tick
+                time.sleep(self.batch_delay)
+                notifications += listener.wait(timeout=0)
+                dirty_pairs = self._get_dirty_pairs(notifications)
 
-            to_removes: list[str] = []
-            for pair_address, worker in self.pair_strategy_workers.items():
-                if worker.ended:
-                    to_removes.append(pair_address)
+            if time.monotonic() >= next_heartbeat:
+                next_heartbeat = time.monotonic() + self.heartbeat_interval
+                dirty_pairs = None
 
-            for pair_address in to_removes:
-                self.pair_strategy_workers.pop(pair_address)
+            if dirty_pairs is not None and not dirty_pairs:
+                continue
 
-            time.sleep(2)
+            try:
+                with self.session_factory.session() as session:
+                    self.run_tick(session, dirty_pairs)
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} error")
@@ -0,0 +1,69 @@
+import time
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from database.strategy_state_store import StrategyStateStore
+from models.strategy_state import StrategyState
+
+StateKey = tuple[str, str]
+
+
+class StrategyStateCache:
+    def __init__(self, *, flush_interval: float = 5.0) -> None:
+        self.flush_interval = flush_interval
+        self._states: dict[StateKey, dict[str, Any]] = {}
+        self._loaded_pairs: set[str] = set()
+        self._dirty: set[StateKey] = set()
+        self._last_flush = time.monotonic()
+
+    def load(self, session: Session, pair_addresses: list[str]) -> None:
+        missing_addresses = [
+            pair_address
+            for pair_address in pair_addresses
+            if pair_address not in self._loaded_pairs
+        ]
+        if not missing_addresses:
+            return
+
+        for db_state in StrategyStateStore(session).get_last_states(missing_addresses):
+            key = (db_state.pair_address, db_state.strategy_name)
+            if key not in self._dirty:
+                self._states[key] = db_state.data
+
+        self._loaded_pairs.update(missing_addresses)
+
+    def get(self, key: StateKey) -> dict[str, Any] | None:
+        return self._states.get(key)
+
+    def set(self, key: StateKey, data: dict[str, Any]) -> None:
+        if self._states.get(key) != data:
+            self._states[key] = data
+            self._dirty.add(key)
+
+    def should_flush(self) -> bool:
+        return bool(self._dirty) and (
+            time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self, session: Session) -> None:
+        # commits everything pending in the session along with the states
+        now = int(time.time())
+        dirty_keys = list(self._dirty)
+
+        StrategyStateStore(session).upsert_states(
+            [
+                StrategyState(
+                    pair_address=pair_address,
+                    strategy_name=strategy_name,
+                    data=self._states[(pair_address, strategy_name)],
+                    created_at=now,
+                    updated_at=now,
+                )
+                for pair_address, strategy_name in dirty_keys
+            ]
+        )
+        session.commit()
+
+        self._dirty.difference_update(dirty_keys)
+        self._last_flush = time.monotonic()
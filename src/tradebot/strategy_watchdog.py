@@ -0,0 +1,151 @@
+import logging
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from threading import Lock, Thread, get_ident
+from typing import Iterator
+
+from tradebot.metrics import StrategyMetrics
+from tradebot.trade_strategies.trade_strategy import TradeStrategy
+
+logger = logging.getLogger(__name__)
+
+RunKey = tuple[str, str]
+
+
+class StrategyRun:
+    def __init__(
+        self, *, key: RunKey, budget: float, thread_id: int, protective: bool = False
+    ) -> None:
+        self.key = key
+        self.budget = budget
+        self.protective = protective
+        self.thread_id = thread_id
+        self.started_at = time.monotonic()
+        self.reported = False
+
+
+class StrategyWatchdog(Thread):
+    def __init__(
+        self,
+        *,
+        metrics: StrategyMetrics | None = None,
+        check_interval: float = 1.0,
+        max_overruns: int = 3,
+        suspend_duration: float = 300.0,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.metrics = metrics or StrategyMetrics()
+        self.check_interval = check_interval
+        self.max_overruns = max_overruns
+        self.suspend_duration = suspend_duration
+        self._overruns: dict[RunKey, int] = {}
+        self._suspended_until: dict[RunKey, float] = {}
+        self._running: dict[int, StrategyRun] = {}
+        self._lock = Lock()
+
+    def is_suspended(self, *, strategy_name: str, pair_address: str) -> bool:
+        key = (strategy_name, pair_address)
+        with self._lock:
+            suspended_until = self._suspended_until.get(key)
+            if suspended_until is None:
+                return False
+
+            if time.monotonic() < suspended_until:
+                self.metrics.record_skipped(strategy_name)
+                return True
+
+            # runs again on probation, one more overrun suspends it again
+            del self._suspended_until[key]
+            self._overruns[key] = self.max_overruns - 1
+
+            return False
+
+    @contextmanager
+    def track(self, *, strategy: TradeStrategy, pair_address: str) -> Iterator[None]:
+        strategy_name = strategy.NAME
+        key = (strategy_name, pair_address)
+        run = StrategyRun(
+            key=key,
+            budget=strategy.TIME_BUDGET,
+            thread_id=get_ident(),
+            protective=strategy.PROTECTIVE,
+        )
+
+        with self._lock:
+            self._running[run.thread_id] = run
+
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - run.started_at
+            overrun = duration > run.budget
+            self.metrics.record(strategy_name, duration, overrun)
+
+            with self._lock:
+                self._running.pop(run.thread_id, None)
+                self._record_overrun(run, duration, overrun)
+
+    def _record_overrun(self, run: StrategyRun, duration: float, overrun: bool) -> None:
+        key = run.key
+
+        if not overrun:
+            self._overruns.pop(key, None)
+            return
+
+        overruns = self._overruns.get(key, 0) + 1
+        self._overruns[key] = overruns
+        logger.warning(
+            f"Strategy {key[0]} on {key[1]} took {duration:.2f}s, "
+            f"budget is {run.budget:.2f}s ({overruns}/{self.max_overruns})"
+        )
+
+        if overruns >= self.max_overruns and run.protective:
+            # a slow stop loss still beats no stop loss, it is only reported
+            logger.error(
+                f"Strategy {key[0]} on {key[1]} keeps overrunning its budget, "
+                f"not suspended as it protects the position"
+            )
+            del self._overruns[key]
+        elif overruns >= self.max_overruns:
+            logger.error(
+                f"Strategy {key[0]} on {key[1]} suspended for {self.suspend_duration}s"
+            )
+            self._suspended_until[key] = time.monotonic() + self.suspend_duration
+            del self._overruns[key]
+
+    def check_running(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stuck_runs = [
+                run
+                for run in self._running.values()
+                if not run.reported and now - run.started_at > run.budget
+            ]
+            for run in stuck_runs:
+                run.reported = True
+
+        frames = sys._current_frames()
+        for run in stuck_runs:
+            # python can't interrupt the run, make it visible where it hangs
+            stack = (
+                "".join(traceback.format_stack(frames[run.thread_id]))
+                if run.thread_id in frames
+                else ""
+            )
+            logger.warning(
+                f"Strategy {run.key[0]} on {run.key[1]} still running after "
+                f"{now - run.started_at:.2f}s\n{stack}"
+            )
+
+    def run(self) -> None:
+        logger.info(f"Starting {self.__class__.__name__} thread")
+
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.check_running()
+                self.metrics.log_summary()
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} error")
@@ -1,28 +1,53 @@
 import logging
+import os
+import socket
 import time
-from typing import Any, Type
+from contextlib import contextmanager
+from functools import partial
+from threading import Event as ThreadEvent
+from threading import Thread
+from typing import Any, Iterator, Type
 
+from hexbytes import HexBytes
 from sqlalchemy.orm import Session
 
+from database.advisory_lock import advisory_lock, wallet_lock_key
+from database.completion_waiter import get_completion_waiter
 from database.event_store import EventStore
+from database.notification_listener import NotificationListener, queue_channel
 from database.session_factory import SessionFactory
 from models.event import (
+    MAX_QUOTE_AGE,
     BuyEvent,
+    ChatMessageType,
     Event,
+    EventType,
+    PersistedEvent,
     Queue,
     SellEvent,
+    ShedReason,
     UpdateBalancesEvent,
     WrapEvent,
     get_event_builder,
+    get_quote_age,
+    get_shed_reason,
+    is_exit_event,
 )
 from models.event_handler import EventHandler
+from settings.trade_settings_manager import get_trade_settings_manager
 from tradebot.event_handlers.buy_handler import BuyHandler
 from tradebot.event_handlers.error import TradeException
 from tradebot.event_handlers.sell_handler import SellHandler
 from tradebot.event_handlers.update_balances_handler import UpdateBalancesHandler
 from tradebot.event_handlers.wrap_handler import WrapHandler
+from tradebot.metrics import QueueLane, QueueMetrics
+from tradebot.utils import push_chat_event
 from web3_helper.abi import ABIFetcher
+from web3_helper.allowance_manager import AllowanceManager, ApprovalPolicy
+from web3_helper.gas import get_gas_oracle
 from web3_helper.helper import Web3Helper
+from web3_helper.nonce_manager import get_nonce_manager
+from web3_helper.transaction_helper import on_transaction_sent
 
 logger = logging.getLogger(__name__)
 
@@ -35,12 +60,42 @@ class TradeBot:
         db_session_factory: SessionFactory,
         web3_provider_url: str,
         base_scan_api_key: str,
+        poll_timeout: float = 5.0,
+        workers: int = 1,
+        lease_duration: int = 300,
+        approval_policy: ApprovalPolicy = ApprovalPolicy.MULTIPLE,
+        approval_multiple: int = 10,
     ) -> None:
         self._wallet = Web3Helper.get_wallet(wallet_private_key)
         self._abi_fetcher = ABIFetcher(base_scan_api_key=base_scan_api_key)
         self._web3_client = Web3Helper.get_web3(web3_provider_url)
+        # the wallet may be shared with trade bots in other processes
+        get_nonce_manager(
+            web3_client=self._web3_client,
+            address=self._wallet.address,
+            send_lock=partial(
+                advisory_lock,
+                db_session_factory.engine,
+                wallet_lock_key(self._wallet.address),
+            ),
+        )
+        # fee history is followed in the background, trades read it instantly
+        get_gas_oracle(web3_client=self._web3_client).start()
+        # shared by the workers, approvals are reused across trades
+        self._allowance_manager = AllowanceManager(
+            web3_client=self._web3_client,
+            wallet=self._wallet,
+            policy=approval_policy,
+            multiple=approval_multiple,
+        )
 
         self.db_session_factory = db_session_factory
+        self.poll_timeout = poll_timeout
+        self.workers = max(workers, 1)
+        self.lease_duration = lease_duration
+        self.queue_metrics = QueueMetrics()
+        self.completion_waiter = get_completion_waiter(db_session_factory.engine)
+        trade_settings = get_trade_settings_manager(db_session_factory)
         self.handlers: dict[Type, EventHandler] = {
             UpdateBalancesEvent: UpdateBalancesHandler(
                 wallet=self._wallet,
@@ -51,11 +106,15 @@ class TradeBot:
                 wallet=self._wallet,
                 web3_client=self._web3_client,
                 abi_fetcher=self._abi_fetcher,
+                trade_settings=trade_settings,
+                allowance_manager=self._allowance_manager,
             ),
             SellEvent: SellHandler(
                 wallet=self._wallet,
                 web3_client=self._web3_client,
                 abi_fetcher=self._abi_fetcher,
+                trade_settings=trade_settings,
+                allowance_manager=self._allowance_manager,
             ),
             WrapEvent: WrapHandler(
                 wallet=self._wallet,
@@ -70,48 +129,253 @@ class TradeBot:
         else:
             logger.warning(f"No handler for this type {type(event)}")
 
-    def run(self) -> None:
-        while True:
-            with self.db_session_factory.session() as session:
-                event_store = EventStore(session)
+    @contextmanager
+    def _keep_lease(self, event_id: int, worker_id: str) -> Iterator[None]:
+        stopped = ThreadEvent()
 
-                if persisted_event := event_store.get_latest_event(
-                    queue=Queue.TRADE_BOT
-                ):
-                    try:
-                        if (
-                            persisted_event.expire_at
-                            and persisted_event.expire_at > int(time.time())
-                        ):
-                            # expire event
-                            event_store.expire_event(persisted_event)
-                        else:
-                            event = get_event_builder().build_from_persisted_event(
-                                persisted_event
-                            )
-                            event_store.ack_event(persisted_event)
-
-                            self._handle_event(event, session)
-                            event_store.complete_event(
-                                persisted_event,
-                                {},
-                            )
-                            session.commit()
-                    except Exception as exp:
-                        execution_data: dict = {
-                            "exception": str(exp),
-                        }
-
-                        if isinstance(exp, TradeException):
-                            execution_data["trade_information"] = exp.trade_information
-                            execution_data["transaction_hashes"] = exp.transation_hashes
-
-                        event_store.fail_event(
-                            event=persisted_event, execution_data=execution_data
+        # renewed well before it runs out, a slow receipt wait keeps the event
+        def renew() -> None:
+            while not stopped.wait(self.lease_duration / 3):
+                try:
+                    with self.db_session_factory.session() as session:
+                        renewed = EventStore(session).renew_lease(
+                            event_id=event_id,
+                            worker_id=worker_id,
+                            lease_duration=self.lease_duration,
                         )
                         session.commit()
-                        logger.exception(
-                            f"Error while executing event id={persisted_event.id}"
+
+                    if not renewed:
+                        logger.warning(f"Lease of event id={event_id} lost")
+                        return
+                except Exception:
+                    logger.exception(
+                        f"Unable to renew the lease of event id={event_id}"
+                    )
+
+        thread = Thread(target=renew, name=f"lease-{event_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def _record_sent_transaction(
+        self, event_id: int, worker_id: str, tx_hash: HexBytes
+    ) -> None:
+        # committed right away, a worker reclaiming the event sees it
+        with self.db_session_factory.session() as session:
+            EventStore(session).record_sent_transaction(
+                event_id=event_id, worker_id=worker_id, tx_hash=tx_hash.hex()
+            )
+            session.commit()
+
+    def _process_next_event(self, worker_id: str) -> bool:
+        with self.db_session_factory.session() as session:
+            event_store = EventStore(session)
+
+            persisted_event = event_store.claim_event(
+                queue=Queue.TRADE_BOT,
+                worker_id=worker_id,
+                lease_duration=self.lease_duration,
+            )
+            if not persisted_event:
+                return False
+
+            # commit the claim right away, it releases the row lock and makes
+            # the lease visible to the other workers
+            session.commit()
+
+            now = int(time.time())
+            queue_wait = now - persisted_event.created_at
+            event_type = EventType(persisted_event.event_type)
+            lane = QueueLane.EXIT if is_exit_event(event_type) else QueueLane.OTHER
+            self.queue_metrics.record(lane, queue_wait)
+            self.queue_metrics.log_summary()
+            self._web3_client.metrics.log_summary()
+
+            finished = False
+            try:
+                if shed_reason := get_shed_reason(
+                    event_type=event_type,
+                    expire_at=persisted_event.expire_at,
+                    data=persisted_event.data,
+                    now=now,
+                ):
+                    finished = self._shed_event(
+                        session, persisted_event, shed_reason, lane, worker_id
+                    )
+                elif sent_transactions := persisted_event.execution_data.get(
+                    "sent_transactions"
+                ):
+                    # reclaimed from a worker gone mid trade, running it again
+                    # could trade twice
+                    finished = self._fail_reclaimed_event(
+                        session, persisted_event, sent_transactions, worker_id
+                    )
+                else:
+                    quote_age = get_quote_age(persisted_event.data, now)
+                    if quote_age is not None and quote_age > MAX_QUOTE_AGE:
+                        # the handler trades on a fresh quote, not the one the
+                        # event was decided on
+                        self.queue_metrics.record_repriced(lane)
+
+                    event = get_event_builder().build_from_persisted_event(
+                        persisted_event
+                    )
+
+                    with self._keep_lease(
+                        persisted_event.id, worker_id
+                    ), on_transaction_sent(
+                        partial(
+                            self._record_sent_transaction, persisted_event.id, worker_id
+                        )
+                    ):
+                        self._handle_event(event, session)
+
+                    finished = event_store.complete_event(
+                        persisted_event,
+                        {"queue_wait": queue_wait},
+                        worker_id=worker_id,
+                    )
+                    if not finished:
+                        logger.warning(
+                            f"Event id={persisted_event.id} was reclaimed, completion dropped"
                         )
+                    session.commit()
+            except Exception as exp:
+                session.rollback()
+                execution_data: dict = {
+                    "exception": str(exp),
+                    "queue_wait": queue_wait,
+                }
+
+                if isinstance(exp, TradeException):
+                    execution_data["trade_information"] = exp.trade_information
+                    execution_data["transaction_hashes"] = exp.transation_hashes
+
+                finished = event_store.fail_event(
+                    event=persisted_event,
+                    execution_data=execution_data,
+                    worker_id=worker_id,
+                )
+                if not finished:
+                    logger.warning(
+                        f"Event id={persisted_event.id} was reclaimed, failure dropped"
+                    )
+                session.commit()
+                logger.exception(f"Error while executing event id={persisted_event.id}")
+
+            # waiters in this process don't need the notification round trip,
+            # a reclaimed event is resolved by the worker now holding it
+            if finished:
+                self.completion_waiter.resolve(
+                    persisted_event.id, persisted_event.status
+                )
+
+            return True
+
+    def _shed_event(
+        self,
+        session: Session,
+        persisted_event: PersistedEvent,
+        shed_reason: ShedReason,
+        lane: QueueLane,
+        worker_id: str,
+    ) -> bool:
+        logger.info(
+            f"Dropping event id={persisted_event.id} type={persisted_event.event_type} reason={shed_reason}"
+        )
+
+        if not EventStore(session).expire_event(
+            persisted_event,
+            {
+                "shed_reason": shed_reason.value,
+                "queue_wait": int(time.time()) - persisted_event.created_at,
+            },
+            worker_id=worker_id,
+        ):
+            return False
+
+        self.queue_metrics.record_shed(lane, shed_reason)
+
+        push_chat_event(
+            session=session,
+            message_data={
+                "message": f"Event {persisted_event.event_type} dropped ({shed_reason}), it waited too long in the queue",
+                "source_event_id": persisted_event.id,
+                "message_type": ChatMessageType.ERROR.value,
+            },
+            auto_commit=False,
+        )
+        session.commit()
+
+        return True
+
+    def _fail_reclaimed_event(
+        self,
+        session: Session,
+        persisted_event: PersistedEvent,
+        sent_transactions: list[str],
+        worker_id: str,
+    ) -> bool:
+        logger.warning(
+            f"Event id={persisted_event.id} already sent {sent_transactions}, not executed again"
+        )
+
+        if not EventStore(session).fail_event(
+            persisted_event,
+            {
+                "exception": "Transactions already sent by a previous attempt",
+                "transaction_hashes": sent_transactions,
+            },
+            worker_id=worker_id,
+        ):
+            return False
+
+        push_chat_event(
+            session=session,
+            message_data={
+                "message": f"Event {persisted_event.event_type} was interrupted after sending {', '.join(sent_transactions)}, check them before trading again",
+                "source_event_id": persisted_event.id,
+                "message_type": ChatMessageType.ERROR.value,
+            },
+            auto_commit=False,
+        )
+        session.commit()
+
+        return True
+
+    def _worker_loop(self, worker_id: str) -> None:
+        logger.info(f"Starting trade worker {worker_id}")
+        listener = NotificationListener(
+            engine=self.db_session_factory.engine,
+            channels=[queue_channel(Queue.TRADE_BOT)],
+        )
+
+        while True:
+            try:
+                if self._process_next_event(worker_id):
+                    continue
+            except Exception:
+                logger.exception(f"Trade worker {worker_id} error")
+
+            # queue is drained, sleep until a producer notify us or the timeout
+            listener.wait(timeout=self.poll_timeout)
+
+    def run(self) -> None:
+        worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            Thread(
+                target=self._worker_loop,
+                args=(f"{worker_prefix}:{index}",),
+                daemon=True,
+            )
+            for index in range(1, self.workers)
+        ]
+
+        for thread in threads:
+            thread.start()
 
-            time.sleep(0.2)
+        self._worker_loop(f"{worker_prefix}:0")
@@ -5,7 +5,6 @@ from sqlalchemy.orm import Session
 
 from database.transaction_store import TransactionStore
 from models.token import Pair, Transaction
-from tradebot.event_handlers.error import TradeException, TradeInformationBuilder
 from tradebot.trade_handler.aerodrome.constants import AERODROME_ROUTER
 from tradebot.trade_handler.aerodrome.transaction_helper import (
     TransactionHelper as AreodromeTransactionHelper,
@@ -13,18 +12,25 @@ from tradebot.trade_handler.aerodrome.transaction_helper import (
 from tradebot.trade_handler.handler import BaseTradeHandler, TradeResult, TradeStatus
 from tradebot.trade_handler.payload import BuyPayload
 from web3_helper.abi import ABIManager
-from web3_helper.gas import GasHelper
+from web3_helper.allowance_manager import AllowanceManager
+from web3_helper.gas import get_gas_oracle
 from web3_helper.helper import Web3Client
-from web3_helper.transaction_helper import TransactionHelper
+from web3_helper.transaction_helper import SwapResult, TransactionHelper
 
 
 class AerodromeBuyHandler(BaseTradeHandler[BuyPayload]):
     def __init__(
-        self, *, wallet: LocalAccount, web3_client: Web3Client, abi_manager: ABIManager
+        self,
+        *,
+        wallet: LocalAccount,
+        web3_client: Web3Client,
+        abi_manager: ABIManager,
+        allowance_manager: AllowanceManager,
     ) -> None:
         super().__init__(wallet, web3_client)
         self.abi_manager = abi_manager
-        self.gas_helper = GasHelper(web3_client=web3_client)
+        self.allowance_manager = allowance_manager
+        self.gas_oracle = get_gas_oracle(web3_client=web3_client)
 
     def execute(
         self, *, pair: Pair, payload: BuyPayload, session: Session
@@ -33,52 +39,52 @@ class AerodromeBuyHandler(BaseTradeHandler[BuyPayload]):
         transaction_helper = TransactionHelper(
             web3_client=self.web3_client,
             abi_manager=self.abi_manager,
-            gas_helper=self.gas_helper,
+            gas_oracle=self.gas_oracle,
         )
 
-        approve_result = transaction_helper.approve(
-            wallet=self.wallet,
-            allowance=payload.value,
+        approve_result = self.allowance_manager.ensure_allowance(
+            transaction_helper=transaction_helper,
             token_address=payload.quote_token.address,
             spender_address=AERODROME_ROUTER,
+            amount=payload.value,
         )
 
-        if approve_result.tx_hash:
+        if approve_result and approve_result.tx_hash:
             TransactionStore(session).add_or_update_transaction(
                 transaction=Transaction(
                     hash=approve_result.tx_hash,
-                    details=f"Approve {payload.quote_token.address} for {payload.value}",
+                    details=f"Approve {payload.quote_token.address} for {approve_result.amount}",
                     created_at=int(time.time()),
                 )
             )
 
             session.commit()
 
-        else:
-            raise TradeException(
-                message=f"Unable to approve {payload.quote_token.symbol} token for sell",
-                trade_information=TradeInformationBuilder(
-                    trade_handler=self.__class__.__name__,
-                    amount=payload.value,
-                    min_amount=payload.min_out,
-                    source_address=payload.quote_token.address,
-                    destination_address=payload.base_token.address,
-                ).build(),
+        swap_result: SwapResult | None = None
+        try:
+            swap_result = AreodromeTransactionHelper(
+                web3_client=self.web3_client,
+                abi_manager=self.abi_manager,
+                gas_oracle=self.gas_oracle,
+            ).swap_exact_tokens_for_tokens(
+                wallet=self.wallet,
+                pair_address=pair.address,
+                source_token_address=payload.quote_token.address,
+                destination_token_address=payload.base_token.address,
+                amount_to_sell=payload.value,
+                min_amount_out=payload.min_out,
+                router_address=AERODROME_ROUTER,
+            )
+        finally:
+            # settled as failed when it raised, sent or not
+            self.allowance_manager.settle(
+                token_address=payload.quote_token.address,
+                spender_addresses=[AERODROME_ROUTER],
+                amount=payload.value,
+                succeeded=swap_result is not None and swap_result.status == 1,
             )
 
-        if swap_result := AreodromeTransactionHelper(
-            web3_client=self.web3_client,
-            abi_manager=self.abi_manager,
-            gas_helper=self.gas_helper,
-        ).swap_exact_tokens_for_tokens(
-            wallet=self.wallet,
-            pair_address=pair.address,
-            source_token_address=payload.quote_token.address,
-            destination_token_address=payload.base_token.address,
-            amount_to_sell=payload.value,
-            min_amount_out=payload.min_out,
-            router_address=AERODROME_ROUTER,
-        ):
+        if swap_result:
             TransactionStore(session).add_or_update_transaction(
                 transaction=Transaction(
                     hash=swap_result.tx_hash,
@@ -96,7 +102,9 @@ class AerodromeBuyHandler(BaseTradeHandler[BuyPayload]):
                 message="",
                 swap_tx=swap_result.tx_hash.hex(),
                 allowance_tx=(
-                    approve_result.tx_hash.hex() if approve_result.tx_hash else None
+                    approve_result.tx_hash.hex()
+                    if approve_result and approve_result.tx_hash
+                    else None
                 ),
             )
         else:
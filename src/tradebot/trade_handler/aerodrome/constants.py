@@ -1,4 +1,6 @@
 from typing import Final
 
-AERODROME_ROUTER: Final[str] = "0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43"
+from web3_helper.standard_abi import AERODROME_ROUTER_ADDRESS
+
+AERODROME_ROUTER: Final[str] = AERODROME_ROUTER_ADDRESS
 AERODROME_POOL_FACTORY: Final[str] = "0x420DD381b31aEf6683db6B902084cB0FFECe40Da"
@@ -7,19 +7,29 @@ from web3.types import TxParams
 
 from tradebot.constants import BASE_CHAIN_ID
 from tradebot.trade_handler.aerodrome.constants import AERODROME_POOL_FACTORY
-from web3_helper.abi import ABIManager
-from web3_helper.gas import GasHelper
+from web3_helper.abi import ABIManager, get_contract
+from web3_helper.gas import GasOracle, GasUrgency
 from web3_helper.helper import Web3Client
-from web3_helper.transaction_helper import SwapResult
+from web3_helper.transaction_helper import (
+    SwapResult,
+    sign_and_send_transaction,
+    wait_for_receipt,
+)
 
 
 class TransactionHelper:
     def __init__(
-        self, *, web3_client: Web3Client, abi_manager: ABIManager, gas_helper: GasHelper
+        self,
+        *,
+        web3_client: Web3Client,
+        abi_manager: ABIManager,
+        gas_oracle: GasOracle,
+        urgency: GasUrgency = GasUrgency.NORMAL,
     ) -> None:
         self.web3_client = web3_client
         self.abi_manager = abi_manager
-        self.gas_helper = gas_helper
+        self.gas_oracle = gas_oracle
+        self.urgency = urgency
 
     def swap_exact_tokens_for_tokens(
         self,
@@ -36,10 +46,10 @@ class TransactionHelper:
     ) -> SwapResult | None:
 
         w3 = self.web3_client.web3
-        router_abi = self.abi_manager.get_abi(address=router_address)
-        router_contract = w3.eth.contract(
-            self.web3_client.to_checksum_address(router_address),
-            abi=router_abi,
+        router_contract = get_contract(
+            self.web3_client,
+            address=router_address,
+            abi=self.abi_manager.get_abi(address=router_address),
         )
 
         swap_tokens_for_tokens_function = (
@@ -59,30 +69,30 @@ class TransactionHelper:
             )
         )
 
-        gas_estimate = self.gas_helper.estimated_gas_price()
+        gas_estimate = self.gas_oracle.estimate(self.urgency)
 
         tx_params = cast(
             TxParams,
             {
                 "from": wallet.address,
                 "gas": 250_000,
-                "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                "maxFeePerGas": w3.eth.max_priority_fee + gas_estimate.base_fee,
+                "maxPriorityFeePerGas": gas_estimate.priority_fee,
+                "maxFeePerGas": gas_estimate.max_fee,
                 "type": "0x2",
                 "chainId": chain_id,
                 "value": 0,
-                "nonce": w3.eth.get_transaction_count(wallet.address),
             },
         )
 
         builded_tx_params = swap_tokens_for_tokens_function.build_transaction(tx_params)
 
-        raw_transaction = w3.eth.account.sign_transaction(
-            builded_tx_params, wallet.key
-        ).rawTransaction
-        tx_hash = w3.eth.send_raw_transaction(raw_transaction)
+        tx_hash = sign_and_send_transaction(
+            web3_client=self.web3_client, wallet=wallet, tx_params=builded_tx_params
+        )
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = wait_for_receipt(
+                web3_client=self.web3_client, wallet=wallet, tx_hash=tx_hash
+            )
 
             return SwapResult(
                 tx_hash=tx_hash,
@@ -1,3 +1,5 @@
 from typing import Final
 
-SUSHISWAP_ROUTER: Final[str] = "0x6BDED42c6DA8FBf0d2bA55B2fa120C5e0c8D7891"
+from web3_helper.standard_abi import SUSHISWAP_ROUTER_ADDRESS
+
+SUSHISWAP_ROUTER: Final[str] = SUSHISWAP_ROUTER_ADDRESS
@@ -5,27 +5,29 @@ from sqlalchemy.orm import Session
 
 from database.transaction_store import TransactionStore
 from models.token import Pair, Transaction
-from tradebot.event_handlers.error import (
-    TradeException,
-    TradeInformation,
-    TradeInformationBuilder,
-)
 from tradebot.trade_handler.handler import BaseTradeHandler, TradeResult, TradeStatus
 from tradebot.trade_handler.payload import SellPayload
 from tradebot.trade_handler.sushiswap.constants import SUSHISWAP_ROUTER
 from web3_helper.abi import ABIManager
-from web3_helper.gas import GasHelper
+from web3_helper.allowance_manager import AllowanceManager
+from web3_helper.gas import GasUrgency, get_gas_oracle
 from web3_helper.helper import Web3Client
-from web3_helper.transaction_helper import TransactionHelper
+from web3_helper.transaction_helper import SwapResult, TransactionHelper
 
 
 class SushiSwapSellHandler(BaseTradeHandler[SellPayload]):
     def __init__(
-        self, *, wallet: LocalAccount, web3_client: Web3Client, abi_manager: ABIManager
+        self,
+        *,
+        wallet: LocalAccount,
+        web3_client: Web3Client,
+        abi_manager: ABIManager,
+        allowance_manager: AllowanceManager,
     ) -> None:
         super().__init__(wallet, web3_client)
         self.abi_manager = abi_manager
-        self.gas_helper = GasHelper(web3_client=web3_client)
+        self.allowance_manager = allowance_manager
+        self.gas_oracle = get_gas_oracle(web3_client=web3_client)
 
     def execute(
         self, *, pair: Pair, payload: SellPayload, session: Session
@@ -34,47 +36,48 @@ class SushiSwapSellHandler(BaseTradeHandler[SellPayload]):
         transaction_helper = TransactionHelper(
             web3_client=self.web3_client,
             abi_manager=self.abi_manager,
-            gas_helper=self.gas_helper,
+            gas_oracle=self.gas_oracle,
+            urgency=GasUrgency.AGGRESSIVE,
         )
 
-        approve_result = transaction_helper.approve(
-            wallet=self.wallet,
-            allowance=payload.value,
+        approve_result = self.allowance_manager.ensure_allowance(
+            transaction_helper=transaction_helper,
             token_address=payload.base_token.address,
             spender_address=SUSHISWAP_ROUTER,
+            amount=payload.value,
         )
 
-        if approve_result.tx_hash:
+        if approve_result and approve_result.tx_hash:
             TransactionStore(session).add_or_update_transaction(
                 transaction=Transaction(
                     hash=approve_result.tx_hash,
-                    details=f"Approve {payload.base_token.address} for {payload.value}",
+                    details=f"Approve {payload.base_token.address} for {approve_result.amount}",
                     created_at=int(time.time()),
                 )
             )
 
             session.commit()
 
-        else:
-            raise TradeException(
-                message=f"Unable to approve {payload.base_token.symbol} token for sell",
-                trade_information=TradeInformationBuilder(
-                    trade_handler=self.__class__.__name__,
-                    amount=payload.value,
-                    min_amount=payload.min_out,
-                    source_address=payload.base_token.address,
-                    destination_address=payload.quote_token.address,
-                ).build(),
+        swap_result: SwapResult | None = None
+        try:
+            swap_result = transaction_helper.swap_exact_tokens_for_tokens(
+                wallet=self.wallet,
+                source_token_address=payload.base_token.address,
+                destination_token_address=payload.quote_token.address,
+                amount_to_sell=payload.value,
+                min_amount_out=payload.min_out,
+                router_address=SUSHISWAP_ROUTER,
+            )
+        finally:
+            # settled as failed when it raised, sent or not
+            self.allowance_manager.settle(
+                token_address=payload.base_token.address,
+                spender_addresses=[SUSHISWAP_ROUTER],
+                amount=payload.value,
+                succeeded=swap_result is not None and swap_result.status == 1,
             )
 
-        if swap_result := transaction_helper.swap_exact_tokens_for_tokens(
-            wallet=self.wallet,
-            source_token_address=payload.base_token.address,
-            destination_token_address=payload.quote_token.address,
-            amount_to_sell=payload.value,
-            min_amount_out=payload.min_out,
-            router_address=SUSHISWAP_ROUTER,
-        ):
+        if swap_result:
             TransactionStore(session).add_or_update_transaction(
                 transaction=Transaction(
                     hash=swap_result.tx_hash,
@@ -92,7 +95,9 @@ class SushiSwapSellHandler(BaseTradeHandler[SellPayload]):
                 message="",
                 swap_tx=swap_result.tx_hash.hex(),
                 allowance_tx=(
-                    approve_result.tx_hash.hex() if approve_result.tx_hash else None
+                    approve_result.tx_hash.hex()
+                    if approve_result and approve_result.tx_hash
+                    else None
                 ),
             )
         else:
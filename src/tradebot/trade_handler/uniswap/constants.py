@@ -1,4 +1,6 @@
 from typing import Final
 
+from web3_helper.standard_abi import PERMIT2_ADDRESS
+
 UNISWAP_UNIVERSAL_ROUTER: Final[str] = "0x3fC91A3afd70395Cd496C647d5a6CC9D4B2b7FAD"
-PERMIT2: Final[str] = "0x000000000022D473030F116dDEE9F6B43aC78BA3"
+PERMIT2: Final[str] = PERMIT2_ADDRESS
@@ -8,19 +8,31 @@ from models.token import Pair, Transaction
 from tradebot.trade_handler.handler import BaseTradeHandler, TradeResult, TradeStatus
 from tradebot.trade_handler.payload import SellPayload
 from tradebot.trade_handler.uniswap.constants import PERMIT2, UNISWAP_UNIVERSAL_ROUTER
-from web3_helper.abi import ABIManager
-from web3_helper.gas import GasHelper
+from web3_helper.abi import ABIManager, get_contract
+from web3_helper.allowance_manager import AllowanceManager
+from web3_helper.gas import GasUrgency, get_gas_oracle
 from web3_helper.helper import Web3Client
-from web3_helper.transaction_helper import SwapResult, UniswapTransactionHelper
+from web3_helper.standard_abi import UNISWAP_V3_POOL_ABI
+from web3_helper.transaction_helper import (
+    SwapResult,
+    TransactionHelper,
+    UniswapTransactionHelper,
+)
 
 
 class UniswapSellHandler(BaseTradeHandler[SellPayload]):
     def __init__(
-        self, *, wallet: LocalAccount, web3_client: Web3Client, abi_manager: ABIManager
+        self,
+        *,
+        wallet: LocalAccount,
+        web3_client: Web3Client,
+        abi_manager: ABIManager,
+        allowance_manager: AllowanceManager,
     ) -> None:
         super().__init__(wallet, web3_client)
         self.abi_manager = abi_manager
-        self.gas_helper = GasHelper(web3_client=web3_client)
+        self.allowance_manager = allowance_manager
+        self.gas_oracle = get_gas_oracle(web3_client=web3_client)
 
     def execute(
         self, *, pair: Pair, payload: SellPayload, session: Session
@@ -28,60 +40,78 @@ class UniswapSellHandler(BaseTradeHandler[SellPayload]):
         transaction_helper = UniswapTransactionHelper(
             web3_client=self.web3_client,
             abi_manager=self.abi_manager,
-            gas_helper=self.gas_helper,
+            gas_oracle=self.gas_oracle,
+            urgency=GasUrgency.AGGRESSIVE,
         )
 
-        allowance_result = transaction_helper.approve_allowance(
-            allowance=payload.value,
-            token_address_to_spend=pair.base_address,
-            permit_address=PERMIT2,
-            destination=UNISWAP_UNIVERSAL_ROUTER,
-            wallet=self.wallet,
+        # permit2 spends the token, the router spends through a permit
+        approve_result = self.allowance_manager.ensure_allowance(
+            transaction_helper=TransactionHelper(
+                web3_client=self.web3_client,
+                abi_manager=self.abi_manager,
+                gas_oracle=self.gas_oracle,
+                urgency=GasUrgency.AGGRESSIVE,
+            ),
+            token_address=pair.base_address,
+            spender_address=PERMIT2,
+            amount=payload.value,
         )
 
-        if allowance_result.tx_hash:
+        if approve_result and approve_result.tx_hash:
             TransactionStore(session).add_or_update_transaction(
                 transaction=Transaction(
-                    hash=allowance_result.tx_hash,
-                    details=f"Allowance {payload.base_token.symbol} for {payload.value}",
+                    hash=approve_result.tx_hash,
+                    details=f"Allowance {payload.base_token.symbol} for {approve_result.amount}",
                     created_at=int(time.time()),
-                    data=allowance_result.sanitized_tx_params,
+                    data=approve_result.sanitized_tx_params,
                 )
             )
             session.commit()
-        else:
-            return TradeResult(
-                status=TradeStatus.FAILED,
-                message="Unable to create allowance transaction",
-            )
+
+        # None when the current permit covers the swap, no permit is sent
+        allowance_result = self.allowance_manager.ensure_permit2_allowance(
+            transaction_helper=transaction_helper,
+            token_address=pair.base_address,
+            spender_address=UNISWAP_UNIVERSAL_ROUTER,
+            permit_address=PERMIT2,
+            amount=payload.value,
+        )
 
         swap_result: SwapResult | None = None
-        if pair.dex.version == "v2":
-            swap_result = transaction_helper.v2_swap_exact_in(
-                amount_in=payload.value,
-                min_amount_out=payload.min_out,
-                source_address=pair.base_address,
-                destination_address=pair.quote_address,
-                router_address=UNISWAP_UNIVERSAL_ROUTER,
-                wallet=self.wallet,
-                allowance_result=allowance_result,
-            )
-        elif pair.dex.version == "v3":
-            pair_abi = self.abi_manager.get_abi(address=pair.address)
-            pair_contract = self.web3_client.web3.eth.contract(
-                self.web3_client.to_checksum_address(pair.address),
-                abi=pair_abi,
-            )
+        try:
+            if pair.dex.version == "v2":
+                swap_result = transaction_helper.v2_swap_exact_in(
+                    amount_in=payload.value,
+                    min_amount_out=payload.min_out,
+                    source_address=pair.base_address,
+                    destination_address=pair.quote_address,
+                    router_address=UNISWAP_UNIVERSAL_ROUTER,
+                    wallet=self.wallet,
+                    allowance_result=allowance_result,
+                )
+            elif pair.dex.version == "v3":
+                pair_contract = get_contract(
+                    self.web3_client, address=pair.address, abi=UNISWAP_V3_POOL_ABI
+                )
 
-            pool_fee = pair_contract.functions.fee().call()
-            swap_result = transaction_helper.v3_swap_exact_in(
-                amount_in=payload.value,
-                min_amount_out=payload.min_out,
-                source_address=pair.base_address,
-                pool_fee=pool_fee,
-                destination_address=pair.quote_address,
-                router_address=UNISWAP_UNIVERSAL_ROUTER,
-                wallet=self.wallet,
+                pool_fee = pair_contract.functions.fee().call()
+                swap_result = transaction_helper.v3_swap_exact_in(
+                    amount_in=payload.value,
+                    min_amount_out=payload.min_out,
+                    source_address=pair.base_address,
+                    pool_fee=pool_fee,
+                    destination_address=pair.quote_address,
+                    router_address=UNISWAP_UNIVERSAL_ROUTER,
+                    wallet=self.wallet,
+                    allowance_result=allowance_result,
+                )
+        finally:
+            # settled as failed when it raised, sent or not
+            self.allowance_manager.settle(
+                token_address=pair.base_address,
+                spender_addresses=[PERMIT2, UNISWAP_UNIVERSAL_ROUTER],
+                amount=payload.value,
+                succeeded=swap_result is not None and swap_result.status == 1,
                 allowance_result=allowance_result,
             )
 
@@ -104,7 +134,9 @@ class UniswapSellHandler(BaseTradeHandler[SellPayload]):
             status=TradeStatus.SUCCESS,
             message="",
             allowance_tx=(
-                allowance_result.tx_hash.hex() if allowance_result.tx_hash else None
+                approve_result.tx_hash.hex()
+                if approve_result and approve_result.tx_hash
+                else None
             ),
             swap_tx=swap_result.tx_hash.hex(),
         )
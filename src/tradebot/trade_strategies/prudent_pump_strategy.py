@@ -1,21 +1,18 @@
 from typing import Any
 
-from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from database.trade_setting_store import TradeSettingStore
-from models.event import EventType, PersistedEventStatus
+from models.event import EventPriority, EventType, PersistedEventStatus
 from models.trade_setting import TradeSettingName
-from models.utils import get_position_metric
 from tradebot.trade_strategies.trade_strategy import (
     StrategyContext,
     StrategyResult,
+    StrategyState,
     TradeStrategy,
 )
-from tradebot.utils import push_chat_event, push_trade_event
 
 
-class PrudentPumpStrategyState(BaseModel):
+class PrudentPumpStrategyState(StrategyState):
     highest_profit: float = 0
     retry_count: int = 0
     disabled: bool = False
@@ -23,12 +20,21 @@ class PrudentPumpStrategyState(BaseModel):
 
 class PrudentPumpStrategy(TradeStrategy[PrudentPumpStrategyState]):
     NAME = "prudent_pump"
+    PROTECTIVE = True
 
-    def __init__(self, pnl_sell: int = 50) -> None:
+    def __init__(
+        self,
+        *,
+        pnl_sell: float = 50,
+        min_profit: float = 15,
+        profit_change: float = 0.10,
+        max_retry: int = 3,
+    ) -> None:
         super().__init__()
         self.pnl_sell = pnl_sell
-        self.min_profit = 15
-        self.profit_change = 0.10
+        self.min_profit = min_profit
+        self.profit_change = profit_change
+        self.max_retry = max_retry
 
     def new_state(self) -> PrudentPumpStrategyState:
         return PrudentPumpStrategyState()
@@ -44,63 +50,76 @@ class PrudentPumpStrategy(TradeStrategy[PrudentPumpStrategyState]):
         *,
         session: Session,
         context: StrategyContext[PrudentPumpStrategyState],
-        max_retry: int = 3,
     ) -> PrudentPumpStrategyState:
-
-        trade_setting_store = TradeSettingStore(session)
-        slippage_setting = trade_setting_store.get_setting(TradeSettingName.SLIPPAGE)
+        slippage_setting = context.get_setting(
+            session=session, setting_name=TradeSettingName.SLIPPAGE
+        )
 
         slippage = slippage_setting.get_float() if slippage_setting else 0.1
         slippage = slippage + ((slippage / 2) * context.state.retry_count)
         retry_count = context.state.retry_count + 1
 
         if retry_count > 1:
-            push_chat_event(
+            context.push_chat_event(
                 session=session,
                 message_data={
                     "message": f"Sell retry {retry_count} for {context.base_token.symbol}",
                 },
             )
 
-        event = push_trade_event(
+        event = context.push_trade_event(
             session=session,
             event_type=EventType.SELL,
             message_data={
                 "pair": context.pair.address,
                 "value": int(context.base_token.balance),
+                "quote_timestamp": context.latest_quote.timestamp,
                 "slippage": slippage,
             },
-            wait_for_completion=True,
+            priority=EventPriority.PROTECTIVE_SELL,
+        )
+
+        # the outcome of the sell is handled by a later run, once it's finished
+        return PrudentPumpStrategyState(
+            highest_profit=context.state.highest_profit,
+            retry_count=retry_count,
+            disabled=False,
+            pending_event_id=event.id,
         )
 
-        if event.status == PersistedEventStatus.COMPLETED:
+    def _on_sell_finished(
+        self,
+        *,
+        session: Session,
+        context: StrategyContext[PrudentPumpStrategyState],
+    ) -> PrudentPumpStrategyState:
+        if context.pending_event_status == PersistedEventStatus.COMPLETED:
             return PrudentPumpStrategyState(
                 highest_profit=0,
                 retry_count=0,
                 disabled=True,
             )
 
-        if retry_count >= max_retry:
+        if context.state.retry_count >= self.max_retry:
             # max hitted
-            push_chat_event(
+            context.push_chat_event(
                 session=session,
                 message_data={
                     "message": f"Unable to sell {context.base_token.symbol}, disabling pair {context.pair.address}..."
                 },
             )
 
-            context.pair.strategy = ""
-            session.commit()
+            context.disable_strategy(session=session)
 
             return PrudentPumpStrategyState(
                 highest_profit=context.state.highest_profit,
-                retry_count=retry_count,
+                retry_count=context.state.retry_count,
                 disabled=True,
             )
 
         return PrudentPumpStrategyState(
             highest_profit=context.state.highest_profit,
-            retry_count=retry_count,
+            retry_count=context.state.retry_count,
             disabled=False,
         )
 
@@ -108,19 +127,21 @@ class PrudentPumpStrategy(TradeStrategy[PrudentPumpStrategyState]):
         self, *, session: Session, context: StrategyContext[PrudentPumpStrategyState]
     ) -> StrategyResult[PrudentPumpStrategyState]:
         state = context.state
-        if state.disabled:
+        if state.disabled or context.is_waiting_event():
             return StrategyResult(
                 state=state,
             )
 
-        if context.position and context.base_token.balance > 0:
-            position_metric = get_position_metric(
-                position=context.position,
-                web3_client=context.web3_client,
-                base_token=context.base_token,
-                latest_quote=context.latest_quote,
-            )
+        if state.pending_event_id is not None:
+            state = self._on_sell_finished(session=session, context=context)
+            context.state = state
+
+            if state.disabled:
+                return StrategyResult(
+                    state=state,
+                )
 
+        if position_metric := context.position_metric:
             if position_metric.profit_and_loss_percent > state.highest_profit:
                 state.highest_profit = position_metric.profit_and_loss_percent
 
@@ -129,7 +150,7 @@ class PrudentPumpStrategy(TradeStrategy[PrudentPumpStrategyState]):
                 and (state.highest_profit - (state.highest_profit * self.profit_change))
                 > position_metric.profit_and_loss_percent
             ):
-                push_chat_event(
+                context.push_chat_event(
                     session=session,
                     message_data={
                         "message": f"Profit decreasing rapidly for {context.base_token.symbol}, selling"
@@ -144,10 +165,10 @@ class PrudentPumpStrategy(TradeStrategy[PrudentPumpStrategyState]):
                 )
 
             if position_metric.profit_and_loss_percent >= float(self.pnl_sell):
-                push_chat_event(
+                context.push_chat_event(
                     session=session,
                     message_data={
-                        "message": f"Profit target met for {context.base_token.symbol}, selling (retry={context.state.retry_count}/3)",
+                        "message": f"Profit target met for {context.base_token.symbol}, selling (retry={context.state.retry_count}/{self.max_retry})",
                     },
                 )
 
@@ -158,13 +179,12 @@ class PrudentPumpStrategy(TradeStrategy[PrudentPumpStrategyState]):
                     )
                 )
 
-            trade_setting_store = TradeSettingStore(session)
-            stop_loss_setting = trade_setting_store.get_setting(
-                TradeSettingName.STOP_LOSS
+            stop_loss_setting = context.get_setting(
+                session=session, setting_name=TradeSettingName.STOP_LOSS
             )
             stop_loss = stop_loss_setting.get_float() if stop_loss_setting else -20
             if position_metric.profit_and_loss_percent <= stop_loss:
-                push_chat_event(
+                context.push_chat_event(
                     session=session,
                     message_data={
                         "message": f"Stop loss hitted for {context.base_token.symbol}, selling"
@@ -1,29 +1,27 @@
 import logging
 from typing import Any
 
-from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from database.trade_setting_store import TradeSettingStore
-from models.event import EventType
+from models.event import EventPriority, EventType
 from models.trade_setting import TradeSettingName
-from models.utils import get_position_metric
 from tradebot.trade_strategies.trade_strategy import (
     StrategyContext,
     StrategyResult,
+    StrategyState,
     TradeStrategy,
 )
-from tradebot.utils import push_trade_event
 
 logger = logging.getLogger(__name__)
 
 
-class StopLossStrategyState(BaseModel):
+class StopLossStrategyState(StrategyState):
     pass
 
 
 class StopLossStrategy(TradeStrategy[StopLossStrategyState]):
     NAME = "stop_loss"
+    PROTECTIVE = True
 
     def __init__(self) -> None:
         super().__init__()
@@ -41,30 +39,31 @@ class StopLossStrategy(TradeStrategy[StopLossStrategyState]):
         self, *, session: Session, context: StrategyContext[StopLossStrategyState]
     ) -> StrategyResult[StopLossStrategyState]:
         state = context.state
-        if context.position and context.base_token.balance > 0:
-            stop_loss_setting = TradeSettingStore(session).get_setting(
-                TradeSettingName.STOP_LOSS
+        if context.is_waiting_event():
+            return StrategyResult(
+                state=state,
             )
-            stop_loss = stop_loss_setting.get_float() if stop_loss_setting else -20
 
-            position_metric = get_position_metric(
-                position=context.position,
-                web3_client=context.web3_client,
-                base_token=context.base_token,
-                latest_quote=context.latest_quote,
+        state.pending_event_id = None
+        if position_metric := context.position_metric:
+            stop_loss_setting = context.get_setting(
+                session=session, setting_name=TradeSettingName.STOP_LOSS
             )
+            stop_loss = stop_loss_setting.get_float() if stop_loss_setting else -20
 
             if position_metric.profit_and_loss_percent <= stop_loss:
                 logger.info("Stop loss hit, selling")
-                push_trade_event(
+                event = context.push_trade_event(
                     session=session,
                     event_type=EventType.SELL,
                     message_data={
                         "pair": context.pair.address,
                         "value": int(context.base_token.balance),
+                        "quote_timestamp": context.latest_quote.timestamp,
                     },
-                    wait_for_completion=True,
+                    priority=EventPriority.PROTECTIVE_SELL,
                 )
+                state.pending_event_id = event.id
 
         return StrategyResult(
             state=state,
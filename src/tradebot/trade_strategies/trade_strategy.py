@@ -1,17 +1,24 @@
-from typing import Any, Generic, TypeVar
+from types import MappingProxyType
+from typing import Any, Generic, Mapping, TypeVar
 
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from models.token import Pair, PairQuote, Position, Token
+from database.trade_setting_store import TradeSettingStore
+from models.event import EventPriority, EventType, PersistedEvent, PersistedEventStatus
+from models.token import Pair, PairQuote, Position, PositionMetric, Token
+from models.trade_setting import TradeSetting, TradeSettingName
+from settings.trade_settings_manager import TradeSettingsManager
+from tradebot.utils import push_chat_event, push_trade_event
 from web3_helper.helper import Web3Client
 
 
 class StrategyState(BaseModel):
-    pass
+    # trade event pushed by the strategy and not yet seen finished
+    pending_event_id: int | None = None
 
 
-T = TypeVar("T", bound="BaseModel")
+T = TypeVar("T", bound="StrategyState")
 
 
 class StrategyContext(Generic[T]):
@@ -26,6 +33,10 @@ class StrategyContext(Generic[T]):
         quote_token: Token,
         web3_client: Web3Client,
         position: Position | None = None,
+        position_metric: PositionMetric | None = None,
+        pending_event_status: PersistedEventStatus | None = None,
+        indicators: Mapping[str, float | None] = MappingProxyType({}),
+        trade_settings: TradeSettingsManager | None = None,
     ) -> None:
 
         self.pair = pair
@@ -33,9 +44,64 @@ class StrategyContext(Generic[T]):
         self.state = state
         self.latest_quote = latest_quote
         self.position = position
+        self.position_metric = position_metric
         self.base_token = base_token
         self.quote_token = quote_token
         self.web3_client = web3_client
+        self.pending_event_status = pending_event_status
+        # read only, maintained by the scheduler from the stored quotes
+        self.indicators = indicators
+        self.trade_settings = trade_settings
+        self.pushed_events: list[PersistedEvent] = []
+
+    def push_trade_event(
+        self,
+        *,
+        session: Session,
+        event_type: EventType,
+        message_data: dict[str, Any],
+        priority: EventPriority | None = None,
+    ) -> PersistedEvent:
+        # committed by the scheduler together with the resulting state, a
+        # restart can't lose track of a trade pushed by the strategy
+        event = push_trade_event(
+            session=session,
+            event_type=event_type,
+            message_data=message_data,
+            auto_commit=False,
+            priority=priority,
+        )
+        session.flush()
+        self.pushed_events.append(event)
+
+        return event
+
+    def push_chat_event(
+        self, *, session: Session, message_data: dict[str, Any]
+    ) -> None:
+        push_chat_event(session=session, message_data=message_data)
+
+    def get_setting(
+        self, *, session: Session, setting_name: TradeSettingName
+    ) -> TradeSetting | None:
+        if self.trade_settings:
+            return self.trade_settings.get_setting(setting_name)
+
+        return TradeSettingStore(session).get_setting(setting_name)
+
+    def disable_strategy(self, *, session: Session) -> None:
+        self.pair.strategy = ""
+        session.commit()
+
+    def is_waiting_event(self) -> bool:
+        return (
+            self.state.pending_event_id is not None
+            and self.pending_event_status
+            in (
+                PersistedEventStatus.PENDING,
+                PersistedEventStatus.PROCESSING,
+            )
+        )
 
 
 class StrategyResult(Generic[T]):
@@ -44,6 +110,12 @@ class StrategyResult(Generic[T]):
 
 
 class TradeStrategy(Generic[T]):
+    NAME = ""
+    # seconds a run may take before the watchdog flags it
+    TIME_BUDGET = 0.5
+    # exits positions, never suspended by the watchdog for overrunning
+    PROTECTIVE = False
+
     def __init__(self) -> None:
         pass
 
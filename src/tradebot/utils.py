@@ -1,17 +1,21 @@
+import logging
 import time
 from typing import Any
 
 from sqlalchemy.orm import Session
 
+from database.completion_waiter import get_completion_waiter
 from database.event_store import EventStore
 from database.pair_store import PairStore
-from ext_api.dexscreener import DexScreener
-from models.event import EventType
+from models.event import EventPriority, EventType
 from models.event import PersistedEvent as Event
-from models.event import PersistedEventStatus, Queue
+from models.event import Queue
 from models.token import PairQuote
+from tradebot.quote_sources import DexScreenerQuoteSource, OnChainQuoteSource
 from web3_helper.helper import Web3Client
 
+logger = logging.getLogger(__name__)
+
 
 def push_chat_event(
     *, session: Session, message_data: dict[str, Any], auto_commit: bool = True
@@ -36,6 +40,7 @@ def push_trade_event(
     message_data: dict[str, Any],
     wait_for_completion: bool = False,
     auto_commit: bool = True,
+    priority: EventPriority | None = None,
 ) -> Event:
 
     event_store = EventStore(session)
@@ -44,22 +49,27 @@ def push_trade_event(
         event_type=event_type,
         data=message_data,
         created_at=int(time.time()),
+        priority=priority,
     )
 
-    event_store.add_event(new_event)
+    new_event = event_store.add_event(new_event)
 
-    if auto_commit:
+    if wait_for_completion and auto_commit:
+        # the event id is needed to register the waiter before committing
+        session.flush()
+        completion = get_completion_waiter(session.get_bind().engine).wait_for(
+            new_event.id
+        )
         session.commit()
 
-    if wait_for_completion and auto_commit:
-        # event_id = new_event.id
-        while True:
-            session.refresh(new_event)
+        # no connection is held while waiting, the trade bot resolves the future
+        completion.result()
+        session.refresh(new_event)
 
-            if new_event.status != PersistedEventStatus.PENDING:
-                return new_event
+        return new_event
 
-            time.sleep(0.1)
+    if auto_commit:
+        session.commit()
 
     return new_event
 
@@ -67,20 +77,28 @@ def push_trade_event(
 def get_pair_latest_quote(
     *, session: Session, pair_address: str, web3_client: Web3Client
 ) -> PairQuote:
-    pairs_response = DexScreener.get_pairs(pair_addresses=[pair_address])
-
-    for dex_pair in pairs_response.pairs:
-        if dex_pair.pairAddress == pair_address:
-            latest_quote = PairQuote(
-                pair_address=pair_address,
-                price=web3_client.web3.to_wei(dex_pair.priceNative, "ether"),
-                data=dex_pair.model_dump(),
-                timestamp=int(time.time()),
+    pair_store = PairStore(session)
+    pair = pair_store.get_pair(pair_address)
+    if not pair:
+        raise Exception(f"Pair {pair_address} not found")
+
+    quotes: list[PairQuote] = []
+    # block fresh from the pool when a node is configured, dexscreener lags
+    if web3_client.web3_provider_url:
+        try:
+            quotes = OnChainQuoteSource(web3_client=web3_client).get_quotes(
+                session, [pair]
             )
+        except Exception:
+            logger.exception(f"Unable to read {pair_address} on-chain")
 
-            PairStore(session).add_pair_quote(latest_quote)
-            session.commit()
+    if not quotes:
+        quotes = DexScreenerQuoteSource().get_quotes(session, [pair])
+
+    for latest_quote in quotes:
+        pair_store.add_pair_quote(latest_quote)
+        session.commit()
 
-            return latest_quote
+        return latest_quote
 
     raise Exception(f"Pair quote for {pair_address} not found")
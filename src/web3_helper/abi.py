@@ -1,25 +1,100 @@
+import json
 import logging
 import time
-from typing import Any, cast
+from collections import OrderedDict
+from threading import Lock, Thread
+from typing import Any, Callable, Final, Generic, TypeVar
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from web3.contract.contract import Contract
 
-from models.token import ContractCache
-from web3_helper.helper import Web3Helper
+from models.token import TOKEN_ADDRESSES, ContractCache, TokenName
+from web3_helper.helper import Web3Client, Web3Helper
+from web3_helper.standard_abi import (
+    AERODROME_ROUTER_ABI,
+    AERODROME_ROUTER_ADDRESS,
+    PERMIT2_ABI,
+    PERMIT2_ADDRESS,
+    SUSHISWAP_ROUTER_ADDRESS,
+    V2_ROUTER_ABI,
+    WETH_ABI,
+)
 
 ABI = dict[str, Any]
 
+K = TypeVar("K")
+V = TypeVar("V")
+
 logger = logging.getLogger(__name__)
 
+# contracts the bot trades through, never looked up
+STANDARD_ABIS: Final[dict[str, list[dict[str, Any]]]] = {
+    address.lower(): abi
+    for address, abi in [
+        (TOKEN_ADDRESSES[TokenName.WETH], WETH_ABI),
+        (SUSHISWAP_ROUTER_ADDRESS, V2_ROUTER_ABI),
+        (AERODROME_ROUTER_ADDRESS, AERODROME_ROUTER_ABI),
+        (PERMIT2_ADDRESS, PERMIT2_ABI),
+    ]
+}
+
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, *, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[K, V] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            if key not in self._items:
+                return None
+
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+# process wide, shared by every session and worker
+_abi_cache: LRUCache[str, list[dict[str, Any]]] = LRUCache(maxsize=256)
+_contract_cache: LRUCache[tuple[int, str, int], Contract] = LRUCache(maxsize=1024)
+
+
+def get_contract(
+    web3_client: Web3Client, *, address: str, abi: list[dict[str, Any]]
+) -> Contract:
+    # the contract keeps its web3 and abi alive, their ids are not reused
+    key = (id(web3_client.web3), address.lower(), id(abi))
+
+    if contract := _contract_cache.get(key):
+        return contract
+
+    contract = web3_client.web3.eth.contract(
+        web3_client.to_checksum_address(address), abi=abi
+    )
+    _contract_cache.put(key, contract)
+
+    return contract
+
 
 class ABIFetcher:
-    def __init__(self, *, base_scan_api_key: str) -> None:
+    def __init__(self, *, base_scan_api_key: str, timeout: float = 10.0) -> None:
         self.base_scan_api_key = base_scan_api_key
+        self.timeout = timeout
 
     def get_contracts_from_api(self, address: str) -> ABI:
         logger.info(f"ABI for {address} not found, fetching it from basescan.org...")
-        return Web3Helper.fetch_abi(address, self.base_scan_api_key)
+        return Web3Helper.fetch_abi(
+            address, self.base_scan_api_key, timeout=self.timeout
+        )
 
 
 class ABIManager:
@@ -32,6 +107,12 @@ class ABIManager:
         return self.session.scalar(stmt)
 
     def get_abi(self, *, address: str) -> list[dict[str, Any]]:
+        if (standard_abi := STANDARD_ABIS.get(address.lower())) is not None:
+            return standard_abi
+
+        if (cached_abi := _abi_cache.get(address.lower())) is not None:
+            return cached_abi
+
         contract_cache = self.fetch_from_database(address=address)
         if not contract_cache:
             contract = self.abi_fetcher.get_contracts_from_api(address)
@@ -43,4 +124,34 @@ class ABIManager:
             self.session.add(contract_cache)
             self.session.commit()
 
-        return cast(list[dict[str, Any]], contract_cache.contract["abi"])
+        # stored as the raw basescan json by older versions
+        abi = contract_cache.contract["abi"]
+        if isinstance(abi, str):
+            abi = json.loads(abi)
+
+        _abi_cache.put(address.lower(), abi)
+
+        return abi
+
+
+def prefetch_abis(
+    *,
+    session_maker: Callable[[], Session],
+    abi_fetcher: ABIFetcher,
+    addresses: list[str],
+) -> Thread:
+    # basescan is slow, it is called off the command and trade paths
+    def prefetch() -> None:
+        with session_maker() as session:
+            abi_manager = ABIManager(session=session, abi_fetcher=abi_fetcher)
+
+            for address in addresses:
+                try:
+                    abi_manager.get_abi(address=address)
+                except Exception:
+                    logger.exception(f"Unable to prefetch the ABI of {address}")
+
+    thread = Thread(target=prefetch, name="abi-prefetch", daemon=True)
+    thread.start()
+
+    return thread
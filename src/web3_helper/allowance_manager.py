@@ -0,0 +1,276 @@
+import logging
+import time
+from enum import StrEnum
+from threading import Lock
+from typing import Final
+
+from eth_account.account import LocalAccount
+
+from web3_helper.helper import Web3Client
+from web3_helper.multicall import Multicall, encode_call
+from web3_helper.standard_abi import ERC20_ABI, PERMIT2_ABI
+from web3_helper.transaction_helper import (
+    AllowanceResult,
+    ApproveResult,
+    TransactionHelper,
+    UniswapTransactionHelper,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_UINT256: Final[int] = 2**256 - 1
+# permit2 amounts are uint160, at the max they are never spent down
+MAX_UINT160: Final[int] = 2**160 - 1
+
+PERMIT_DURATION: Final[int] = 3600 * 24 * 30
+# a permit about to expire is renewed before the swap deadline runs out
+PERMIT_EXPIRATION_MARGIN: Final[int] = 600
+
+
+class ApprovalPolicy(StrEnum):
+    EXACT = "exact"
+    MULTIPLE = "multiple"
+    MAX = "max"
+
+
+class Permit2Allowance:
+    def __init__(self, *, amount: int, expiration: int, nonce: int) -> None:
+        self.amount = amount
+        self.expiration = expiration
+        self.nonce = nonce
+
+    def covers(self, amount: int) -> bool:
+        return (
+            self.amount >= amount
+            and self.expiration > int(time.time()) + PERMIT_EXPIRATION_MARGIN
+        )
+
+    def spend(self, amount: int) -> None:
+        if self.amount != MAX_UINT160:
+            self.amount = max(self.amount - amount, 0)
+
+
+class AllowanceManager:
+    def __init__(
+        self,
+        *,
+        web3_client: Web3Client,
+        wallet: LocalAccount,
+        policy: ApprovalPolicy = ApprovalPolicy.MULTIPLE,
+        multiple: int = 10,
+        multicall: Multicall | None = None,
+    ) -> None:
+        if multiple < 1:
+            raise ValueError(f"Invalid approval multiple {multiple}")
+
+        self.web3_client = web3_client
+        self.wallet = wallet
+        self.policy = policy
+        self.multiple = multiple
+        self.multicall = multicall or Multicall(web3_client=web3_client)
+
+        # by (token, spender), what is known to be left to spend
+        self._allowances: dict[tuple[str, str], int] = {}
+        self._permits: dict[tuple[str, str], Permit2Allowance] = {}
+        # spent by swaps in flight, not reflected on the chain until mined
+        self._reserved_allowances: dict[tuple[str, str], int] = {}
+        self._reserved_permits: dict[tuple[str, str], int] = {}
+        # signed and not applied yet, by (token, spender, nonce) they were signed with
+        self._signed_permits: dict[tuple[str, str, int], Permit2Allowance] = {}
+        self._lock = Lock()
+
+    def get_approval_amount(self, amount: int, maximum: int = MAX_UINT256) -> int:
+        if self.policy == ApprovalPolicy.EXACT:
+            return amount
+
+        if self.policy == ApprovalPolicy.MULTIPLE:
+            return min(amount * self.multiple, maximum)
+
+        return maximum
+
+    def _read_allowance(self, token_address: str, spender_address: str) -> int:
+        multicall_result = self.multicall.aggregate_calls(
+            [
+                encode_call(
+                    self.web3_client,
+                    target=token_address,
+                    abi=ERC20_ABI,
+                    fn_name="allowance",
+                    args=(self.wallet.address, spender_address),
+                )
+            ]
+        )
+
+        if (allowance := multicall_result.results[0]) is None:
+            # approving again is safe, trading without it is not
+            logger.warning(f"Unable to read the allowance of {token_address}")
+            return 0
+
+        return int(allowance)
+
+    def _read_permit2_allowance(
+        self, token_address: str, spender_address: str, permit_address: str
+    ) -> Permit2Allowance:
+        multicall_result = self.multicall.aggregate_calls(
+            [
+                encode_call(
+                    self.web3_client,
+                    target=permit_address,
+                    abi=PERMIT2_ABI,
+                    fn_name="allowance",
+                    args=(self.wallet.address, token_address, spender_address),
+                )
+            ]
+        )
+
+        if (permit := multicall_result.results[0]) is None:
+            raise Exception(f"Unable to read the permit2 allowance of {token_address}")
+
+        amount, expiration, nonce = permit
+        return Permit2Allowance(
+            amount=int(amount), expiration=int(expiration), nonce=int(nonce)
+        )
+
+    def _spend_allowance(self, key: tuple[str, str], amount: int) -> None:
+        if self._allowances[key] != MAX_UINT256:
+            self._allowances[key] = max(self._allowances[key] - amount, 0)
+
+    @staticmethod
+    def _reserve(
+        reserved: dict[tuple[str, str], int], key: tuple[str, str], amount: int
+    ) -> None:
+        reserved[key] = reserved.get(key, 0) + amount
+
+    @staticmethod
+    def _release(
+        reserved: dict[tuple[str, str], int], key: tuple[str, str], amount: int
+    ) -> None:
+        if (left := reserved.get(key, 0) - amount) > 0:
+            reserved[key] = left
+        else:
+            reserved.pop(key, None)
+
+    def ensure_allowance(
+        self,
+        *,
+        transaction_helper: TransactionHelper,
+        token_address: str,
+        spender_address: str,
+        amount: int,
+    ) -> ApproveResult | None:
+        key = (token_address, spender_address)
+
+        with self._lock:
+            if self._allowances.get(key, 0) < amount:
+                self._allowances[key] = self._read_allowance(
+                    token_address, spender_address
+                )
+                self._spend_allowance(key, self._reserved_allowances.get(key, 0))
+
+            if self._allowances[key] >= amount:
+                # reserved for this swap, a concurrent one can't count on it
+                self._spend_allowance(key, amount)
+                self._reserve(self._reserved_allowances, key, amount)
+                return None
+
+            approval_amount = self.get_approval_amount(amount)
+            approve_result = transaction_helper.approve(
+                wallet=self.wallet,
+                allowance=approval_amount,
+                token_address=token_address,
+                spender_address=spender_address,
+                wait=False,
+            )
+            # the swap is sent right behind it with the next nonce
+            self._allowances[key] = approval_amount
+            self._spend_allowance(key, amount)
+            self._reserve(self._reserved_allowances, key, amount)
+
+            return approve_result
+
+    def ensure_permit2_allowance(
+        self,
+        *,
+        transaction_helper: UniswapTransactionHelper,
+        token_address: str,
+        spender_address: str,
+        permit_address: str,
+        amount: int,
+    ) -> AllowanceResult | None:
+        key = (token_address, spender_address)
+
+        with self._lock:
+            permit = self._permits.get(key)
+            if not permit or not permit.covers(amount):
+                permit = self._read_permit2_allowance(
+                    token_address, spender_address, permit_address
+                )
+                permit.spend(self._reserved_permits.get(key, 0))
+                self._permits[key] = permit
+
+            self._reserve(self._reserved_permits, key, amount)
+            if permit.covers(amount):
+                permit.spend(amount)
+                return None
+
+            approval_amount = self.get_approval_amount(amount, MAX_UINT160)
+            allowance_result = transaction_helper.permit_signed_message(
+                allowance=approval_amount,
+                wallet=self.wallet,
+                token_address_to_spend=token_address,
+                destination=spender_address,
+                permit_address=permit_address,
+                expiration=int(time.time()) + PERMIT_DURATION,
+                nonce=permit.nonce,
+            )
+            # applied by the swap carrying it, cached once that swap is mined
+            signed_permit = Permit2Allowance(
+                amount=approval_amount,
+                expiration=allowance_result.expiration,
+                nonce=permit.nonce + 1,
+            )
+            signed_permit.spend(amount)
+            self._signed_permits[(token_address, spender_address, permit.nonce)] = (
+                signed_permit
+            )
+
+            return allowance_result
+
+    def invalidate(self, token_address: str) -> None:
+        with self._lock:
+            for key in [key for key in self._allowances if key[0] == token_address]:
+                self._allowances.pop(key)
+
+            for key in [key for key in self._permits if key[0] == token_address]:
+                self._permits.pop(key)
+
+    def settle(
+        self,
+        *,
+        token_address: str,
+        spender_addresses: list[str],
+        amount: int,
+        succeeded: bool,
+        allowance_result: AllowanceResult | None = None,
+    ) -> None:
+        signed_permits: dict[tuple[str, str], Permit2Allowance] = {}
+        with self._lock:
+            # mined or not sent, either way the chain tells from now on
+            for key in [(token_address, spender) for spender in spender_addresses]:
+                self._release(self._reserved_allowances, key, amount)
+                self._release(self._reserved_permits, key, amount)
+
+                if allowance_result and (
+                    signed_permit := self._signed_permits.pop(
+                        (*key, allowance_result.nonce), None
+                    )
+                ):
+                    signed_permits[key] = signed_permit
+
+        # reserved when ensured, a failed swap may have left it unused
+        if not succeeded:
+            self.invalidate(token_address)
+            return
+
+        with self._lock:
+            self._permits.update(signed_permits)
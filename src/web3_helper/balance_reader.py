@@ -0,0 +1,75 @@
+import logging
+from typing import Sequence
+
+from web3.types import BlockIdentifier
+
+from models.token import TOKEN_ADDRESSES, TokenName
+from web3_helper.helper import Web3Client
+from web3_helper.multicall import Call, Multicall, encode_call
+from web3_helper.standard_abi import ERC20_ABI
+
+logger = logging.getLogger(__name__)
+
+
+class BalanceSnapshot:
+    def __init__(self, *, block_number: int, balances: dict[str, int]) -> None:
+        self.block_number = block_number
+        # keyed by the token address as requested, failed reads are missing
+        self.balances = balances
+
+    def get(self, token_address: str) -> int:
+        if token_address not in self.balances:
+            raise Exception(f"Balance of {token_address} unavailable")
+
+        return self.balances[token_address]
+
+
+class BalanceReader:
+    def __init__(
+        self, *, web3_client: Web3Client, multicall: Multicall | None = None
+    ) -> None:
+        self.web3_client = web3_client
+        self.multicall = multicall or Multicall(web3_client=web3_client)
+
+    def _get_balance_call(self, wallet_address: str, token_address: str) -> Call:
+        # the native balance is read through the multicall contract itself
+        if token_address == TOKEN_ADDRESSES[TokenName.ETH]:
+            return self.multicall.encode_call("getEthBalance", wallet_address)
+
+        return encode_call(
+            self.web3_client,
+            target=token_address,
+            abi=ERC20_ABI,
+            fn_name="balanceOf",
+            args=(wallet_address,),
+        )
+
+    def get_balances(
+        self,
+        *,
+        wallet_address: str,
+        token_addresses: Sequence[str],
+        block_identifier: BlockIdentifier = "latest",
+    ) -> BalanceSnapshot:
+        token_addresses = list(dict.fromkeys(token_addresses))
+        wallet_address = self.web3_client.to_checksum_address(wallet_address)
+
+        multicall_result = self.multicall.aggregate_calls(
+            [
+                self._get_balance_call(wallet_address, token_address)
+                for token_address in token_addresses
+            ],
+            block_identifier=block_identifier,
+        )
+
+        balances: dict[str, int] = {}
+        for token_address, balance in zip(token_addresses, multicall_result.results):
+            if balance is None:
+                logger.warning(f"Unable to read the balance of {token_address}")
+                continue
+
+            balances[token_address] = int(balance)
+
+        return BalanceSnapshot(
+            block_number=multicall_result.block_number, balances=balances
+        )
@@ -1,14 +1,35 @@
+import logging
+import statistics
 import time
+from collections import deque
+from enum import StrEnum
+from threading import Lock, Thread
+from typing import Final
 
 from pydantic import BaseModel
 
 from web3_helper.helper import Web3Client
 
+logger = logging.getLogger(__name__)
+
+# base blocks rarely carry tips, a zero tip waits behind everything else
+MIN_PRIORITY_FEE: Final[int] = 1_000_000
+
+
+class GasUrgency(StrEnum):
+    NORMAL = "normal"
+    # exits, paid to land in the next block
+    AGGRESSIVE = "aggressive"
+
 
 class GasEstimate(BaseModel):
     base_fee: int
     priority_fee: int
 
+    @property
+    def max_fee(self) -> int:
+        return self.base_fee + self.priority_fee
+
 
 class BlockFee(BaseModel):
     number: int
@@ -17,79 +38,113 @@ class BlockFee(BaseModel):
     priorityFeePerGas: list[int]
 
 
-class GasHelper:
+class GasOracle:
+    # rewards percentiles, in the order of BlockFee.priorityFeePerGas
+    PERCENTILES: list[float] = [25, 50, 90]
+
     def __init__(
         self,
         *,
         web3_client: Web3Client,
-        estimate_duration: int = 60,
-        overhead: float = 0.1
+        window: int = 20,
+        poll_interval: float = 2.0,
+        stale_after: float = 30.0,
+        overhead: float = 0.1,
     ) -> None:
         self.web3_client = web3_client
-        self.last_estimate_time = 0
-        self.gas = GasEstimate(base_fee=0, priority_fee=0)
-        self.estimate_duration = estimate_duration
+        self.window = window
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
         self.overhead = overhead
 
-    def _get_latest_block_fees(self, blocks_count: int = 4) -> list[BlockFee]:
+        self._block_fees: deque[BlockFee] = deque(maxlen=window)
+        self._next_base_fee = 0
+        self._updated_at = 0.0
+        self._lock = Lock()
+        self._thread: Thread | None = None
+
+    def _get_latest_block_fees(self, blocks_count: int) -> tuple[list[BlockFee], int]:
         fee_history = self.web3_client.web3.eth.fee_history(
             blocks_count,
-            "pending",
-            [25, 50, 75],
+            "latest",
+            self.PERCENTILES,
         )
 
-        block_fees: list[BlockFee] = []
-
-        blocks_count = len(fee_history["reward"])
-        oldest_block = fee_history["oldestBlock"]
-        block_id = int(oldest_block)
-        index = 0
-
-        while block_id < oldest_block + blocks_count:
-            index = block_id - oldest_block
-            block_fees.append(
-                BlockFee(
-                    number=block_id,
-                    baseFeePerGas=int(fee_history["baseFeePerGas"][index]),
-                    gasUsedRatio=float(fee_history["gasUsedRatio"][index]),
-                    priorityFeePerGas=[int(x) for x in fee_history["reward"][index]],
-                )
+        oldest_block = int(fee_history["oldestBlock"])
+        block_fees = [
+            BlockFee(
+                number=oldest_block + index,
+                baseFeePerGas=int(fee_history["baseFeePerGas"][index]),
+                gasUsedRatio=float(fee_history["gasUsedRatio"][index]),
+                priorityFeePerGas=[int(reward) for reward in rewards],
+            )
+            for index, rewards in enumerate(fee_history["reward"])
+        ]
+
+        # one more base fee than blocks, the one of the block to come
+        return block_fees, int(fee_history["baseFeePerGas"][-1])
+
+    def refresh(self) -> None:
+        # a few blocks are enough to catch up once the window is filled
+        blocks_count = 4 if self._block_fees else self.window
+        block_fees, next_base_fee = self._get_latest_block_fees(blocks_count)
+
+        with self._lock:
+            last_number = self._block_fees[-1].number if self._block_fees else -1
+            self._block_fees.extend(
+                block_fee for block_fee in block_fees if block_fee.number > last_number
+            )
+            self._next_base_fee = next_base_fee
+            self._updated_at = time.monotonic()
+
+    def estimate(self, urgency: GasUrgency = GasUrgency.NORMAL) -> GasEstimate:
+        # kept fresh by the background thread, refreshed inline without it
+        if time.monotonic() - self._updated_at > self.stale_after:
+            self.refresh()
+
+        with self._lock:
+            next_base_fee = self._next_base_fee
+            rewards = [block_fee.priorityFeePerGas for block_fee in self._block_fees]
+
+        if urgency == GasUrgency.AGGRESSIVE:
+            # the max fee survives several full blocks of base fee increase
+            base_fee = next_base_fee * 2
+            priority_fee = max((reward[2] for reward in rewards), default=0)
+        else:
+            base_fee = int(next_base_fee * (1 + self.overhead))
+            priority_fee = int(
+                statistics.median([reward[1] for reward in rewards] or [0])
             )
 
-            block_id += 1
+        return GasEstimate(
+            base_fee=base_fee, priority_fee=max(priority_fee, MIN_PRIORITY_FEE)
+        )
 
-        return block_fees
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception(f"{self.__class__.__name__} refresh error")
 
-    def get_average_from_block_fees(self, block_fees: list[BlockFee]) -> int:
-        total = 0
-        for block_fee in block_fees:
-            total += block_fee.baseFeePerGas
+            time.sleep(self.poll_interval)
 
-        return int(total / len(block_fees))
+    def start(self) -> None:
+        if self._thread:
+            return
 
-    def get_average_priority_from_block_fees(self, block_fees: list[BlockFee]) -> int:
-        total = 0
-        for block_fee in block_fees:
-            total += block_fee.priorityFeePerGas[1]
+        self._thread = Thread(target=self._run, name="gas-oracle", daemon=True)
+        self._thread.start()
 
-        return int(total / len(block_fees))
 
-    def _generate_estimate(self) -> GasEstimate:
-        block_fees = self._get_latest_block_fees()
-        average_gas_price = self.get_average_from_block_fees(block_fees)
-        average_priority_fee = self.get_average_priority_from_block_fees(block_fees)
+_gas_oracles: dict[int, GasOracle] = {}
+_gas_oracles_lock = Lock()
 
-        return GasEstimate(
-            base_fee=int(
-                float(average_gas_price) + (self.overhead * float(average_gas_price))
-            ),
-            priority_fee=average_priority_fee,
-        )
 
-    def estimated_gas_price(self) -> GasEstimate:
-        now = int(time.time())
-        if (now - self.last_estimate_time) > self.estimate_duration:
-            self.gas = self._generate_estimate()
-            self.last_estimate_time = now
+def get_gas_oracle(*, web3_client: Web3Client) -> GasOracle:
+    # one per client, every handler reads the same fee windows
+    with _gas_oracles_lock:
+        if id(web3_client) not in _gas_oracles:
+            _gas_oracles[id(web3_client)] = GasOracle(web3_client=web3_client)
 
-        return self.gas
+        return _gas_oracles[id(web3_client)]
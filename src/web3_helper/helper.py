@@ -1,23 +1,76 @@
+import itertools
 import json
-from typing import Any
+import time
+from threading import Lock
+from typing import Any, Callable
 
 import requests
 from eth_account import Account
 from eth_account.account import LocalAccount
 from eth_typing import ChecksumAddress
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
+from web3.types import Middleware, RPCEndpoint, RPCResponse
+
+from web3_helper.rpc_metrics import RPCMetrics
+
+
+def construct_metrics_middleware(metrics: RPCMetrics) -> Middleware:
+    def metrics_middleware(
+        make_request: Callable[[RPCEndpoint, Any], RPCResponse], w3: Web3
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            started_at = time.monotonic()
+            failed = True
+            try:
+                response = make_request(method, params)
+                failed = "error" in response
+                return response
+            finally:
+                metrics.record(method, time.monotonic() - started_at, failed)
+
+        return middleware
+
+    return metrics_middleware
 
 
 class Web3Client:
     def __init__(
-        self, *, web3_provider_url: str | None = None, inject_middleware: bool = True
+        self,
+        *,
+        web3_provider_url: str | None = None,
+        inject_middleware: bool = True,
+        pool_size: int = 20,
+        timeout: float = 10.0,
     ) -> None:
         self.web3_provider_url = web3_provider_url
-        self._web3 = (
-            Web3(Web3.HTTPProvider(web3_provider_url))
-            if self.web3_provider_url
-            else Web3()
+        self.timeout = timeout
+        self.metrics = RPCMetrics()
+        self._session: requests.Session | None = None
+        self._ids = itertools.count(1)
+        self._ids_lock = Lock()
+
+        if self.web3_provider_url:
+            # one keep-alive pool sized for the worker threads sharing the client
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+            self._web3 = Web3(
+                Web3.HTTPProvider(
+                    self.web3_provider_url,
+                    request_kwargs={"timeout": timeout},
+                    session=self._session,
+                )
+            )
+        else:
+            self._web3 = Web3()
+
+        # innermost, times the provider round-trip only
+        self._web3.middleware_onion.inject(
+            construct_metrics_middleware(self.metrics), name="metrics", layer=0
         )
 
         if inject_middleware:
@@ -30,6 +83,58 @@ class Web3Client:
     def to_checksum_address(self, str) -> ChecksumAddress:
         return self._web3.to_checksum_address(str)
 
+    def _next_id(self) -> int:
+        with self._ids_lock:
+            return next(self._ids)
+
+    def batch_request(self, calls: list[tuple[str, list[Any]]]) -> list[Any]:
+        # independent reads, sent as one json-rpc batch, results in the calls order
+        if not calls:
+            return []
+
+        if not self._session or not self.web3_provider_url:
+            return [
+                self._web3.manager.request_blocking(RPCEndpoint(method), params)
+                for method, params in calls
+            ]
+
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": self._next_id(),
+                "method": method,
+                "params": params,
+            }
+            for method, params in calls
+        ]
+
+        started_at = time.monotonic()
+        failed = True
+        try:
+            response = self._session.post(
+                self.web3_provider_url, json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            responses = {item["id"]: item for item in response.json()}
+
+            results = []
+            for request in payload:
+                item = responses.get(request["id"])
+                if item is None:
+                    raise Exception(f"No response to the {request['method']} request")
+                if "error" in item:
+                    raise Exception(f"{request['method']} failed: {item['error']}")
+
+                results.append(item["result"])
+
+            failed = False
+            return results
+        finally:
+            # one round-trip, accounted to every method it carried
+            latency = time.monotonic() - started_at
+            for method, _ in calls:
+                self.metrics.record(method, latency, failed)
+
 
 class Web3Helper:
     @staticmethod
@@ -41,11 +146,20 @@ class Web3Helper:
         return Account.from_key(private_key=wallet_private_key)
 
     @staticmethod
-    def fetch_abi(address: str, base_scan_api_key: str) -> dict[str, Any]:
+    def fetch_abi(
+        address: str, base_scan_api_key: str, timeout: float = 10.0
+    ) -> dict[str, Any]:
         url = f"https://api.basescan.org/api?module=contract&action=getabi&address={address}&apikey={base_scan_api_key}"
 
-        resp = requests.get(url)
+        resp = requests.get(url, timeout=timeout)
+        resp.raise_for_status()
+
+        response = json.loads(resp.content.decode())
+        if response.get("status") != "1":
+            raise Exception(
+                f"Unable to fetch the ABI of {address}: {response.get('result')}"
+            )
 
-        abi_dict = {"abi": json.loads(resp.content.decode())["result"]}
+        abi_dict = {"abi": json.loads(response["result"])}
 
         return abi_dict
@@ -0,0 +1,205 @@
+import logging
+from typing import Any, Sequence, cast
+
+from eth_utils import function_abi_to_4byte_selector
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.abi import get_abi_input_types, get_abi_output_types
+from web3.contract.contract import ContractFunction
+from web3.types import ABIFunction, BlockIdentifier, TxParams
+
+from web3_helper.helper import Web3Client
+from web3_helper.standard_abi import MULTICALL3_ABI, MULTICALL3_ADDRESS
+
+logger = logging.getLogger(__name__)
+
+
+class Call:
+    def __init__(
+        self, *, target: str, call_data: bytes, output_types: list[str]
+    ) -> None:
+        self.target = target
+        self.call_data = call_data
+        self.output_types = output_types
+
+
+class MulticallResult:
+    def __init__(self, *, block_number: int, results: list[Any | None]) -> None:
+        self.block_number = block_number
+        # decoded outputs in the calls order, None for a reverted call
+        self.results = results
+
+
+def encode_call(
+    web3_client: Web3Client,
+    *,
+    target: str,
+    abi: list[dict[str, Any]],
+    fn_name: str,
+    args: Sequence[Any] = (),
+) -> Call:
+    function_abi = next(
+        entry
+        for entry in abi
+        if entry.get("type") == "function" and entry.get("name") == fn_name
+    )
+
+    return Call(
+        target=web3_client.to_checksum_address(target),
+        call_data=function_abi_to_4byte_selector(function_abi)
+        + web3_client.web3.codec.encode(
+            get_abi_input_types(cast(ABIFunction, function_abi)), args
+        ),
+        output_types=get_abi_output_types(cast(ABIFunction, function_abi)),
+    )
+
+
+class Multicall:
+    def __init__(
+        self,
+        *,
+        web3_client: Web3Client,
+        address: str = MULTICALL3_ADDRESS,
+        batch_size: int = 500,
+    ) -> None:
+        self.web3_client = web3_client
+        self.address = web3_client.to_checksum_address(address)
+        self.batch_size = batch_size
+
+    def encode_call(self, fn_name: str, *args: Any) -> Call:
+        return encode_call(
+            self.web3_client,
+            target=self.address,
+            abi=MULTICALL3_ABI,
+            fn_name=fn_name,
+            args=args,
+        )
+
+    def _decode(self, call: Call, return_data: bytes) -> Any:
+        values = self.web3_client.web3.codec.decode(call.output_types, return_data)
+
+        return values[0] if len(values) == 1 else values
+
+    def _encode_aggregate(self, calls: Sequence[Call]) -> tuple[Call, Call]:
+        # the block number is read in the same call, results are all from it
+        block_number_call = self.encode_call("getBlockNumber")
+        aggregate_call = self.encode_call(
+            "aggregate3",
+            [(block_number_call.target, False, block_number_call.call_data)]
+            + [(call.target, True, call.call_data) for call in calls],
+        )
+
+        return block_number_call, aggregate_call
+
+    def _decode_aggregate(
+        self,
+        calls: Sequence[Call],
+        block_number_call: Call,
+        aggregate_call: Call,
+        return_data: bytes,
+    ) -> tuple[int, list[Any | None]]:
+        (block_number_result, *call_results) = self._decode(aggregate_call, return_data)
+
+        results: list[Any | None] = []
+        for call, (success, call_return_data) in zip(calls, call_results):
+            if not success or not call_return_data:
+                results.append(None)
+                continue
+
+            try:
+                results.append(self._decode(call, call_return_data))
+            except Exception:
+                logger.warning(
+                    f"Unable to decode the result of a call to {call.target}"
+                )
+                results.append(None)
+
+        return self._decode(block_number_call, block_number_result[1]), results
+
+    def _aggregate(
+        self, calls: Sequence[Call], block_identifier: BlockIdentifier
+    ) -> tuple[int, list[Any | None]]:
+        block_number_call, aggregate_call = self._encode_aggregate(calls)
+
+        return_data = self.web3_client.web3.eth.call(
+            cast(
+                TxParams,
+                {"to": self.address, "data": HexBytes(aggregate_call.call_data)},
+            ),
+            block_identifier,
+        )
+
+        return self._decode_aggregate(
+            calls, block_number_call, aggregate_call, return_data
+        )
+
+    def aggregate_calls(
+        self,
+        calls: Sequence[Call],
+        *,
+        block_identifier: BlockIdentifier = "latest",
+    ) -> MulticallResult:
+        batches = [
+            calls[index : index + self.batch_size]
+            for index in range(0, len(calls), self.batch_size)
+        ] or [[]]
+
+        if len(batches) == 1:
+            block_number, batch_results = self._aggregate(batches[0], block_identifier)
+            return MulticallResult(block_number=block_number, results=batch_results)
+
+        # several batches are pinned to the same block and sent in one request
+        if block_identifier == "latest":
+            block_identifier = self.web3_client.web3.eth.block_number
+
+        block_parameter = (
+            hex(block_identifier)
+            if isinstance(block_identifier, int)
+            else block_identifier
+        )
+        encoded_batches = [self._encode_aggregate(batch) for batch in batches]
+        return_datas = self.web3_client.batch_request(
+            [
+                (
+                    "eth_call",
+                    [
+                        {
+                            "to": self.address,
+                            "data": Web3.to_hex(aggregate_call.call_data),
+                        },
+                        block_parameter,
+                    ],
+                )
+                for _, aggregate_call in encoded_batches
+            ]
+        )
+
+        block_number = 0
+        results: list[Any | None] = []
+        for batch, (block_number_call, aggregate_call), return_data in zip(
+            batches, encoded_batches, return_datas
+        ):
+            block_number, batch_results = self._decode_aggregate(
+                batch, block_number_call, aggregate_call, HexBytes(return_data)
+            )
+            results.extend(batch_results)
+
+        return MulticallResult(block_number=block_number, results=results)
+
+    def aggregate(
+        self,
+        functions: Sequence[ContractFunction],
+        *,
+        block_identifier: BlockIdentifier = "latest",
+    ) -> MulticallResult:
+        return self.aggregate_calls(
+            [
+                Call(
+                    target=function.address,
+                    call_data=HexBytes(function._encode_transaction_data()),
+                    output_types=get_abi_output_types(function.abi),
+                )
+                for function in functions
+            ],
+            block_identifier=block_identifier,
+        )
@@ -0,0 +1,152 @@
+import logging
+from contextlib import AbstractContextManager, nullcontext
+from threading import Lock
+from typing import Any, Callable
+
+from eth_account.account import LocalAccount
+from hexbytes import HexBytes
+from web3.types import Nonce, TxParams
+
+from web3_helper.helper import Web3Client
+
+logger = logging.getLogger(__name__)
+
+# the local nonce is behind the chain, another sender used the wallet
+STALE_NONCE_ERRORS = ("nonce too low",)
+# the node already has this exact transaction, sending it again is a no-op
+ALREADY_KNOWN_ERRORS = ("already known",)
+
+
+class NonceManager:
+    def __init__(
+        self,
+        *,
+        web3_client: Web3Client,
+        address: str,
+        send_lock: Callable[[], AbstractContextManager[Any]] | None = None,
+    ) -> None:
+        self.web3_client = web3_client
+        self.address = web3_client.to_checksum_address(address)
+        # held across processes sending from the same wallet
+        self.send_lock = send_lock
+        self._next_nonce: int | None = None
+        # sent and not seen mined yet, by hash
+        self._pending: dict[HexBytes, int] = {}
+        self._lock = Lock()
+
+    def _sync(self) -> int:
+        chain_nonce = self.web3_client.web3.eth.get_transaction_count(
+            self.address, "pending"
+        )
+
+        if self._next_nonce is not None and chain_nonce < self._next_nonce:
+            dropped = [
+                tx_hash.hex()
+                for tx_hash, nonce in self._pending.items()
+                if nonce >= chain_nonce
+            ]
+            logger.warning(
+                f"Nonce gap for {self.address}, local {self._next_nonce} "
+                f"chain {chain_nonce}, dropped {dropped}"
+            )
+
+        self._pending = {
+            tx_hash: nonce
+            for tx_hash, nonce in self._pending.items()
+            if nonce < chain_nonce
+        }
+        self._next_nonce = chain_nonce
+
+        return chain_nonce
+
+    def resync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _send(self, wallet: LocalAccount, tx_params: TxParams, nonce: int) -> HexBytes:
+        w3 = self.web3_client.web3
+        tx_params["nonce"] = Nonce(nonce)
+        signed_transaction = w3.eth.account.sign_transaction(tx_params, wallet.key)
+
+        try:
+            return w3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+        except Exception as exp:
+            if any(error in str(exp).lower() for error in ALREADY_KNOWN_ERRORS):
+                return HexBytes(signed_transaction.hash)
+
+            raise
+
+    def send_transaction(
+        self, *, wallet: LocalAccount, tx_params: TxParams
+    ) -> HexBytes:
+        # nonces are handed out locally, a transaction is sent without
+        # waiting for the previous one to be mined
+        with self._lock, self.send_lock() if self.send_lock else nullcontext():
+            if self._next_nonce is None:
+                nonce = self._sync()
+            elif self.send_lock:
+                # another process may have sent since, the node already counts
+                # what it sent while it held the lock
+                nonce = max(
+                    self._next_nonce,
+                    self.web3_client.web3.eth.get_transaction_count(
+                        self.address, "pending"
+                    ),
+                )
+            else:
+                nonce = self._next_nonce
+
+            try:
+                tx_hash = self._send(wallet, tx_params, nonce)
+            except Exception as exp:
+                if not any(error in str(exp).lower() for error in STALE_NONCE_ERRORS):
+                    # unknown if the node took it, the chain decides next time,
+                    # a replacement error means another sender holds the nonce
+                    self._next_nonce = None
+                    raise
+
+                logger.warning(f"Stale nonce {nonce} for {self.address}, resyncing")
+                nonce = self._sync()
+                tx_hash = self._send(wallet, tx_params, nonce)
+
+            self._next_nonce = nonce + 1
+            self._pending[tx_hash] = nonce
+
+            return tx_hash
+
+    def confirm(self, tx_hash: HexBytes) -> None:
+        # mined, every transaction before it is too
+        with self._lock:
+            if (nonce := self._pending.get(tx_hash)) is not None:
+                self._pending = {
+                    pending_hash: pending_nonce
+                    for pending_hash, pending_nonce in self._pending.items()
+                    if pending_nonce > nonce
+                }
+
+
+_nonce_managers: dict[str, NonceManager] = {}
+_nonce_managers_lock = Lock()
+
+
+def get_nonce_manager(
+    *,
+    web3_client: Web3Client,
+    address: str,
+    send_lock: Callable[[], AbstractContextManager[Any]] | None = None,
+) -> NonceManager:
+    # trade workers share the wallet, they share its nonces too
+    with _nonce_managers_lock:
+        if address not in _nonce_managers:
+            _nonce_managers[address] = NonceManager(
+                web3_client=web3_client, address=address
+            )
+
+        if send_lock:
+            _nonce_managers[address].send_lock = send_lock
+
+        return _nonce_managers[address]
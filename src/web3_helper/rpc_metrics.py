@@ -0,0 +1,67 @@
+import logging
+import time
+from collections import deque
+from threading import Lock
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RPCStats:
+    def __init__(self, *, window: int = 1000) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.max_latency = 0.0
+
+    def record(self, latency: float, failed: bool) -> None:
+        self.latencies.append(latency)
+        self.count += 1
+        self.max_latency = max(self.max_latency, latency)
+        if failed:
+            self.errors += 1
+
+    def asdict(self) -> dict:
+        p50, p95 = (
+            np.percentile(self.latencies, [50, 95]).tolist()
+            if self.latencies
+            else (0.0, 0.0)
+        )
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50": p50,
+            "p95": p95,
+            "max": self.max_latency,
+        }
+
+
+class RPCMetrics:
+    def __init__(self, *, log_interval: float = 300.0) -> None:
+        self.log_interval = log_interval
+        self._methods: dict[str, RPCStats] = {}
+        self._lock = Lock()
+        self._last_log = time.monotonic()
+
+    def record(self, method: str, latency: float, failed: bool = False) -> None:
+        with self._lock:
+            self._methods.setdefault(method, RPCStats()).record(latency, failed)
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {method: stats.asdict() for method, stats in self._methods.items()}
+
+    def log_summary(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_log < self.log_interval:
+            return
+
+        self._last_log = now
+        for method, stats in self.summary().items():
+            logger.info(
+                f"RPC {method} calls={stats['count']} errors={stats['errors']} "
+                f"p50={stats['p50'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms "
+                f"max={stats['max'] * 1000:.1f}ms"
+            )
@@ -1,16 +1,73 @@
+import logging
 import time
-from typing import Any, cast
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Final, Iterator, cast
 
 from eth_account.account import LocalAccount, SignedMessage
 from hexbytes import HexBytes
 from uniswap_universal_router_decoder import FunctionRecipient, RouterCodec
 from web3.exceptions import TimeExhausted
-from web3.types import TxParams
+from web3.types import TxParams, TxReceipt
 
 from tradebot.constants import BASE_CHAIN_ID
-from web3_helper.abi import ABIManager
-from web3_helper.gas import GasHelper
+from web3_helper.abi import ABIManager, get_contract
+from web3_helper.gas import GasOracle, GasUrgency
 from web3_helper.helper import Web3Client
+from web3_helper.nonce_manager import get_nonce_manager
+from web3_helper.standard_abi import ERC20_ABI, WETH_ABI
+
+logger = logging.getLogger(__name__)
+
+# an erc20 approve is ~46k, taxed and proxied tokens take more
+APPROVE_GAS_LIMIT: Final[int] = 100_000
+
+# set by the caller running a trade, told about every transaction sent for it
+_transaction_sent_callback: ContextVar[Callable[[HexBytes], None] | None] = ContextVar(
+    "transaction_sent_callback", default=None
+)
+
+
+@contextmanager
+def on_transaction_sent(callback: Callable[[HexBytes], None]) -> Iterator[None]:
+    token = _transaction_sent_callback.set(callback)
+    try:
+        yield
+    finally:
+        _transaction_sent_callback.reset(token)
+
+
+def sign_and_send_transaction(
+    *, web3_client: Web3Client, wallet: LocalAccount, tx_params: TxParams
+) -> HexBytes:
+    tx_hash = get_nonce_manager(
+        web3_client=web3_client, address=wallet.address
+    ).send_transaction(wallet=wallet, tx_params=tx_params)
+
+    if callback := _transaction_sent_callback.get():
+        try:
+            callback(tx_hash)
+        except Exception:
+            # sent already, the receipt is still waited for
+            logger.exception(f"Unable to record the transaction {tx_hash.hex()}")
+
+    return tx_hash
+
+
+def wait_for_receipt(
+    *, web3_client: Web3Client, wallet: LocalAccount, tx_hash: HexBytes
+) -> TxReceipt:
+    nonce_manager = get_nonce_manager(web3_client=web3_client, address=wallet.address)
+
+    try:
+        receipt = web3_client.web3.eth.wait_for_transaction_receipt(tx_hash)
+    except TimeExhausted:
+        # possibly dropped, the next transactions would wait behind it
+        nonce_manager.resync()
+        raise
+
+    nonce_manager.confirm(tx_hash)
+    return receipt
 
 
 class ApproveResult:
@@ -50,6 +107,7 @@ class AllowanceResult:
         *,
         amount: int,
         expiration: int,
+        nonce: int,
         signed_message: SignedMessage,
         permit_data: dict[str, Any],
         tx_hash: HexBytes | None = None,
@@ -59,6 +117,7 @@ class AllowanceResult:
         self.tx_hash = tx_hash
         self.amount = amount
         self.expiration = expiration
+        self.nonce = nonce
         self.signed_message = signed_message
         self.permit_data = permit_data
         self.tx_params = tx_params
@@ -111,11 +170,17 @@ class SwapResult:
 
 class TransactionHelper:
     def __init__(
-        self, *, web3_client: Web3Client, abi_manager: ABIManager, gas_helper: GasHelper
+        self,
+        *,
+        web3_client: Web3Client,
+        abi_manager: ABIManager,
+        gas_oracle: GasOracle,
+        urgency: GasUrgency = GasUrgency.NORMAL,
     ) -> None:
         self.web3_client = web3_client
         self.abi_manager = abi_manager
-        self.gas_helper = gas_helper
+        self.gas_oracle = gas_oracle
+        self.urgency = urgency
 
     def wrap_eth(
         self,
@@ -126,11 +191,10 @@ class TransactionHelper:
         chain_id: int = BASE_CHAIN_ID,
     ) -> bool:
         w3 = self.web3_client.web3
-        gas_estimate = self.gas_helper.estimated_gas_price()
+        gas_estimate = self.gas_oracle.estimate(self.urgency)
 
-        weth_contract = self.web3_client.web3.eth.contract(
-            self.web3_client.to_checksum_address(weth_address),
-            abi=self.abi_manager.get_abi(address=weth_address),
+        weth_contract = get_contract(
+            self.web3_client, address=weth_address, abi=WETH_ABI
         )
 
         tx = weth_contract.functions.deposit().build_transaction(
@@ -138,19 +202,21 @@ class TransactionHelper:
                 TxParams,
                 {
                     "gas": 75_000,
-                    "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                    "maxFeePerGas": gas_estimate.priority_fee + gas_estimate.base_fee,
+                    "maxPriorityFeePerGas": gas_estimate.priority_fee,
+                    "maxFeePerGas": gas_estimate.max_fee,
                     "chainId": chain_id,
                     "value": amount_in,
-                    "nonce": w3.eth.get_transaction_count(wallet.address),
                 },
             )
         )
 
-        raw_transaction = w3.eth.account.sign_transaction(tx, wallet.key).rawTransaction
-        tx_hash = w3.eth.send_raw_transaction(raw_transaction)
+        tx_hash = sign_and_send_transaction(
+            web3_client=self.web3_client, wallet=wallet, tx_params=tx
+        )
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = wait_for_receipt(
+                web3_client=self.web3_client, wallet=wallet, tx_hash=tx_hash
+            )
             return True
 
         except TimeExhausted:
@@ -164,14 +230,12 @@ class TransactionHelper:
         token_address: str,
         spender_address: str,
         chain_id: int = BASE_CHAIN_ID,
+        wait: bool = True,
     ) -> ApproveResult:
 
         w3 = self.web3_client.web3
-        source_abi = self.abi_manager.get_abi(address=token_address)
-
-        token_contract = w3.eth.contract(
-            self.web3_client.to_checksum_address(token_address),
-            abi=source_abi,
+        token_contract = get_contract(
+            self.web3_client, address=token_address, abi=ERC20_ABI
         )
 
         approve_function = token_contract.functions.approve(
@@ -179,36 +243,32 @@ class TransactionHelper:
             allowance,
         )
 
-        nonce = w3.eth.get_transaction_count(wallet.address)
-
-        gas_estimate = self.gas_helper.estimated_gas_price()
+        gas_estimate = self.gas_oracle.estimate(self.urgency)
 
         tx_params = cast(
             TxParams,
             {
                 "from": wallet.address,
-                "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                "maxFeePerGas": w3.eth.max_priority_fee + gas_estimate.base_fee,
+                "maxPriorityFeePerGas": gas_estimate.priority_fee,
+                "maxFeePerGas": gas_estimate.max_fee,
                 "type": "0x2",
                 "chainId": chain_id,
                 "value": 0,
-                "nonce": nonce,
             },
         )
 
-        gas_price = w3.eth.estimate_gas(tx_params)
-
-        tx_params["gas"] = gas_price + 10_000
+        tx_params["gas"] = APPROVE_GAS_LIMIT
 
         builded_tx_params = approve_function.build_transaction(tx_params)
 
-        raw_transaction = w3.eth.account.sign_transaction(
-            builded_tx_params, wallet.key
-        ).rawTransaction
-
-        approve_tx_hash = w3.eth.send_raw_transaction(raw_transaction)
-        receipt = w3.eth.wait_for_transaction_receipt(approve_tx_hash)
-        # TODO store receipt
+        approve_tx_hash = sign_and_send_transaction(
+            web3_client=self.web3_client, wallet=wallet, tx_params=builded_tx_params
+        )
+        # without waiting, the swap is sent right after with the next nonce
+        if wait:
+            wait_for_receipt(
+                web3_client=self.web3_client, wallet=wallet, tx_hash=approve_tx_hash
+            )
         return ApproveResult(
             amount=allowance,
             expiration=0,
@@ -230,10 +290,10 @@ class TransactionHelper:
     ) -> SwapResult | None:
 
         w3 = self.web3_client.web3
-        router_abi = self.abi_manager.get_abi(address=router_address)
-        router_contract = w3.eth.contract(
-            self.web3_client.to_checksum_address(router_address),
-            abi=router_abi,
+        router_contract = get_contract(
+            self.web3_client,
+            address=router_address,
+            abi=self.abi_manager.get_abi(address=router_address),
         )
 
         swap_tokens_for_tokens_function = (
@@ -246,30 +306,30 @@ class TransactionHelper:
             )
         )
 
-        gas_estimate = self.gas_helper.estimated_gas_price()
+        gas_estimate = self.gas_oracle.estimate(self.urgency)
 
         tx_params = cast(
             TxParams,
             {
                 "from": wallet.address,
                 "gas": 250_000,
-                "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                "maxFeePerGas": w3.eth.max_priority_fee + gas_estimate.base_fee,
+                "maxPriorityFeePerGas": gas_estimate.priority_fee,
+                "maxFeePerGas": gas_estimate.max_fee,
                 "type": "0x2",
                 "chainId": chain_id,
                 "value": 0,
-                "nonce": w3.eth.get_transaction_count(wallet.address),
             },
         )
 
         builded_tx_params = swap_tokens_for_tokens_function.build_transaction(tx_params)
 
-        raw_transaction = w3.eth.account.sign_transaction(
-            builded_tx_params, wallet.key
-        ).rawTransaction
-        tx_hash = w3.eth.send_raw_transaction(raw_transaction)
+        tx_hash = sign_and_send_transaction(
+            web3_client=self.web3_client, wallet=wallet, tx_params=builded_tx_params
+        )
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = wait_for_receipt(
+                web3_client=self.web3_client, wallet=wallet, tx_hash=tx_hash
+            )
 
             return SwapResult(
                 tx_hash=tx_hash,
@@ -287,21 +347,25 @@ class TransactionHelper:
 
 class UniswapTransactionHelper:
     def __init__(
-        self, *, web3_client: Web3Client, abi_manager: ABIManager, gas_helper: GasHelper
+        self,
+        *,
+        web3_client: Web3Client,
+        abi_manager: ABIManager,
+        gas_oracle: GasOracle,
+        urgency: GasUrgency = GasUrgency.NORMAL,
     ) -> None:
         self.web3_client = web3_client
         self.abi_manager = abi_manager
-        self.gas_helper = gas_helper
+        self.gas_oracle = gas_oracle
+        self.urgency = urgency
 
         self.codec = RouterCodec()
 
     def allowance(
         self, *, wallet: LocalAccount, token_address: str, spender: str
     ) -> int:
-        w3 = self.web3_client.web3
-        token_contract = w3.eth.contract(
-            self.web3_client.to_checksum_address(token_address),
-            abi=self.abi_manager.get_abi(address=token_address),
+        token_contract = get_contract(
+            self.web3_client, address=token_address, abi=ERC20_ABI
         )
         current_allowance = token_contract.functions.allowance(
             wallet.address, spender
@@ -337,7 +401,7 @@ class UniswapTransactionHelper:
             payer_is_sender=True,
         ).build(self.codec.get_default_deadline())
 
-        gas_estimate = self.gas_helper.estimated_gas_price()
+        gas_estimate = self.gas_oracle.estimate(self.urgency)
 
         tx_params = cast(
             TxParams,
@@ -345,22 +409,22 @@ class UniswapTransactionHelper:
                 "from": wallet.address,
                 "to": router_address,
                 "gas": 250_000,
-                "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                "maxFeePerGas": w3.eth.max_priority_fee + gas_estimate.base_fee,
+                "maxPriorityFeePerGas": gas_estimate.priority_fee,
+                "maxFeePerGas": gas_estimate.max_fee,
                 "type": "0x2",
                 "chainId": chain_id,
                 "value": 0,
-                "nonce": w3.eth.get_transaction_count(wallet.address),
                 "data": encoded_input,
             },
         )
 
-        raw_transaction = w3.eth.account.sign_transaction(
-            tx_params, wallet.key
-        ).rawTransaction
-        tx_hash = w3.eth.send_raw_transaction(raw_transaction)
+        tx_hash = sign_and_send_transaction(
+            web3_client=self.web3_client, wallet=wallet, tx_params=tx_params
+        )
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = wait_for_receipt(
+                web3_client=self.web3_client, wallet=wallet, tx_hash=tx_hash
+            )
 
             return SwapResult(
                 tx_hash=tx_hash,
@@ -402,7 +466,7 @@ class UniswapTransactionHelper:
             payer_is_sender=True,
         ).build(self.codec.get_default_deadline())
 
-        gas_estimate = self.gas_helper.estimated_gas_price()
+        gas_estimate = self.gas_oracle.estimate(self.urgency)
 
         tx_params = cast(
             TxParams,
@@ -410,22 +474,22 @@ class UniswapTransactionHelper:
                 "from": wallet.address,
                 "to": router_address,
                 "gas": 250_000,
-                "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                "maxFeePerGas": w3.eth.max_priority_fee + gas_estimate.base_fee,
+                "maxPriorityFeePerGas": gas_estimate.priority_fee,
+                "maxFeePerGas": gas_estimate.max_fee,
                 "type": "0x2",
                 "chainId": chain_id,
                 "value": 0,
-                "nonce": w3.eth.get_transaction_count(wallet.address),
                 "data": encoded_input,
             },
         )
 
-        raw_transaction = w3.eth.account.sign_transaction(
-            tx_params, wallet.key
-        ).rawTransaction
-        tx_hash = w3.eth.send_raw_transaction(raw_transaction)
+        tx_hash = sign_and_send_transaction(
+            web3_client=self.web3_client, wallet=wallet, tx_params=tx_params
+        )
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = wait_for_receipt(
+                web3_client=self.web3_client, wallet=wallet, tx_hash=tx_hash
+            )
 
             return SwapResult(
                 tx_hash=tx_hash,
@@ -446,27 +510,33 @@ class UniswapTransactionHelper:
         destination: str,
         permit_address: str,
         chain_id: int = BASE_CHAIN_ID,
+        expiration: int | None = None,
+        nonce: int | None = None,
     ) -> AllowanceResult:
 
         w3 = self.web3_client.web3
 
-        permit_abi = self.abi_manager.get_abi(address=permit_address)
-        permit_contract = w3.eth.contract(
-            self.web3_client.to_checksum_address(permit_address),
-            abi=permit_abi,
-        )
-        _, permit_expiration, permit_nonce = permit_contract.functions.allowance(
-            wallet.address,
-            token_address_to_spend,
-            destination,
-        ).call()
+        # read from the chain unless the caller already knows them
+        if expiration is None or nonce is None:
+            permit_contract = get_contract(
+                self.web3_client,
+                address=permit_address,
+                abi=self.abi_manager.get_abi(address=permit_address),
+            )
+            _, permit_expiration, permit_nonce = permit_contract.functions.allowance(
+                wallet.address,
+                token_address_to_spend,
+                destination,
+            ).call()
+            expiration = permit_expiration if expiration is None else expiration
+            nonce = permit_nonce if nonce is None else nonce
 
         # permit message
         permit_data, signable_message = self.codec.create_permit2_signable_message(
             token_address_to_spend,
             allowance,
-            permit_expiration,
-            permit_nonce,
+            expiration,
+            nonce,
             destination,
             self.codec.get_default_deadline(),  # 180 seconds
             chain_id,
@@ -477,105 +547,8 @@ class UniswapTransactionHelper:
 
         return AllowanceResult(
             amount=allowance,
-            expiration=permit_expiration,
+            expiration=expiration,
+            nonce=nonce,
             signed_message=signed_message,
             permit_data=permit_data,
         )
-
-    def approve_allowance(
-        self,
-        *,
-        allowance: int,
-        token_address_to_spend: str,
-        destination: str,
-        wallet: LocalAccount,
-        chain_id: int = BASE_CHAIN_ID,
-        permit_address: str | None = None,
-    ) -> AllowanceResult:
-
-        w3 = self.web3_client.web3
-
-        token_abi = self.abi_manager.get_abi(address=token_address_to_spend)
-        token_contract = w3.eth.contract(
-            self.web3_client.to_checksum_address(token_address_to_spend),
-            abi=token_abi,
-        )
-
-        contract_function = token_contract.functions.approve(
-            wallet.address if not permit_address else permit_address,
-            allowance,
-        )
-
-        permit_nonce = w3.eth.get_transaction_count(wallet.address)
-
-        gas_estimate = self.gas_helper.estimated_gas_price()
-
-        tx_params = cast(
-            TxParams,
-            {
-                "from": wallet.address,
-                "maxPriorityFeePerGas": w3.eth.max_priority_fee,
-                "maxFeePerGas": w3.eth.max_priority_fee + gas_estimate.base_fee,
-                "type": "0x2",
-                "chainId": chain_id,
-                "value": 0,
-                "nonce": permit_nonce,
-            },
-        )
-
-        gas_price = w3.eth.estimate_gas(tx_params)
-
-        tx_params["gas"] = gas_price + 10_000
-
-        builded_tx_params = contract_function.build_transaction(tx_params)
-
-        raw_transaction = w3.eth.account.sign_transaction(
-            builded_tx_params, wallet.key
-        ).rawTransaction
-
-        tx_hash = w3.eth.send_raw_transaction(raw_transaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        permit_expiration = 0
-
-        if permit_address:
-            allowance_result = self.permit_signed_message(
-                allowance=allowance,
-                wallet=wallet,
-                token_address_to_spend=token_address_to_spend,
-                destination=destination,
-                permit_address=permit_address,
-                chain_id=chain_id,
-            )
-
-            return AllowanceResult(
-                tx_hash=tx_hash,
-                amount=allowance_result.amount,
-                expiration=allowance_result.expiration,
-                signed_message=allowance_result.signed_message,
-                permit_data=allowance_result.permit_data,
-                tx_params=tx_params,
-            )
-
-        else:
-            # permit message
-            permit_data, signable_message = self.codec.create_permit2_signable_message(
-                token_address_to_spend,
-                allowance,
-                self.codec.get_default_expiration(),  # 30 days
-                permit_nonce,
-                destination,
-                self.codec.get_default_deadline(),  # 180 seconds
-                chain_id,
-            )
-
-            # Signing the message
-            signed_message = wallet.sign_message(signable_message)
-
-            return AllowanceResult(
-                tx_hash=tx_hash,
-                amount=allowance,
-                expiration=self.codec.get_default_expiration(),
-                signed_message=signed_message,
-                permit_data=permit_data,
-                tx_params=tx_params,
-            )